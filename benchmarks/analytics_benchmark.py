@@ -0,0 +1,145 @@
+"""Time the vectorized analytics kernels on synthetic viewer samples
+
+Usage:
+    python -m benchmarks.analytics_benchmark [--rows 10000000] [--db-rows 1000000]
+
+Generates samples for a few thousand channels polled every 5 minutes with
+some injected viewer spikes, times each kernel on the full array and compares
+share of voice with a plain Python loop over the first million rows. The load
+path from SQLite into arrays is timed separately on --db-rows rows.
+"""
+
+import argparse
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from src.db.database import DatabaseService
+from src.services.analytics import (
+    SAMPLE_DTYPE,
+    channel_growth,
+    load_samples,
+    share_of_voice,
+    viewer_anomalies,
+)
+
+CHANNELS = 5_000
+GAMES = 300
+START = 1_704_067_200  # 2024-01-01 UTC
+TICK = 300
+PYTHON_BASELINE_ROWS = 1_000_000
+
+
+def make_samples(rows: int, seed: int = 0) -> np.ndarray:
+    """Synthetic samples: Zipf-like audiences with drift, noise and rare spikes"""
+    rng = np.random.default_rng(seed)
+    samples = np.empty(rows, dtype=SAMPLE_DTYPE)
+    index = np.arange(rows)
+    channel = index % CHANNELS
+    tick = index // CHANNELS
+
+    base = 50_000 / (channel + 1) ** 0.8
+    trend = 1 + rng.normal(0, 0.0002, CHANNELS)[channel] * tick
+    noise = rng.normal(1, 0.05, rows)
+    spikes = np.where(rng.random(rows) < 1e-4, 4.0, 1.0)
+
+    samples["channel"] = channel + 1
+    samples["game"] = (channel * 7) % GAMES + 1
+    samples["viewers"] = np.maximum(base * trend * noise * spikes, 0).astype(np.int64)
+    samples["timestamp"] = START + tick * TICK
+    return samples
+
+
+def python_share_of_voice(rows: list[tuple], width: int, top: int) -> dict:
+    """Reference implementation with per-row Python loops"""
+    totals = defaultdict(int)
+    per_game = defaultdict(int)
+    pairs = defaultdict(int)
+    for _, game, viewers, timestamp in rows:
+        bucket = timestamp - timestamp % width
+        totals[bucket] += viewers
+        per_game[game] += viewers
+        pairs[(bucket, game)] += viewers
+    top_games = set(sorted(per_game, key=per_game.get, reverse=True)[:top])
+    return {
+        key: viewers / totals[key[0]]
+        for key, viewers in pairs.items()
+        if key[1] in top_games
+    }
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def time_db_load(rows: int) -> tuple[int, float]:
+    """Insert rows straight into the normalized tables and time loading them back"""
+    samples = make_samples(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_service = DatabaseService(str(Path(tmp) / "bench.db"))
+        cursor = db_service.connection.cursor()
+        with db_service.connection:
+            cursor.executemany(
+                "INSERT INTO channels(id, user_login, user_name) VALUES (?, ?, ?)",
+                ((i, f"channel_{i}", f"Channel_{i}") for i in range(1, CHANNELS + 1)),
+            )
+            cursor.executemany(
+                "INSERT INTO games(id, game_id, game_name) VALUES (?, ?, ?)",
+                ((i, str(i), f"Game {i}") for i in range(1, GAMES + 1)),
+            )
+            cursor.execute("INSERT INTO titles(id, title) VALUES (1, 'Benchmark')")
+            cursor.executemany(
+                """INSERT INTO stream_snapshots
+                   (channel_id, game_key, title_id, viewer_count, timestamp)
+                   VALUES (?, ?, 1, ?, ?)""",
+                samples.tolist(),
+            )
+        loaded, seconds = timed(lambda: load_samples(db_service.iter_viewer_samples()))
+        db_service.close()
+    return len(loaded), seconds
+
+
+def run(rows: int, db_rows: int) -> None:
+    print(f"Generating {rows:,} samples...")
+    samples = make_samples(rows)
+
+    _, share_seconds = timed(share_of_voice, samples, 3600, 10)
+    _, growth_seconds = timed(channel_growth, samples, 10)
+    anomalies, anomaly_seconds = timed(viewer_anomalies, samples, 300, 12, 3.0)
+
+    baseline_rows = samples[:PYTHON_BASELINE_ROWS].tolist()
+    _, python_seconds = timed(python_share_of_voice, baseline_rows, 3600, 10)
+    _, numpy_seconds = timed(share_of_voice, samples[:PYTHON_BASELINE_ROWS], 3600, 10)
+
+    print(f"share of voice:   {share_seconds:.2f}s")
+    print(f"channel growth:   {growth_seconds:.2f}s")
+    print(f"viewer anomalies: {anomaly_seconds:.2f}s ({len(anomalies[0]):,} flagged)")
+    print(
+        f"share of voice on {len(baseline_rows):,} rows: python loop "
+        f"{python_seconds:.2f}s vs numpy {numpy_seconds:.2f}s "
+        f"({python_seconds / numpy_seconds:.0f}x)"
+    )
+
+    if db_rows:
+        loaded, load_seconds = time_db_load(db_rows)
+        print(
+            f"load from SQLite: {loaded:,} rows in {load_seconds:.2f}s "
+            f"({loaded / load_seconds:,.0f} rows/s)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--db-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.rows, args.db_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Tool latency under concurrent load: blocking DB calls versus the async facade
+
+Usage:
+    python -m benchmarks.db_concurrency_benchmark [--clients 50] [--calls 40]
+
+Each client issues --calls requests back to back, mostly snapshot page reads
+(what get_stream_snapshots_from_db does) and some 20-row snapshot writes (a
+trending page being stored). A probe coroutine sleeping 5 ms at a time
+records how late the event loop wakes it, which is the delay every other
+tool call (e.g. a cache hit) sees. Three ways of reaching the database are
+timed:
+
+    inline     shared DatabaseService called directly on the event loop
+    to_thread  shared DatabaseService via asyncio.to_thread (apsw rejects
+               concurrent use of one connection, so some calls fail)
+    facade     AsyncDatabaseService (writer thread + reader pool)
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from pathlib import Path
+
+from src.db.async_database import DEFAULT_READER_THREADS, AsyncDatabaseService
+from src.db.database import DatabaseService
+from src.models import StreamSnapshot
+
+PREFILL_ROWS = 100_000
+PROBE_INTERVAL = 0.005
+WRITE_ROWS = 20
+WRITE_RATIO = 0.2
+CHANNELS = 500
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+_minutes = count()
+
+
+def make_page(rows: int = WRITE_ROWS) -> list[StreamSnapshot]:
+    """Snapshots of distinct streams, each observed in a fresh minute"""
+    page = []
+    for _ in range(rows):
+        i = next(_minutes)
+        page.append(
+            StreamSnapshot(
+                user_login=f"channel_{i % CHANNELS}",
+                user_name=f"Channel_{i % CHANNELS}",
+                viewer_count=(i * 37) % 50_000,
+                game_name=f"Game {i % 40}",
+                game_id=str(i % 40),
+                title=f"Stream title {i % 1000}",
+                timestamp=START + timedelta(minutes=i),
+                language="en",
+                stream_id=str(i + 1),
+            )
+        )
+    return page
+
+
+class Inline:
+    def __init__(self, db_path: str):
+        self.db = DatabaseService(db_path)
+
+    async def read(self, **filters):
+        return self.db.query_streams(**filters)
+
+    async def write(self, page):
+        return self.db.insert_stream_snapshots(page)
+
+    async def close(self):
+        self.db.close()
+
+
+class ToThread(Inline):
+    async def read(self, **filters):
+        return await asyncio.to_thread(self.db.query_streams, **filters)
+
+    async def write(self, page):
+        return await asyncio.to_thread(self.db.insert_stream_snapshots, page)
+
+
+class Facade:
+    readers = DEFAULT_READER_THREADS
+
+    def __init__(self, db_path: str):
+        self.db = AsyncDatabaseService(db_path, readers=self.readers)
+
+    async def read(self, **filters):
+        return await self.db.query_streams(**filters)
+
+    async def write(self, page):
+        return await self.db.insert_stream_snapshots(page)
+
+    async def close(self):
+        self.db.close()
+
+
+BACKENDS = {"inline": Inline, "to_thread": ToThread, "facade": Facade}
+
+
+async def client(
+    backend, calls: int, rng: random.Random, latencies: dict, started: float
+):
+    """Issue calls back to back; each one's latency runs from the previous reply
+    (the first from the start of the run), so time spent waiting for a blocked
+    event loop is included"""
+    for _ in range(calls):
+        if rng.random() < WRITE_RATIO:
+            kind, page = "write", make_page()
+        else:
+            kind, page = "read", None
+        try:
+            if page is not None:
+                await backend.write(page)
+            else:
+                login = f"channel_{rng.randrange(CHANNELS)}"
+                snapshots, _ = await backend.read(
+                    limit=100, records=True, user_login=login
+                )
+                [s.to_dict() for s in snapshots]
+        except Exception:
+            latencies["errors"].append(kind)
+        else:
+            latencies[kind].append((time.perf_counter() - started) * 1000)
+        # Tool calls are separate tasks in the server, so others run in between
+        started = time.perf_counter()
+        await asyncio.sleep(0)
+
+
+async def probe(lags: list, done: asyncio.Event):
+    """Record how much later than requested the loop resumes a sleeper"""
+    while not done.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+async def measure(name: str, db_path: str, clients: int, calls: int) -> dict:
+    backend = BACKENDS[name](db_path)
+    latencies = {"read": [], "write": [], "errors": [], "lag": []}
+    done = asyncio.Event()
+    prober = asyncio.create_task(probe(latencies["lag"], done))
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client(backend, calls, random.Random(seed), latencies, started)
+            for seed in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+    stats = backend.db.stats() if name == "facade" else None
+    await backend.close()
+    return {"latencies": latencies, "elapsed": elapsed, "writer": stats}
+
+
+def percentile(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        # A loop blocked for the whole run only wakes the probe once or twice
+        return max(values, default=0.0)
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+def run(clients: int, calls: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        db_service = DatabaseService(db_path)
+        for _ in range(0, PREFILL_ROWS, 10_000):
+            db_service.insert_stream_snapshots(make_page(10_000))
+        db_service.close()
+
+        print(f"{clients} clients x {calls} calls, {WRITE_RATIO:.0%} writes")
+        print(
+            f"{'backend':>10} {'calls/s':>8} {'p50 ms':>7} {'p99 ms':>7} "
+            f"{'read p99':>9} {'write p99':>10} {'loop lag p99':>13} {'errors':>7}"
+        )
+        for name in BACKENDS:
+            result = asyncio.run(measure(name, db_path, clients, calls))
+            latencies = result["latencies"]
+            every = latencies["read"] + latencies["write"]
+            print(
+                f"{name:>10} {len(every) / result['elapsed']:>8.0f} "
+                f"{percentile(every, 50):>7.1f} {percentile(every, 99):>7.1f} "
+                f"{percentile(latencies['read'], 99):>9.1f} "
+                f"{percentile(latencies['write'], 99):>10.1f} "
+                f"{percentile(latencies['lag'], 99):>13.1f} "
+                f"{len(latencies['errors']):>7}"
+            )
+            if result["writer"]:
+                writer = result["writer"]
+                print(
+                    f"{'':>10} {writer['writes']} writes in {writer['commits']} commits"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--readers", type=int, default=DEFAULT_READER_THREADS)
+    args = parser.parse_args()
+    Facade.readers = args.readers
+    run(args.clients, args.calls)
+
+
+if __name__ == "__main__":
+    main()
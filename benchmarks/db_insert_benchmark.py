@@ -0,0 +1,108 @@
+"""Benchmark stream snapshot inserts before and after the pooled DatabaseService
+
+Usage:
+    python -m benchmarks.db_insert_benchmark [--sizes 10 1000 100000]
+
+"before" reproduces the original per-call behaviour: a fresh connection with
+default pragmas, CREATE TABLE IF NOT EXISTS on every call and executemany in
+autocommit mode. "after" uses one long-lived DatabaseService.
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import apsw
+
+from src.db.database import DatabaseService
+from src.db.migrations import create_stream_snapshots
+from src.models import StreamSnapshot
+
+LEGACY_INSERT_QUERY = """
+    INSERT INTO stream_snapshots
+    (user_login, user_name, viewer_count, game_name, game_id,
+     title, timestamp, is_live, language)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def make_snapshots(count: int) -> list[StreamSnapshot]:
+    """Build synthetic snapshots spread across a few hundred channels"""
+    start = datetime(2024, 1, 1)
+    return [
+        StreamSnapshot(
+            user_login=f"channel_{i % 500}",
+            user_name=f"Channel_{i % 500}",
+            viewer_count=(i * 37) % 50_000,
+            game_name=f"Game {i % 40}",
+            game_id=str(i % 40),
+            title=f"Stream title number {i}",
+            timestamp=start + timedelta(minutes=i),
+            language="en",
+        )
+        for i in range(count)
+    ]
+
+
+def _rows(snapshots: list[StreamSnapshot]) -> list[tuple]:
+    return [
+        (
+            s.user_login,
+            s.user_name,
+            s.viewer_count,
+            s.game_name,
+            s.game_id,
+            s.title,
+            s.timestamp.isoformat(),
+            1 if s.is_live else 0,
+            s.language,
+        )
+        for s in snapshots
+    ]
+
+
+def insert_legacy(db_path: Path, snapshots: list[StreamSnapshot]) -> None:
+    """Original behaviour: new connection and autocommit inserts per call"""
+    connection = apsw.Connection(str(db_path))
+    cursor = connection.cursor()
+    cursor.execute("PRAGMA foreign_keys = ON")
+    create_stream_snapshots(cursor)
+    cursor.executemany(LEGACY_INSERT_QUERY, _rows(snapshots))
+    connection.close()
+
+
+def run(sizes: list[int], calls: int) -> None:
+    print(f"{'rows':>8} {'before rows/s':>15} {'after rows/s':>15} {'speedup':>8}")
+    for size in sizes:
+        snapshots = make_snapshots(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy_path = Path(tmp) / "legacy.db"
+            started = time.perf_counter()
+            for _ in range(calls):
+                insert_legacy(legacy_path, snapshots)
+            before = size * calls / (time.perf_counter() - started)
+
+            db_service = DatabaseService(str(Path(tmp) / "pooled.db"))
+            started = time.perf_counter()
+            for _ in range(calls):
+                db_service.insert_stream_snapshots(snapshots)
+            after = size * calls / (time.perf_counter() - started)
+            db_service.close()
+
+        print(f"{size:>8} {before:>15,.0f} {after:>15,.0f} {after / before:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument(
+        "--calls", type=int, default=5, help="insert calls per size (default: 5)"
+    )
+    args = parser.parse_args()
+    run(args.sizes, args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""Local fake of the Twitch EventSub WebSocket on top of the fake Helix server
+
+Usage:
+    python -m benchmarks.fake_eventsub [--port 8999] [--flip-interval 5]
+
+Point the server at it with the variables it prints, e.g.:
+    EVENTSUB_ENABLED=1
+    EVENTSUB_WEBSOCKET_URL=ws://127.0.0.1:8999/ws
+    TWITCH_USER_ACCESS_TOKEN=fake-user-token
+
+Clients connect to /ws, get a session_welcome and keepalives, and create
+subscriptions with POST /helix/eventsub/subscriptions like on Twitch. The
+send_* methods push stream.online, stream.offline and channel.update
+notifications to every session subscribed to that channel, and
+send_revocation ends a channel's subscriptions the way Twitch does when the
+broadcaster withdraws authorization; from the command
+line, --flip-interval toggles a random subscribed channel periodically.
+Channels are the fake Helix ones, streamer_<n> with user id 1000 + n.
+"""
+
+import argparse
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+from aiohttp import WSMsgType, web
+
+from benchmarks.fake_helix import FakeHelixServer
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class FakeEventSubServer(FakeHelixServer):
+    """Fake Helix server that also serves EventSub over WebSocket"""
+
+    def __init__(self, *args, keepalive_timeout: int = 10, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.keepalive_timeout = keepalive_timeout
+        self.notifications = 0
+        # session id -> open socket
+        self._sessions: dict[str, web.WebSocketResponse] = {}
+        # (type, broadcaster id) -> subscriptions
+        self._subscriptions: dict[tuple[str, str], list[dict]] = {}
+
+    @property
+    def websocket_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws"
+
+    def env(self) -> dict[str, str]:
+        return {
+            **super().env(),
+            "EVENTSUB_ENABLED": "1",
+            "EVENTSUB_WEBSOCKET_URL": self.websocket_url,
+            "TWITCH_USER_ACCESS_TOKEN": "fake-user-token",
+        }
+
+    def build_app(self) -> web.Application:
+        app = super().build_app()
+        app.router.add_get("/ws", self._websocket)
+        app.router.add_post("/helix/eventsub/subscriptions", self._subscribe)
+        app.router.add_delete("/helix/eventsub/subscriptions", self._unsubscribe)
+        return app
+
+    async def stop(self):
+        for socket in list(self._sessions.values()):
+            await socket.close()
+        await super().stop()
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "sessions": len(self._sessions),
+            "subscriptions": sum(len(subs) for subs in self._subscriptions.values()),
+            "notifications": self.notifications,
+        }
+
+    def subscribed_logins(self) -> list[str]:
+        """Logins with at least one subscription"""
+        return sorted(
+            {
+                f"streamer_{int(user_id) - 1_000}"
+                for (_, user_id), subs in self._subscriptions.items()
+                if subs
+            }
+        )
+
+    # Pushing events
+
+    async def send_stream_online(self, user_login: str) -> int:
+        index = self._index(user_login)
+        return await self._notify(
+            "stream.online",
+            index,
+            id=str(10_000_000 + index),
+            type="live",
+            started_at=_now(),
+        )
+
+    async def send_stream_offline(self, user_login: str) -> int:
+        return await self._notify("stream.offline", self._index(user_login))
+
+    async def send_channel_update(
+        self,
+        user_login: str,
+        title: str,
+        category_id: str = "",
+        category_name: str = "",
+    ) -> int:
+        return await self._notify(
+            "channel.update",
+            self._index(user_login),
+            title=title,
+            language="en",
+            category_id=category_id,
+            category_name=category_name,
+            content_classification_labels=[],
+        )
+
+    async def send_revocation(
+        self, user_login: str, status: str = "authorization_revoked"
+    ) -> int:
+        """Revoke every subscription to a channel; returns how many were revoked"""
+        index = self._index(user_login)
+        if index is None:
+            return 0
+        user_id = self._user(index)["id"]
+        sent = 0
+        for (_, broadcaster_id), subs in self._subscriptions.items():
+            if broadcaster_id != user_id:
+                continue
+            for subscription in subs:
+                socket = self._sessions.get(subscription["transport"]["session_id"])
+                if socket is None or socket.closed:
+                    continue
+                await socket.send_json(
+                    {
+                        "metadata": {
+                            "message_id": str(uuid.uuid4()),
+                            "message_type": "revocation",
+                            "message_timestamp": _now(),
+                            "subscription_type": subscription["type"],
+                            "subscription_version": subscription["version"],
+                        },
+                        "payload": {"subscription": {**subscription, "status": status}},
+                    }
+                )
+                sent += 1
+            subs.clear()
+        return sent
+
+    async def _notify(self, sub_type: str, index: int | None, **fields) -> int:
+        """Send one notification per matching subscription; returns how many"""
+        if index is None:
+            return 0
+        user = self._user(index)
+        event = {
+            "broadcaster_user_id": user["id"],
+            "broadcaster_user_login": user["login"],
+            "broadcaster_user_name": user["display_name"],
+            **fields,
+        }
+        sent = 0
+        for subscription in self._subscriptions.get((sub_type, user["id"]), []):
+            socket = self._sessions.get(subscription["transport"]["session_id"])
+            if socket is None or socket.closed:
+                continue
+            await socket.send_json(
+                {
+                    "metadata": {
+                        "message_id": str(uuid.uuid4()),
+                        "message_type": "notification",
+                        "message_timestamp": _now(),
+                        "subscription_type": sub_type,
+                        "subscription_version": subscription["version"],
+                    },
+                    "payload": {"subscription": subscription, "event": event},
+                }
+            )
+            sent += 1
+        self.notifications += sent
+        return sent
+
+    # WebSocket sessions
+
+    async def _websocket(self, request: web.Request):
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+        session_id = str(uuid.uuid4())
+        self._sessions[session_id] = socket
+        await socket.send_json(
+            {
+                "metadata": {
+                    "message_id": str(uuid.uuid4()),
+                    "message_type": "session_welcome",
+                    "message_timestamp": _now(),
+                },
+                "payload": {
+                    "session": {
+                        "id": session_id,
+                        "status": "connected",
+                        "connected_at": _now(),
+                        "keepalive_timeout_seconds": self.keepalive_timeout,
+                        "reconnect_url": None,
+                    }
+                },
+            }
+        )
+        keepalive = asyncio.create_task(self._keepalive(socket))
+        try:
+            async for message in socket:
+                if message.type == WSMsgType.ERROR:
+                    break
+        finally:
+            keepalive.cancel()
+            self._sessions.pop(session_id, None)
+            # Like Twitch, subscriptions end with their session
+            for subs in self._subscriptions.values():
+                subs[:] = [
+                    s for s in subs if s["transport"]["session_id"] != session_id
+                ]
+        return socket
+
+    async def _keepalive(self, socket: web.WebSocketResponse):
+        while not socket.closed:
+            await asyncio.sleep(self.keepalive_timeout / 2)
+            await socket.send_json(
+                {
+                    "metadata": {
+                        "message_id": str(uuid.uuid4()),
+                        "message_type": "session_keepalive",
+                        "message_timestamp": _now(),
+                    },
+                    "payload": {},
+                }
+            )
+
+    # Subscriptions
+
+    async def _subscribe(self, request: web.Request):
+        body = await request.json()
+        session_id = body.get("transport", {}).get("session_id")
+        if session_id not in self._sessions:
+            return web.json_response(
+                {"error": "Bad Request", "status": 400, "message": "unknown session"},
+                status=400,
+            )
+        key = (body["type"], body["condition"]["broadcaster_user_id"])
+        subs = self._subscriptions.setdefault(key, [])
+        if any(s["transport"]["session_id"] == session_id for s in subs):
+            return web.json_response(
+                {
+                    "error": "Conflict",
+                    "status": 409,
+                    "message": "subscription already exists",
+                },
+                status=409,
+            )
+        subscription = {
+            "id": str(uuid.uuid4()),
+            "status": "enabled",
+            "type": body["type"],
+            "version": body["version"],
+            "cost": 1,
+            "condition": body["condition"],
+            "transport": {"method": "websocket", "session_id": session_id},
+            "created_at": _now(),
+        }
+        subs.append(subscription)
+        total = sum(len(s) for s in self._subscriptions.values())
+        return web.json_response(
+            {
+                "data": [subscription],
+                "total": total,
+                "total_cost": total,
+                "max_total_cost": 10_000,
+            },
+            status=202,
+        )
+
+    async def _unsubscribe(self, request: web.Request):
+        subscription_id = request.query.get("id")
+        for subs in self._subscriptions.values():
+            subs[:] = [s for s in subs if s["id"] != subscription_id]
+        return web.Response(status=204)
+
+
+async def flip_channels(server: FakeEventSubServer, interval: float):
+    """Toggle a random subscribed channel online or offline every interval"""
+    live: set[str] = set()
+    while True:
+        await asyncio.sleep(interval)
+        logins = server.subscribed_logins()
+        if not logins:
+            continue
+        login = server.random.choice(logins)
+        if login in live:
+            live.discard(login)
+            await server.send_stream_offline(login)
+        else:
+            live.add(login)
+            await server.send_channel_update(login, f"Live at {_now()}", "1", "Game 1")
+            await server.send_stream_online(login)
+        print(f"{login} is now {'online' if login in live else 'offline'}")
+
+
+async def serve(args: argparse.Namespace):
+    server = FakeEventSubServer(port=args.port, latency=args.latency_ms / 1000)
+    async with server:
+        print(f"Fake Helix and EventSub listening on {server.api_base_url}")
+        for name, value in server.env().items():
+            print(f"  {name}={value}")
+        if args.flip_interval:
+            await flip_channels(server, args.flip_interval)
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--flip-interval", type=float, default=0.0)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
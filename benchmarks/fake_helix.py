@@ -0,0 +1,337 @@
+"""Local fake of the Twitch Helix and OAuth endpoints used by TwitchService
+
+Usage:
+    python -m benchmarks.fake_helix [--port 8999] [--rate-limit 800]
+        [--latency-ms 20] [--error-rate 0.0] [--streams 5000] [--page-size 100]
+
+Point the server at it with:
+    TWITCH_API_BASE_URL=http://127.0.0.1:8999/helix/
+    TWITCH_AUTH_BASE_URL=http://127.0.0.1:8999/oauth2/
+
+Responses follow the Helix shapes closely enough for twitchAPI to parse them.
+The server enforces a token-bucket rate limit with real Ratelimit-* headers
+and 429 responses, and can add latency and random 5xx errors. Pages hold at
+most page_size items whatever `first` asks for, to exercise pagination.
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+STARTED_AT = (datetime.now(timezone.utc) - timedelta(hours=2)).strftime(
+    "%Y-%m-%dT%H:%M:%SZ"
+)
+LANGUAGES = ("en", "en", "en", "es", "de", "fr", "ja", "pt", "ko", "ru")
+
+
+class FakeHelixServer:
+    """In-process aiohttp server imitating the Helix endpoints we call"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8999,
+        rate_limit: int = 800,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        stream_count: int = 5_000,
+        game_count: int = 500,
+        page_size: int = 100,
+        token_expires_in: int = 5_000_000,
+        seed: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        self.rate_limit = rate_limit
+        self.latency = latency
+        self.error_rate = error_rate
+        self.stream_count = stream_count
+        self.game_count = game_count
+        self.page_size = page_size
+        self.token_expires_in = token_expires_in
+        self.random = random.Random(seed)
+
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self._tokens = float(rate_limit)
+        self._updated_at = time.monotonic()
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def api_base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/helix/"
+
+    @property
+    def auth_base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/oauth2/"
+
+    def env(self) -> dict[str, str]:
+        """Environment variables that point TwitchService at this server"""
+        return {
+            "TWITCH_APP_ID": "fake-app-id",
+            "TWITCH_APP_SECRET": "fake-app-secret",
+            "TWITCH_API_BASE_URL": self.api_base_url,
+            "TWITCH_AUTH_BASE_URL": self.auth_base_url,
+        }
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post("/oauth2/token", self._token)
+        app.router.add_get("/oauth2/validate", self._validate)
+        app.router.add_get("/helix/streams", self._streams)
+        app.router.add_get("/helix/users", self._users)
+        app.router.add_get("/helix/games/top", self._top_games)
+        app.router.add_get("/helix/games", self._games)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "errors": self.errors,
+        }
+
+    # Rate limiting, latency and error injection
+
+    def _take_token(self) -> tuple[bool, int, int]:
+        now = time.monotonic()
+        refill = self.rate_limit / 60.0
+        self._tokens = min(
+            self.rate_limit, self._tokens + (now - self._updated_at) * refill
+        )
+        self._updated_at = now
+        allowed = self._tokens >= 1
+        if allowed:
+            self._tokens -= 1
+        seconds_to_full = (self.rate_limit - self._tokens) / refill
+        return allowed, int(self._tokens), math.ceil(time.time() + seconds_to_full)
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        if not request.path.startswith("/helix/"):
+            return await handler(request)
+
+        self.requests += 1
+        allowed, remaining, reset = self._take_token()
+        headers = {
+            "Ratelimit-Limit": str(self.rate_limit),
+            "Ratelimit-Remaining": str(remaining),
+            "Ratelimit-Reset": str(reset),
+        }
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not allowed:
+            self.throttled += 1
+            return web.json_response(
+                {"error": "Too Many Requests", "status": 429, "message": ""},
+                status=429,
+                headers=headers,
+            )
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            status = self.random.choice((500, 502, 503))
+            return web.json_response(
+                {"error": "Server Error", "status": status, "message": ""},
+                status=status,
+                headers=headers,
+            )
+
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    # OAuth
+
+    async def _token(self, request: web.Request):
+        return web.json_response(
+            {
+                "access_token": "fake-app-token",
+                "expires_in": self.token_expires_in,
+                "token_type": "bearer",
+            }
+        )
+
+    async def _validate(self, request: web.Request):
+        info = {
+            "client_id": "fake-app-id",
+            "scopes": [],
+            "expires_in": self.token_expires_in,
+        }
+        # Tokens named fake-user-* validate as user tokens of streamer_0
+        if request.headers.get("Authorization", "").startswith("OAuth fake-user"):
+            info.update(login="streamer_0", user_id=self._user(0)["id"])
+        return web.json_response(info)
+
+    # Helix data
+
+    def _viewers(self, index: int) -> int:
+        """Zipf-like viewer counts that drift slowly over time"""
+        base = 200_000 / (index + 1) ** 0.9
+        drift = 1 + 0.1 * math.sin(time.time() / 600 + index)
+        return max(0, int(base * drift))
+
+    def _stream(self, index: int) -> dict:
+        game = index % self.game_count
+        return {
+            "id": str(10_000_000 + index),
+            "user_id": str(1_000 + index),
+            "user_login": f"streamer_{index}",
+            "user_name": f"Streamer_{index}",
+            "game_id": str(game + 1),
+            "game_name": f"Game {game + 1}",
+            "type": "live",
+            "title": f"Playing Game {game + 1} with streamer {index}",
+            "viewer_count": self._viewers(index),
+            "started_at": STARTED_AT,
+            "language": LANGUAGES[index % len(LANGUAGES)],
+            "thumbnail_url": "",
+            "tag_ids": [],
+            "tags": [],
+            "is_mature": False,
+        }
+
+    @staticmethod
+    def _index(login: str) -> int | None:
+        """Index of a streamer_<n> login, None for any other login"""
+        prefix, _, number = login.lower().partition("streamer_")
+        return int(number) if not prefix and number.isdigit() else None
+
+    def _user(self, index: int) -> dict:
+        return {
+            "id": str(1_000 + index),
+            "login": f"streamer_{index}",
+            "display_name": f"Streamer_{index}",
+            "type": "",
+            "broadcaster_type": "",
+            "description": "",
+            "profile_image_url": "",
+            "offline_image_url": "",
+            "view_count": 0,
+            "created_at": STARTED_AT,
+        }
+
+    def _game(self, index: int) -> dict:
+        return {
+            "id": str(index + 1),
+            "name": f"Game {index + 1}",
+            "box_art_url": f"https://static-cdn.example/game-{index + 1}-{{width}}x{{height}}.jpg",
+            "igdb_id": str(90_000 + index),
+        }
+
+    def _page(self, request: web.Request, total: int) -> tuple[range, dict]:
+        first = min(int(request.query.get("first", 20)), self.page_size)
+        after = int(request.query.get("after") or 0)
+        end = min(after + first, total)
+        pagination = {"cursor": str(end)} if end < total else {}
+        return range(after, end), pagination
+
+    async def _streams(self, request: web.Request):
+        logins = request.query.getall("user_login", [])
+        game_ids = set(request.query.getall("game_id", []))
+
+        if logins:
+            indexes = []
+            for login in logins:
+                index = self._index(login)
+                # Odd-numbered channels are offline to exercise offline handling
+                if index is not None and index % 2 == 0:
+                    indexes.append(index)
+            return web.json_response(
+                {"data": [self._stream(i) for i in indexes], "pagination": {}}
+            )
+
+        if game_ids:
+            matching = [
+                i
+                for i in range(self.stream_count)
+                if str(i % self.game_count + 1) in game_ids
+            ]
+            window, pagination = self._page(request, len(matching))
+            return web.json_response(
+                {
+                    "data": [self._stream(matching[i]) for i in window],
+                    "pagination": pagination,
+                }
+            )
+
+        window, pagination = self._page(request, self.stream_count)
+        return web.json_response(
+            {"data": [self._stream(i) for i in window], "pagination": pagination}
+        )
+
+    async def _users(self, request: web.Request):
+        indexes = (self._index(login) for login in request.query.getall("login", []))
+        data = [self._user(index) for index in indexes if index is not None]
+        return web.json_response({"data": data})
+
+    async def _top_games(self, request: web.Request):
+        window, pagination = self._page(request, self.game_count)
+        return web.json_response(
+            {"data": [self._game(i) for i in window], "pagination": pagination}
+        )
+
+    async def _games(self, request: web.Request):
+        ids = request.query.getall("id", [])
+        data = [
+            self._game(int(game_id) - 1)
+            for game_id in ids
+            if game_id.isdigit() and 0 < int(game_id) <= self.game_count
+        ]
+        return web.json_response({"data": data, "pagination": {}})
+
+
+async def serve(args: argparse.Namespace):
+    server = FakeHelixServer(
+        port=args.port,
+        rate_limit=args.rate_limit,
+        latency=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        stream_count=args.streams,
+        page_size=args.page_size,
+    )
+    async with server:
+        print(f"Fake Helix listening on {server.api_base_url}")
+        for name, value in server.env().items():
+            print(f"  {name}={value}")
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--rate-limit", type=int, default=800)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--streams", type=int, default=5_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
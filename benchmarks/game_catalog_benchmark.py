@@ -0,0 +1,82 @@
+"""Game metadata lookups: per-id Helix requests versus the game catalog
+
+Usage:
+    python -m benchmarks.game_catalog_benchmark [--games 500] [--latency-ms 20]
+
+Resolves --games game ids against a FakeHelixServer with added latency:
+
+    per-id      one get_games request per id (the pattern the catalog replaces)
+    cold        GameCatalog with an empty database, 100 ids per request
+    database    a fresh GameCatalog over the same database (after a restart)
+    memory      the same catalog again
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fake_helix import FakeHelixServer
+from src.db.async_database import AsyncDatabaseService
+from src.services.game_catalog import GameCatalog
+from src.services.twitch_api import TwitchService
+from src.utils.logging_config import logger
+
+
+async def timed(name: str, coro, server: FakeHelixServer) -> None:
+    requests = server.requests
+    started = time.perf_counter()
+    games = await coro
+    elapsed = (time.perf_counter() - started) * 1000
+    print(
+        f"{name:>9}: {elapsed:8.1f} ms  {len(games):>5} games  "
+        f"{server.requests - requests:>4} Helix requests"
+    )
+
+
+async def per_id(twitch_service: TwitchService, game_ids: list[str]) -> list:
+    return [game for i in game_ids for game in await twitch_service.get_games([i])]
+
+
+async def run(args: argparse.Namespace):
+    # Keep per-request log lines out of the measurement
+    logger.setLevel(logging.WARNING)
+    server = FakeHelixServer(
+        port=args.port, latency=args.latency_ms / 1000, game_count=args.games
+    )
+    async with server:
+        os.environ.update(server.env())
+        twitch_service = TwitchService()
+        game_ids = [str(i + 1) for i in range(args.games)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = str(Path(tmp) / "bench.db")
+            await timed("per-id", per_id(twitch_service, game_ids), server)
+
+            db_service = AsyncDatabaseService(db_path)
+            catalog = GameCatalog(twitch_service, db_service)
+            await timed("cold", catalog.get_games(game_ids), server)
+            db_service.close()
+
+            db_service = AsyncDatabaseService(db_path)
+            catalog = GameCatalog(twitch_service, db_service)
+            await timed("database", catalog.get_games(game_ids), server)
+            await timed("memory", catalog.get_games(game_ids), server)
+            db_service.close()
+
+        await twitch_service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8999)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Live status answered from the EventSub index versus a Helix lookup
+
+Usage:
+    python -m benchmarks.live_status_benchmark [--channels 50] [--events 200]
+        [--latency-ms 20]
+
+Tracks --channels channels through a LiveStatusMonitor connected to a
+FakeEventSubServer, then reports:
+
+    startup     time to connect, subscribe and seed every channel
+    lookup      per-call latency of an index lookup (what get_live_status
+                does for a tracked channel) and of a one-channel Helix
+                get_streams request with the fake server's added latency
+    propagation time from the server sending stream.online/offline until
+                the index shows the new state
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+from benchmarks.fake_eventsub import FakeEventSubServer
+from src.services.live_status import LiveStatusMonitor
+from src.services.twitch_api import TwitchService
+from src.utils.logging_config import logger
+
+
+def summarize(name: str, latencies: list[float], unit: str = "us") -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:>12}: p50 {quantiles[49]:9.1f} {unit}  p99 {quantiles[98]:9.1f} {unit}  "
+        f"max {max(latencies):9.1f} {unit}"
+    )
+
+
+def index_lookups(
+    monitor: LiveStatusMonitor, logins: list[str], calls: int
+) -> list[float]:
+    latencies = []
+    for i in range(calls):
+        started = time.perf_counter()
+        known, _ = monitor.lookup([logins[i % len(logins)]])
+        [status.to_dict() for status in known.values()]
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return latencies
+
+
+async def helix_lookups(
+    twitch_service: TwitchService, logins: list[str], calls: int
+) -> list[float]:
+    latencies = []
+    for i in range(calls):
+        started = time.perf_counter()
+        await twitch_service.get_users_performance([logins[i % len(logins)]])
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return latencies
+
+
+async def propagation(
+    server: FakeEventSubServer,
+    monitor: LiveStatusMonitor,
+    logins: list[str],
+    events: int,
+) -> list[float]:
+    """Milliseconds until a sent online/offline event is visible in the index"""
+    delays = []
+    for i in range(events):
+        login = logins[i % len(logins)]
+        was_live = monitor.index.get(login).is_live
+        started = time.perf_counter()
+        if was_live:
+            await server.send_stream_offline(login)
+        else:
+            await server.send_stream_online(login)
+        while monitor.index.get(login).is_live == was_live:
+            await asyncio.sleep(0.0005)
+        delays.append((time.perf_counter() - started) * 1000)
+    return delays
+
+
+async def run(args: argparse.Namespace):
+    # Keep per-event and per-request log lines out of the measurement
+    logger.setLevel(logging.WARNING)
+    server = FakeEventSubServer(port=args.port, latency=args.latency_ms / 1000)
+    async with server:
+        os.environ.update(server.env())
+        twitch_service = TwitchService()
+        logins = [f"streamer_{i}" for i in range(args.channels)]
+        monitor = LiveStatusMonitor(
+            twitch_service,
+            channels=logins,
+            user_token="fake-user-token",
+            websocket_url=server.websocket_url,
+        )
+
+        started = time.perf_counter()
+        await monitor.start()
+        print(
+            f"{'startup':>12}: {time.perf_counter() - started:.2f} s for "
+            f"{len(monitor.tracked)} channels ({server.stats()['subscriptions']} "
+            f"subscriptions, {len(monitor.failed)} failed)"
+        )
+
+        summarize("index", index_lookups(monitor, logins, args.lookups))
+        summarize(
+            "helix", await helix_lookups(twitch_service, logins, args.helix_lookups)
+        )
+        summarize(
+            "propagation",
+            await propagation(server, monitor, logins, args.events),
+            unit="ms",
+        )
+
+        await monitor.stop()
+        await twitch_service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--helix-lookups", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8999)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
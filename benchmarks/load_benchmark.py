@@ -0,0 +1,364 @@
+"""Load test of the MCP tools and the database against a fake Twitch backend
+
+Usage:
+    python -m benchmarks.load_benchmark [--concurrency 1 4 16 64] [--calls 200]
+        [--latency-ms 20] [--error-rate 0.0] [--page-size 100]
+        [--db-rows 1000 10000 100000] [--output results.json]
+        [--baseline previous.json] [--tolerance 0.2]
+
+Two parts, each against a temporary SQLite file:
+
+    tools       the real tools of src.main, called through an in-memory MCP
+                client against a FakeHelixServer. Every tool runs --calls
+                times at each --concurrency level and reports calls/s and
+                p50/p95/p99 latency. Tool errors (e.g. injected 5xx that
+                outlast the retries) are counted, not raised.
+    database    DatabaseService filled to each --db-rows size (10M rows takes
+                a few minutes), reporting insert rows/s, then full page scans
+                in rows/s and channel lookups and viewer history in queries/s
+
+Pass no values to --tools or --db-rows to skip that part. --output writes
+the results as JSON together with the commit, Python version and settings.
+--baseline compares this run with such a file and exits with status 1 when
+a throughput or rate dropped, or a p95 latency grew, by more than
+--tolerance, so two commits can be compared on the same machine.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from benchmarks.fake_helix import FakeHelixServer
+from src.db.database import DatabaseService
+from src.models import StreamSnapshot
+from src.utils.logging_config import logger
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+CHANNELS = 1_000
+INSERT_BATCH = 10_000
+SCAN_PAGE = 1_000
+SCAN_PAGES = 50
+LOOKUPS = 200
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _logins(count: int) -> list[str]:
+    # The fake server has even-numbered channels live
+    return random.sample([f"streamer_{i}" for i in range(0, 400, 2)], count)
+
+
+# Tool name -> arguments of one call
+WORKLOADS = {
+    "get_trending_channels": lambda: {"limit": 100},
+    "get_top_games": lambda: {"limit": 20},
+    "get_top_games_live": lambda: {"limit": 10, "max_streams": 500},
+    "get_channel_current_performance": lambda: {"user_login": _logins(1)[0]},
+    "get_channels_current_performance": lambda: {"user_logins": _logins(20)},
+    "get_stream_snapshots_from_db": lambda: {"limit": 100},
+    "get_channel_viewer_history": lambda: {"user_login": _logins(1)[0]},
+    "get_storage_stats": lambda: {},
+}
+
+
+def latency_summary(latencies: list[float]) -> dict:
+    """p50/p95/p99 of latencies in milliseconds"""
+    if len(latencies) < 2:
+        latencies = latencies * 2 or [0.0, 0.0]
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "p50_ms": round(quantiles[49], 2),
+        "p95_ms": round(quantiles[94], 2),
+        "p99_ms": round(quantiles[98], 2),
+    }
+
+
+async def load_tool(client, tool: str, concurrency: int, calls: int) -> dict:
+    """Run calls of tool with concurrency callers in flight"""
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(calls))
+
+    async def caller():
+        nonlocal errors
+        for _ in remaining:
+            arguments = WORKLOADS[tool]()
+            started = time.perf_counter()
+            result = await client.call_tool(tool, arguments, raise_on_error=False)
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += result.is_error
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "tool": tool,
+        "concurrency": concurrency,
+        "calls": calls,
+        "errors": errors,
+        "calls_per_s": round(calls / elapsed, 1),
+        **latency_summary(latencies),
+    }
+
+
+async def run_tools(args: argparse.Namespace, db_path: str) -> list[dict]:
+    server = FakeHelixServer(
+        port=args.port,
+        rate_limit=args.rate_limit,
+        latency=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        page_size=args.page_size,
+        stream_count=args.streams,
+    )
+    async with server:
+        os.environ.update(server.env())
+        os.environ["TWITCH_RATE_LIMIT"] = str(args.rate_limit)
+        os.environ["TWITCH_ANALYTICS_DB"] = db_path
+        if args.cache_ttl is not None:
+            for endpoint in ("STREAMS", "TOP_GAMES", "USER_STREAM"):
+                os.environ[f"TWITCH_CACHE_TTL_{endpoint}"] = str(args.cache_ttl)
+
+        from fastmcp import Client
+        from src.main import mcp
+
+        results = []
+        async with Client(mcp) as client:
+            # Token handshake and first-use setup stay out of the numbers
+            for tool in args.tools:
+                await client.call_tool(tool, WORKLOADS[tool](), raise_on_error=False)
+
+            print(
+                f"{'tool':<34} {'conc':>4} {'calls/s':>8} {'p50 ms':>8} "
+                f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>6}"
+            )
+            for tool in args.tools:
+                for concurrency in args.concurrency:
+                    result = await load_tool(client, tool, concurrency, args.calls)
+                    results.append(result)
+                    print(
+                        f"{tool:<34} {concurrency:>4} {result['calls_per_s']:>8.1f} "
+                        f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+                        f"{result['p99_ms']:>8.1f} {result['errors']:>6}"
+                    )
+        print(f"fake Helix: {server.stats()}")
+    return results
+
+
+def make_batch(start: int, count: int) -> list[StreamSnapshot]:
+    """Snapshots start..start+count, CHANNELS streams observed once a minute"""
+    batch = []
+    for i in range(start, start + count):
+        channel = i % CHANNELS
+        batch.append(
+            StreamSnapshot(
+                user_login=f"channel_{channel}",
+                user_name=f"Channel_{channel}",
+                viewer_count=(i * 37) % 50_000,
+                game_name=f"Game {channel % 40}",
+                game_id=str(channel % 40),
+                title=f"Stream title {channel}",
+                timestamp=START + timedelta(minutes=i // CHANNELS),
+                language="en",
+                stream_id=str(channel + 1),
+                started_at=START,
+            )
+        )
+    return batch
+
+
+def run_database(sizes: list[int], workdir: str) -> list[dict]:
+    results = []
+    print(
+        f"{'rows':>10} {'insert rows/s':>14} {'scan rows/s':>12} "
+        f"{'lookups/s':>10} {'history/s':>10}"
+    )
+    for size in sizes:
+        db_path = Path(workdir) / f"rows_{size}.db"
+        db_service = DatabaseService(str(db_path))
+
+        # Building the models is not part of the insert rate
+        insert_seconds = 0.0
+        for start in range(0, size, INSERT_BATCH):
+            batch = make_batch(start, min(INSERT_BATCH, size - start))
+            started = time.perf_counter()
+            db_service.insert_stream_snapshots(batch)
+            insert_seconds += time.perf_counter() - started
+
+        scanned = 0
+        cursor = None
+        started = time.perf_counter()
+        for _ in range(SCAN_PAGES):
+            page, cursor = db_service.query_streams(
+                limit=SCAN_PAGE, cursor=cursor, records=True
+            )
+            scanned += len(page)
+            if cursor is None:
+                break
+        scan_seconds = time.perf_counter() - started
+
+        logins = [f"channel_{random.randrange(CHANNELS)}" for _ in range(LOOKUPS)]
+        started = time.perf_counter()
+        for login in logins:
+            db_service.query_streams(limit=100, records=True, user_login=login)
+        lookup_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for login in logins:
+            db_service.get_channel_viewer_history(login, resolution="hour")
+        history_seconds = time.perf_counter() - started
+
+        db_service.close()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+        result = {
+            "rows": size,
+            "insert_rows_per_s": round(size / insert_seconds),
+            "scan_rows_per_s": round(scanned / scan_seconds),
+            "lookups_per_s": round(LOOKUPS / lookup_seconds, 1),
+            "history_queries_per_s": round(LOOKUPS / history_seconds, 1),
+        }
+        results.append(result)
+        print(
+            f"{size:>10} {result['insert_rows_per_s']:>14,} "
+            f"{result['scan_rows_per_s']:>12,} {result['lookups_per_s']:>10,.1f} "
+            f"{result['history_queries_per_s']:>10,.1f}"
+        )
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print metric changes against a baseline; returns the regressed metrics"""
+    # Metric -> True if higher is better
+    metrics = {
+        "calls_per_s": True,
+        "p95_ms": False,
+        "insert_rows_per_s": True,
+        "scan_rows_per_s": True,
+        "lookups_per_s": True,
+        "history_queries_per_s": True,
+    }
+    keys = {"tools": ("tool", "concurrency"), "database": ("rows",)}
+    regressions = []
+    print(f"Compared with {baseline.get('commit') or 'baseline'}:")
+    if baseline.get("settings") != current["settings"]:
+        print("  (settings differ, so changes may not be regressions)")
+    for section, key in keys.items():
+        before = {tuple(r[k] for k in key): r for r in baseline.get(section, [])}
+        for result in current[section]:
+            previous = before.get(tuple(result[k] for k in key))
+            if previous is None:
+                continue
+            for metric, higher_is_better in metrics.items():
+                if metric not in result or not previous.get(metric):
+                    continue
+                change = result[metric] / previous[metric] - 1
+                worse = -change if higher_is_better else change
+                name = f"{'/'.join(str(result[k]) for k in key)} {metric}"
+                regressed = worse > tolerance
+                print(
+                    f"  {name:<50} {previous[metric]:>12} -> {result[metric]:>12} "
+                    f"({change:+.0%}){'  REGRESSION' if regressed else ''}"
+                )
+                if regressed:
+                    regressions.append(name)
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict:
+    # Keep per-call log lines out of the measurement
+    logger.setLevel(logging.WARNING)
+    random.seed(args.seed)
+    report = {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {
+            k: v for k, v in vars(args).items() if k not in ("output", "baseline")
+        },
+        "tools": [],
+        "database": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.tools:
+            report["tools"] = await run_tools(args, str(Path(workdir) / "tools.db"))
+        if args.db_rows:
+            report["database"] = await asyncio.to_thread(
+                run_database, args.db_rows, workdir
+            )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--tools", nargs="*", choices=sorted(WORKLOADS), default=list(WORKLOADS)
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument(
+        "--calls", type=int, default=200, help="calls per tool and level"
+    )
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--streams", type=int, default=5_000)
+    parser.add_argument(
+        "--rate-limit", type=int, default=100_000, help="Helix requests per minute"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        help="response cache TTL in seconds (default: server's)",
+    )
+    parser.add_argument(
+        "--db-rows", type=int, nargs="*", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Results written to {args.output}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(
+                f"{len(regressions)} metrics regressed by more than {args.tolerance:.0%}"
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
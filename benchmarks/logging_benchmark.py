@@ -0,0 +1,99 @@
+"""Per-call cost of logging with direct handlers versus the queue pipeline
+
+Usage:
+    python -m benchmarks.logging_benchmark [--messages 50000]
+
+"direct" attaches a FileHandler and a stream handler to the logger like the
+original setup_logger, so every call formats and writes on the caller's
+thread. "queued" uses setup_logger's QueueHandler, leaving formatting and
+I/O to the listener thread. Also compares a disabled DEBUG call written as
+an f-string and with lazy %-style arguments.
+"""
+
+import argparse
+import atexit
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.utils.logging_config import TEXT_FORMAT, setup_logger
+
+
+def measure(logger: logging.Logger, messages: int) -> list[float]:
+    """Microseconds spent in each logger.info call"""
+    latencies = []
+    for i in range(messages):
+        started = time.perf_counter()
+        logger.info("Inserted %s stream snapshots for %s", i, "channel")
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return latencies
+
+
+def direct_logger(log_file: Path, devnull) -> logging.Logger:
+    logger = logging.getLogger("benchmark.direct")
+    logger.setLevel(logging.INFO)
+    formatter = logging.Formatter(TEXT_FORMAT)
+    for handler in (logging.StreamHandler(devnull), logging.FileHandler(log_file)):
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    logger.propagate = False
+    return logger
+
+
+def disabled_cost(logger: logging.Logger, calls: int) -> tuple[float, float]:
+    """Nanoseconds per disabled debug call, f-string versus lazy arguments"""
+    rows, login = 100, "channel"
+    started = time.perf_counter()
+    for _ in range(calls):
+        logger.debug(f"Inserted {rows} stream snapshots for {login}")
+    eager = (time.perf_counter() - started) / calls * 1e9
+    started = time.perf_counter()
+    for _ in range(calls):
+        logger.debug("Inserted %s stream snapshots for %s", rows, login)
+    lazy = (time.perf_counter() - started) / calls * 1e9
+    return eager, lazy
+
+
+def summarize(name: str, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=1000)
+    print(
+        f"{name:>7}: p50 {quantiles[499]:6.1f} us  p99 {quantiles[989]:6.1f} us  "
+        f"p99.9 {quantiles[998]:7.1f} us  max {max(latencies):8.1f} us"
+    )
+
+
+def run(messages: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        direct = direct_logger(Path(tmp) / "direct.log", devnull)
+        summarize("direct", measure(direct, messages))
+
+        os.environ["LOG_FILE"] = str(Path(tmp) / "queued.log")
+        # The listener's console handler binds sys.stderr when created
+        stderr, sys.stderr = sys.stderr, devnull
+        try:
+            queued = setup_logger("benchmark.queued")
+        finally:
+            sys.stderr = stderr
+        summarize("queued", measure(queued, messages))
+
+        eager, lazy = disabled_cost(queued, messages)
+        # Let the listener drain before devnull and the log file go away
+        listener = queued.handlers[0].listener
+        listener.stop()
+        atexit.unregister(listener.stop)
+        print(f"disabled debug call: f-string {eager:.0f} ns, lazy {lazy:.0f} ns")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50_000)
+    args = parser.parse_args()
+    run(args.messages)
+
+
+if __name__ == "__main__":
+    main()
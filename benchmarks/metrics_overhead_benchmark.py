@@ -0,0 +1,69 @@
+"""Cost of the metrics instrumentation on a trivial tool call
+
+Usage:
+    python -m benchmarks.metrics_overhead_benchmark [--calls 200000]
+
+Times a no-op coroutine called bare, through handle_mcp_exceptions with
+metrics disabled, and with metrics enabled. The instrumented tool opens two
+stage spans and bumps a counter, like a typical tool call does, so the
+difference is the per-call price of tracing.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from src.decorators.mcp_exceptions import handle_mcp_exceptions
+from src.utils.logging_config import logger
+from src.utils.metrics import metrics
+
+
+async def bare_tool() -> dict:
+    return {"ok": True}
+
+
+@handle_mcp_exceptions
+async def instrumented_tool() -> dict:
+    with metrics.span("twitch.example"):
+        with metrics.span("helix.example"):
+            metrics.inc("twitch_mcp_helix_requests_total", endpoint="example")
+    return {"ok": True}
+
+
+async def time_calls(tool, calls: int) -> float:
+    """Nanoseconds per call, best of three runs"""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(calls):
+            await tool()
+        best = min(best, time.perf_counter() - started)
+    return best / calls * 1e9
+
+
+async def run(calls: int) -> None:
+    # Keep the per-call trace log line out of the measurement
+    logger.setLevel(logging.WARNING)
+
+    bare = await time_calls(bare_tool, calls)
+    metrics.enabled = False
+    disabled = await time_calls(instrumented_tool, calls)
+    metrics.enabled = True
+    enabled = await time_calls(instrumented_tool, calls)
+    metrics.enabled = False
+
+    print(f"bare coroutine:    {bare:8.0f} ns/call")
+    print(f"metrics disabled:  {disabled:8.0f} ns/call (+{disabled - bare:.0f} ns)")
+    print(f"metrics enabled:   {enabled:8.0f} ns/call (+{enabled - bare:.0f} ns)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Rank movers and rank history: leaderboard polls versus raw snapshots
+
+Usage:
+    python -m benchmarks.rank_benchmark [--polls 288] [--streams 500]
+
+Stores --polls polls of the top --streams streams (a day of 5-minute
+collector cycles by default) both as snapshots and as rank polls, then
+answers the same two questions each way:
+
+    movers      rank change of every stream between the first and last poll
+    history     one stream's rank in every poll
+
+"raw" derives ranks from stream_snapshots with ROW_NUMBER() over each
+observation time, as it would have to without rank polls; "polls" uses
+get_rank_changes and get_rank_history.
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.db.database import DatabaseService, to_epoch
+from src.models import StreamSnapshot
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+POLL_INTERVAL = timedelta(minutes=5)
+
+RAW_RANKS_QUERY = """
+    SELECT user_login, ROW_NUMBER() OVER (ORDER BY viewer_count DESC)
+    FROM stream_snapshot_details WHERE timestamp = ?
+"""
+
+RAW_HISTORY_QUERY = """
+    SELECT timestamp, rank FROM (
+        SELECT timestamp, user_login,
+               ROW_NUMBER() OVER (PARTITION BY timestamp ORDER BY viewer_count DESC)
+                   AS rank
+        FROM stream_snapshot_details
+        WHERE timestamp >= ? AND timestamp < ?
+    )
+    WHERE user_login = ?
+    ORDER BY timestamp
+"""
+
+
+def fill(db_service: DatabaseService, polls: int, streams: int, rng: random.Random):
+    """Store each poll as snapshots and as a rank poll; viewers drift randomly"""
+    viewers = [int(100_000 / (i + 1)) for i in range(streams)]
+    for poll in range(polls):
+        observed_at = START + poll * POLL_INTERVAL
+        viewers = [max(1, int(v * rng.uniform(0.9, 1.1))) for v in viewers]
+        page = sorted(
+            (
+                StreamSnapshot(
+                    user_login=f"streamer_{i}",
+                    user_name=f"Streamer_{i}",
+                    viewer_count=v,
+                    game_name="Game",
+                    game_id="1",
+                    title=f"Stream {i}",
+                    timestamp=observed_at,
+                    stream_id=str(i + 1),
+                    started_at=START,
+                )
+                for i, v in enumerate(viewers)
+            ),
+            key=lambda s: -s.viewer_count,
+        )
+        db_service.insert_stream_snapshots(page)
+        db_service.insert_rank_snapshot(
+            "streams", observed_at, [(s.user_login, s.user_name) for s in page]
+        )
+
+
+def raw_movers(db_service: DatabaseService, first: datetime, last: datetime) -> int:
+    cursor = db_service.connection.cursor()
+    before = dict(cursor.execute(RAW_RANKS_QUERY, (to_epoch(first),)).fetchall())
+    after = dict(cursor.execute(RAW_RANKS_QUERY, (to_epoch(last),)).fetchall())
+    return sum(1 for login in before if login in after)
+
+
+def raw_history(db_service: DatabaseService, login: str, until: datetime) -> int:
+    rows = (
+        db_service.connection.cursor()
+        .execute(RAW_HISTORY_QUERY, (to_epoch(START), to_epoch(until), login))
+        .fetchall()
+    )
+    return len(rows)
+
+
+def timed(name: str, func, repeat: int) -> None:
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"{name:>16}: median {statistics.median(latencies):9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=288)
+    parser.add_argument("--streams", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_service = DatabaseService(str(Path(tmp) / "ranks.db"))
+        started = time.perf_counter()
+        fill(db_service, args.polls, args.streams, rng)
+        print(
+            f"Stored {args.polls} polls of {args.streams} streams "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        last = START + (args.polls - 1) * POLL_INTERVAL
+        until = last + POLL_INTERVAL
+        login = f"streamer_{args.streams // 2}"
+
+        timed("raw movers", lambda: raw_movers(db_service, START, last), args.repeat)
+        timed(
+            "polls movers",
+            lambda: db_service.get_rank_changes("streams", START, until),
+            args.repeat,
+        )
+        timed("raw history", lambda: raw_history(db_service, login, until), args.repeat)
+        timed(
+            "polls history",
+            lambda: db_service.get_rank_history("streams", login, START, until),
+            args.repeat,
+        )
+        db_service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Compare decoding stored snapshots into pydantic models versus records
+
+Usage:
+    python -m benchmarks.row_decoding_benchmark [--rows 200000]
+
+Times iter_streams in model and record mode, both bare and including the
+conversion to the dicts get_stream_snapshots_from_db returns, next to the
+cost of the SQL query alone.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.db.database import DatabaseService
+
+CHANNELS = 2_000
+GAMES = 200
+START = 1_704_067_200  # 2024-01-01 UTC
+
+
+def fill(db_service: DatabaseService, rows: int) -> None:
+    """Insert synthetic rows straight into the normalized tables"""
+    cursor = db_service.connection.cursor()
+    with db_service.connection:
+        cursor.executemany(
+            "INSERT INTO channels(id, user_login, user_name) VALUES (?, ?, ?)",
+            ((i, f"channel_{i}", f"Channel_{i}") for i in range(1, CHANNELS + 1)),
+        )
+        cursor.executemany(
+            "INSERT INTO games(id, game_id, game_name) VALUES (?, ?, ?)",
+            ((i, str(i), f"Game {i}") for i in range(1, GAMES + 1)),
+        )
+        cursor.executemany(
+            "INSERT INTO titles(id, title) VALUES (?, ?)",
+            ((i, f"Stream title {i}") for i in range(1, CHANNELS + 1)),
+        )
+        cursor.executemany(
+            """INSERT INTO stream_snapshots
+               (channel_id, game_key, title_id, viewer_count, timestamp, language)
+               VALUES (?, ?, ?, ?, ?, 'en')""",
+            (
+                (
+                    i % CHANNELS + 1,
+                    i % GAMES + 1,
+                    i % CHANNELS + 1,
+                    (i * 37) % 50_000,
+                    START + (i // CHANNELS) * 300,
+                )
+                for i in range(rows)
+            ),
+        )
+
+
+def model_dict(s) -> dict:
+    """Response shape as the tool built it from StreamSnapshot models"""
+    return {
+        "user": s.user_name,
+        "viewers": s.viewer_count,
+        "game": s.game_name,
+        "title": s.title,
+        "language": s.language,
+        "is_live": s.is_live,
+        "timestamp": str(s.timestamp),
+    }
+
+
+def timed(func, repeat: int = 3) -> float:
+    """Best wall time of func over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_service = DatabaseService(str(Path(tmp) / "bench.db"))
+        fill(db_service, rows)
+        cursor = db_service.connection.cursor()
+
+        results = {
+            "query only": timed(
+                lambda: cursor.execute(
+                    "SELECT * FROM stream_snapshot_details "
+                    "ORDER BY timestamp DESC, id DESC"
+                ).fetchall()
+            ),
+            "models": timed(lambda: list(db_service.iter_streams())),
+            "records": timed(lambda: list(db_service.iter_streams(records=True))),
+            "models -> dicts": timed(
+                lambda: [model_dict(s) for _, s in db_service.iter_streams()]
+            ),
+            "records -> dicts": timed(
+                lambda: [s.to_dict() for _, s in db_service.iter_streams(records=True)]
+            ),
+        }
+        db_service.close()
+
+    for name, seconds in results.items():
+        print(f"{name:>17}: {seconds:.2f}s ({rows / seconds:,.0f} rows/s)")
+    print(
+        f"speedup: {results['models'] / results['records']:.1f}x bare, "
+        f"{results['models -> dicts'] / results['records -> dicts']:.1f}x with dicts"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
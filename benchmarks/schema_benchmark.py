@@ -0,0 +1,144 @@
+"""Compare file size and query time of the legacy and normalized snapshot schemas
+
+Usage:
+    python -m benchmarks.schema_benchmark [--rows 1000000]
+
+Builds a synthetic version 1 (denormalized, ISO timestamp) database, times a
+few typical lookups, migrates it in place with DatabaseService and repeats
+the measurements on the normalized schema.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import apsw
+
+from src.db.database import DatabaseService
+from src.db.migrations import create_stream_snapshots
+
+CHANNELS = 5_000
+GAMES = 300
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+LEGACY_QUERIES = {
+    "channel, last 7 days": (
+        """SELECT * FROM stream_snapshots
+           WHERE user_login = ? AND timestamp >= ?
+           ORDER BY timestamp DESC LIMIT 100""",
+        "channel",
+    ),
+    "game, last 7 days": (
+        """SELECT * FROM stream_snapshots
+           WHERE game_id = ? AND timestamp >= ?
+           ORDER BY timestamp DESC LIMIT 100""",
+        "game",
+    ),
+}
+
+
+def build_legacy(db_path: Path, rows: int) -> datetime:
+    """Fill a version 1 database with synthetic snapshots, return the last time"""
+    connection = apsw.Connection(str(db_path))
+    cursor = connection.cursor()
+    create_stream_snapshots(cursor)
+    cursor.execute("PRAGMA user_version = 1")
+
+    def generate():
+        for i in range(rows):
+            channel = i % CHANNELS
+            game = (channel * 7) % GAMES
+            yield (
+                f"channel_{channel}",
+                f"Channel_{channel}",
+                (i * 37) % 50_000,
+                f"Game {game}",
+                str(game),
+                f"Playing game {game} with chat, day {i // (CHANNELS * 288)}",
+                (START + timedelta(minutes=5 * (i // CHANNELS))).isoformat(),
+                1,
+                "en",
+            )
+
+    with connection:
+        cursor.executemany(
+            """INSERT INTO stream_snapshots
+               (user_login, user_name, viewer_count, game_name, game_id,
+                title, timestamp, is_live, language)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            generate(),
+        )
+    connection.close()
+    return START + timedelta(minutes=5 * ((rows - 1) // CHANNELS))
+
+
+def time_call(func, repeat: int = 20) -> float:
+    """Average wall time of func in milliseconds"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def run(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        print(f"Building {rows:,} legacy rows...")
+        last = build_legacy(db_path, rows)
+        since = last - timedelta(days=7)
+        legacy_size = os.path.getsize(db_path)
+
+        connection = apsw.Connection(str(db_path))
+        cursor = connection.cursor()
+        args = {"channel": "channel_42", "game": "42"}
+        legacy_times = {
+            name: time_call(
+                lambda q=query, a=args[kind]: cursor.execute(
+                    q, (a, since.isoformat())
+                ).fetchall()
+            )
+            for name, (query, kind) in LEGACY_QUERIES.items()
+        }
+        connection.close()
+
+        started = time.perf_counter()
+        db_service = DatabaseService(str(db_path))
+        migrate_seconds = time.perf_counter() - started
+        db_service.connection.cursor().execute("VACUUM")
+        db_service.connection.cursor().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        new_size = os.path.getsize(db_path)
+
+        new_times = {
+            "channel, last 7 days": time_call(
+                lambda: list(
+                    db_service.iter_streams(
+                        user_login="channel_42", since=since, limit=100
+                    )
+                )
+            ),
+            "game, last 7 days": time_call(
+                lambda: list(
+                    db_service.iter_streams(game_id="42", since=since, limit=100)
+                )
+            ),
+        }
+        db_service.close()
+
+    print(f"migration: {migrate_seconds:.1f}s")
+    print(f"file size: {legacy_size / 2**20:.1f} MiB -> {new_size / 2**20:.1f} MiB")
+    for name in LEGACY_QUERIES:
+        print(f"{name}: {legacy_times[name]:.2f} ms -> {new_times[name]:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Sharded collector throughput by number of worker processes
+
+Usage:
+    python -m benchmarks.sharded_collector_benchmark [--channels 20000]
+        [--shards 1 2 4] [--cycles 3] [--latency-ms 20] [--port 8998]
+
+Tracks --channels logins against benchmarks/fake_helix.py, which runs in
+its own process (half of the channels are live). For each --shards value, a
+ShardedCollector polls every channel --cycles times back to back (interval
+0) into a fresh SQLite file, and the run reports wall time, Helix requests
+per second and snapshot rows written per second.
+
+The Helix rate limit is set high enough not to throttle, so the numbers
+show the CPU cost of fetching and decoding; with a real client id, shards
+share TWITCH_RATE_LIMIT and throughput stops scaling once requests reach
+it. Scaling needs as many free cores as shards, plus one for the fake
+server and one for the writer.
+"""
+
+import argparse
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.services.sharded_collector import ShardedCollector
+from src.utils.logging_config import logger
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Enough points per minute that neither side ever throttles
+UNTHROTTLED_RATE_LIMIT = 10_000_000
+
+
+def start_fake_helix(port: int, latency_ms: float) -> subprocess.Popen:
+    """Run the fake Helix server in its own process and wait until it listens"""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.fake_helix",
+            "--port",
+            str(port),
+            "--rate-limit",
+            str(UNTHROTTLED_RATE_LIMIT),
+            "--latency-ms",
+            str(latency_ms),
+        ],
+        cwd=REPO_ROOT,
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Fake Helix server did not start")
+
+
+def run_shards(channels: int, shards: int, cycles: int, workdir: str) -> dict:
+    collector = ShardedCollector(
+        [f"streamer_{i}" for i in range(channels)],
+        str(Path(workdir) / f"shards_{shards}.db"),
+        shards=shards,
+        interval=0,
+    )
+    started = time.perf_counter()
+    status = collector.run(cycles=cycles)
+    elapsed = time.perf_counter() - started
+    requests = sum(-(-len(p) // 100) for p in collector.partitions) * cycles
+    return {**status, "seconds": elapsed, "requests_per_second": requests / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=20_000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8998)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    fake_helix = start_fake_helix(args.port, args.latency_ms)
+    # Worker processes inherit these when they are spawned
+    os.environ.update(
+        {
+            "TWITCH_APP_ID": "fake-app-id",
+            "TWITCH_APP_SECRET": "fake-app-secret",
+            "TWITCH_API_BASE_URL": f"http://127.0.0.1:{args.port}/helix/",
+            "TWITCH_AUTH_BASE_URL": f"http://127.0.0.1:{args.port}/oauth2/",
+            "TWITCH_RATE_LIMIT": str(UNTHROTTLED_RATE_LIMIT),
+            "LOG_FILE": "",
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    print(f"{args.channels} channels, {args.cycles} cycles, {os.cpu_count()} CPUs")
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            baseline = None
+            for shards in args.shards:
+                result = run_shards(args.channels, shards, args.cycles, workdir)
+                rows_per_second = result["rows_written"] / result["seconds"]
+                baseline = baseline or rows_per_second
+                print(
+                    f"{shards:>3} shards: {result['seconds']:7.2f}s  "
+                    f"{result['requests_per_second']:7.1f} requests/s  "
+                    f"{rows_per_second:9.0f} rows/s  "
+                    f"x{rows_per_second / baseline:.2f}  "
+                    f"(write {result['write_seconds']:.2f}s, "
+                    f"{result['cycles_failed']} failed cycles)"
+                )
+    finally:
+        fake_helix.terminate()
+        fake_helix.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Cold start of the MCP server process, checked against a time budget
+
+Usage:
+    python -m benchmarks.startup_benchmark [--runs 5] [--import-budget-ms 1300]
+        [--response-budget-ms 1700]
+
+MCP clients start `python -m src.main` once per session, so this is the
+wait before a session's first tool call gets its answer. Two measurements, each the
+median of --runs fresh processes:
+
+    import      cumulative `-X importtime` of src.main, with the slowest
+                packages our modules import directly
+    response    from spawning the server until the reply to a tools/call
+                of get_storage_stats over stdio (initialize handshake and
+                a first database read included)
+
+Each run uses an empty working directory and database. The Twitch
+endpoints point at a closed local port, so the background token handshake
+fails fast instead of reaching the network. Exits with status 1 when a
+median exceeds its budget, so the check can guard against regressions.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Medians on a single-core CI runner, with some headroom
+DEFAULT_IMPORT_BUDGET_MS = 1300
+DEFAULT_RESPONSE_BUDGET_MS = 1700
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+MESSAGES = (
+    {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "startup-benchmark", "version": "0"},
+        },
+    },
+    {"jsonrpc": "2.0", "method": "notifications/initialized"},
+    {
+        "jsonrpc": "2.0",
+        "id": 2,
+        "method": "tools/call",
+        "params": {"name": "get_storage_stats", "arguments": {}},
+    },
+)
+
+
+def server_env(workdir: str) -> dict[str, str]:
+    return {
+        **os.environ,
+        "PYTHONPATH": str(REPO_ROOT),
+        "TWITCH_APP_ID": "benchmark",
+        "TWITCH_APP_SECRET": "benchmark",
+        "TWITCH_API_BASE_URL": "http://127.0.0.1:9/helix/",
+        "TWITCH_AUTH_BASE_URL": "http://127.0.0.1:9/oauth2/",
+        "TWITCH_ANALYTICS_DB": str(Path(workdir) / "startup.db"),
+    }
+
+
+def import_times() -> tuple[float, dict[str, float]]:
+    """Cumulative milliseconds for src.main and for each package it imports"""
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import src.main"],
+            cwd=workdir,
+            env=server_env(workdir),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    total = 0.0
+    packages: dict[str, float] = {}
+    # importtime lists a module after everything it imported; walking the
+    # lines backwards visits parents first
+    parents: list[tuple[int, str]] = []
+    for line in reversed(result.stderr.splitlines()):
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        depth = len(match.group(3))
+        name = match.group(4)
+        if name == "src.main":
+            total = cumulative_ms
+        top = name.split(".")[0]
+        while parents and parents[-1][0] >= depth:
+            parents.pop()
+        # Count packages where our own code (or the interpreter) imports them
+        if top != "src" and (not parents or parents[-1][1] == "src"):
+            packages[top] = packages.get(top, 0.0) + cumulative_ms
+        parents.append((depth, top))
+    return total, packages
+
+
+async def first_response() -> float:
+    """Milliseconds from spawning the server to its first tools/call reply"""
+    with tempfile.TemporaryDirectory() as workdir:
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "src.main",
+            cwd=workdir,
+            env=server_env(workdir),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        for message in MESSAGES:
+            process.stdin.write(json.dumps(message).encode() + b"\n")
+        await process.stdin.drain()
+
+        elapsed = None
+        while elapsed is None:
+            line = await asyncio.wait_for(process.stdout.readline(), timeout=60)
+            if not line:
+                raise RuntimeError("Server exited before answering the tool call")
+            reply = json.loads(line)
+            if reply.get("id") == 2:
+                elapsed = (time.perf_counter() - started) * 1000
+                if "error" in reply or reply["result"].get("isError"):
+                    raise RuntimeError(f"Tool call failed: {reply}")
+
+        process.stdin.close()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+        return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--import-budget-ms", type=float, default=DEFAULT_IMPORT_BUDGET_MS
+    )
+    parser.add_argument(
+        "--response-budget-ms", type=float, default=DEFAULT_RESPONSE_BUDGET_MS
+    )
+    args = parser.parse_args()
+
+    imports = [import_times() for _ in range(args.runs)]
+    import_ms = statistics.median(total for total, _ in imports)
+    slowest = sorted(imports[-1][1].items(), key=lambda item: -item[1])[:8]
+    print(
+        f"import src.main: {import_ms:7.1f} ms (budget {args.import_budget_ms:.0f} ms)"
+    )
+    for name, cumulative_ms in slowest:
+        print(f"  {name:<24} {cumulative_ms:7.1f} ms")
+
+    responses = [asyncio.run(first_response()) for _ in range(args.runs)]
+    response_ms = statistics.median(responses)
+    print(
+        f"first tool reply: {response_ms:7.1f} ms (budget {args.response_budget_ms:.0f} ms, "
+        f"min {min(responses):.1f}, max {max(responses):.1f})"
+    )
+
+    over = []
+    if import_ms > args.import_budget_ms:
+        over.append("import")
+    if response_ms > args.response_budget_ms:
+        over.append("first tool reply")
+    if over:
+        print(f"Over budget: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Exercise TwitchService rate limiting and retries against a throttling fake Helix
+
+Usage:
+    python -m benchmarks.throttle_benchmark [--requests 200] [--rate-limit 120]
+        [--error-rate 0.1]
+
+Fires concurrent single-channel lookups at a FakeHelixServer whose bucket is
+smaller than the burst, once with retries disabled and once with the default
+policy, and reports how many calls succeeded and how many 429/5xx responses
+the server had to send.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.fake_helix import FakeHelixServer
+from src.services.twitch_api import TwitchService
+from src.utils.exceptions import ResourceNotFoundError
+
+
+async def run_scenario(args: argparse.Namespace, max_retries: int) -> dict:
+    server = FakeHelixServer(
+        port=args.port, rate_limit=args.rate_limit, error_rate=args.error_rate
+    )
+    async with server:
+        os.environ.update(server.env())
+        os.environ["TWITCH_MAX_RETRIES"] = str(max_retries)
+        os.environ["TWITCH_REQUEST_DEADLINE"] = str(args.deadline)
+        # Even logins are live on the fake server
+        logins = [f"streamer_{2 * i}" for i in range(args.requests)]
+
+        twitch_service = TwitchService()
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(twitch_service.get_user_performance(login) for login in logins),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - started
+        await twitch_service.close()
+
+    failures = [
+        r
+        for r in results
+        if isinstance(r, Exception) and not isinstance(r, ResourceNotFoundError)
+    ]
+    return {
+        "max_retries": max_retries,
+        "succeeded": len(results) - len(failures),
+        "failed": len(failures),
+        "client_retries": twitch_service.retry_policy.retries,
+        "limiter_waits": twitch_service.rate_limiter.waits,
+        "elapsed_seconds": round(elapsed, 2),
+        **{f"server_{k}": v for k, v in server.stats().items()},
+    }
+
+
+async def run(args: argparse.Namespace):
+    for max_retries in (0, args.max_retries):
+        print(await run_scenario(args, max_retries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--rate-limit", type=int, default=120)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--max-retries", type=int, default=4)
+    parser.add_argument("--deadline", type=float, default=120.0)
+    parser.add_argument("--port", type=int, default=8999)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Title search: FTS5 index versus filtering every snapshot in Python
+
+Usage:
+    python -m benchmarks.title_search_benchmark [--rows 1000000] [--repeat 10]
+
+Fills a database with --rows snapshots over two weeks: 2,000 channels, each
+with a few titles a day drawn from a mix of words. Then it looks for the
+channels with the most viewers in the last 7 days whose titles mention
+"speedrun" or "tournament":
+
+    python   get_all_streams and a substring check per snapshot (the
+             approach the search tool replaces; run once)
+    fts      search_titles, ordered by peak viewers
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.db.database import DatabaseService
+from src.models import StreamSnapshot
+
+CHANNELS = 2_000
+BATCH = 20_000
+WORDS = (
+    "chill",
+    "ranked",
+    "grind",
+    "road",
+    "to",
+    "diamond",
+    "chatting",
+    "games",
+    "viewer",
+    "day",
+    "drops",
+    "enabled",
+    "new",
+    "patch",
+    "first",
+    "playthrough",
+    "hardcore",
+    "modded",
+    "late",
+    "night",
+    "stream",
+    "practice",
+    "any%",
+)
+RARE_WORDS = ("speedrun", "tournament", "finals", "qualifier")
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+START = NOW - timedelta(days=14)
+
+
+def make_title(rng: random.Random) -> str:
+    words = rng.sample(WORDS, 5)
+    if rng.random() < 0.05:
+        words.insert(rng.randrange(5), rng.choice(RARE_WORDS))
+    return " ".join(words)
+
+
+def fill(db_service: DatabaseService, rows: int, rng: random.Random):
+    # Snapshot interval that spreads the rows over two weeks
+    step = (NOW - START) / (rows / CHANNELS)
+    titles = [make_title(rng) for _ in range(CHANNELS)]
+    batch = []
+    for i in range(rows):
+        channel = i % CHANNELS
+        poll = i // CHANNELS
+        if rng.random() < 0.01:
+            titles[channel] = make_title(rng)
+        batch.append(
+            StreamSnapshot(
+                user_login=f"channel_{channel}",
+                user_name=f"Channel_{channel}",
+                viewer_count=rng.randrange(50_000 // (channel + 1) + 10),
+                game_name="Game",
+                game_id="1",
+                title=titles[channel],
+                timestamp=START + poll * step,
+                stream_id=str(channel + 1),
+                started_at=START,
+            )
+        )
+        if len(batch) == BATCH:
+            db_service.insert_stream_snapshots(batch)
+            batch = []
+    db_service.insert_stream_snapshots(batch)
+
+
+def python_search(db_service: DatabaseService, since: datetime) -> list[tuple]:
+    peaks: dict[str, int] = {}
+    for snapshot in db_service.get_all_streams():
+        title = snapshot.title.lower()
+        if snapshot.timestamp >= since and (
+            "speedrun" in title or "tournament" in title
+        ):
+            peaks[snapshot.user_login] = max(
+                peaks.get(snapshot.user_login, 0), snapshot.viewer_count
+            )
+    return sorted(peaks.items(), key=lambda item: -item[1])[:20]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    since = NOW - timedelta(days=7)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_service = DatabaseService(str(Path(tmp) / "titles.db"))
+        started = time.perf_counter()
+        fill(db_service, args.rows, rng)
+        titles = (
+            db_service.connection.cursor()
+            .execute("SELECT COUNT(*) FROM titles")
+            .fetchall()[0][0]
+        )
+        print(
+            f"Stored {args.rows} snapshots with {titles} distinct titles "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        started = time.perf_counter()
+        expected = python_search(db_service, since)
+        print(f"{'python':>7}: {(time.perf_counter() - started) * 1000:10.1f} ms")
+
+        latencies = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results = db_service.search_titles(
+                "speedrun OR tournament", since=since, limit=20
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+        print(f"{'fts':>7}: {statistics.median(latencies):10.1f} ms (median)")
+
+        found = [(r.user_login, r.peak_viewers) for r in results]
+        print(f"Same top 20: {found == expected}")
+        db_service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Asyncio facade over DatabaseService for the MCP tools
+
+Writes go through a queue to one dedicated writer thread that owns its own
+connection. The writer drains everything that queued up while the previous
+transaction was committing and writes it as one transaction, so concurrent
+tool calls share a single commit (group commit) instead of contending for
+the write lock one by one.
+
+Reads run on a small pool of threads, each with its own read-only
+connection. In WAL mode they proceed in parallel with each other and with
+the writer.
+
+The writer thread opens its connection (and applies pending migrations)
+itself, so creating the facade does not block the event loop; readers wait
+for the schema before opening theirs.
+"""
+
+import asyncio
+import os
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from src.db.database import DatabaseService
+from src.models import StreamSnapshot
+from src.utils.logging_config import logger
+from src.utils.metrics import metrics
+
+# Readers hold the GIL while decoding rows, so more threads than cores only
+# starve the writer thread
+DEFAULT_READER_THREADS = min(4, os.cpu_count() or 1)
+
+# Upper bound of snapshots combined into one group commit
+DEFAULT_MAX_GROUP_ROWS = 5000
+
+
+class AsyncDatabaseService:
+    """Non-blocking access to the snapshot database from the event loop
+
+    Intended to be created once per process, like DatabaseService.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = DEFAULT_READER_THREADS,
+        max_group_rows: int = DEFAULT_MAX_GROUP_ROWS,
+    ):
+        self.db_path = db_path
+        self.max_group_rows = max_group_rows
+
+        self.commits = 0
+        self.writes = 0
+
+        # Opened by the writer thread, which applies any pending migrations
+        self._writer_db: DatabaseService | None = None
+        self._schema_ready = threading.Event()
+        self._open_error: Exception | None = None
+        self._writes: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="db-writer", daemon=True
+        )
+        self._writer.start()
+
+        self._local = threading.local()
+        self._reader_dbs: list[DatabaseService] = []
+        self._reader_lock = threading.Lock()
+        self._readers = ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix="db-reader"
+        )
+        self._closed = False
+
+    @classmethod
+    def from_env(cls, db_path: str):
+        """Build the facade with DB_READER_THREADS reader threads"""
+        return cls(
+            db_path,
+            readers=int(os.getenv("DB_READER_THREADS", str(DEFAULT_READER_THREADS))),
+        )
+
+    def close(self):
+        """Finish queued writes, then close every connection"""
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(None)
+        self._writer.join()
+        self._readers.shutdown(wait=True)
+        if self._writer_db is not None:
+            self._writer_db.close()
+        with self._reader_lock:
+            for db_service in self._reader_dbs:
+                db_service.close()
+            self._reader_dbs.clear()
+
+    async def insert_stream_snapshots(self, snapshots: list[StreamSnapshot]) -> int:
+        """Queue snapshots for the writer thread and wait for their commit
+
+        Returns:
+            Number of snapshots submitted
+
+        Raises:
+            DatabaseError: If the transaction holding these snapshots failed
+        """
+        if not snapshots:
+            return 0
+        future: Future = Future()
+        with metrics.span("db.write"):
+            self._writes.put((snapshots, future))
+            return await asyncio.wrap_future(future)
+
+    async def write(self, func: Callable, *args, **kwargs):
+        """Run func(db_service, *args, **kwargs) on the writer thread
+
+        Runs in queue order with snapshot writes, as its own transaction.
+
+        Args:
+            func: Callable taking a DatabaseService first, e.g. an unbound
+                DatabaseService method
+        """
+        future: Future = Future()
+        with metrics.span("db.write"):
+            self._writes.put((lambda db: func(db, *args, **kwargs), future))
+            return await asyncio.wrap_future(future)
+
+    def _open_writer(self) -> bool:
+        try:
+            self._writer_db = DatabaseService(self.db_path)
+        except Exception as e:
+            self._open_error = e
+        finally:
+            self._schema_ready.set()
+        return self._open_error is None
+
+    def _write_loop(self):
+        if not self._open_writer():
+            # Fail every write with the error until close()
+            while (job := self._writes.get()) is not None:
+                if job[1].set_running_or_notify_cancel():
+                    job[1].set_exception(self._open_error)
+            return
+
+        stopping = False
+        job = None
+        while not stopping:
+            if job is None:
+                job = self._writes.get()
+                if job is None:
+                    break
+            if callable(job[0]):
+                self._run_call(*job)
+                job = None
+                continue
+
+            # Whatever queued up during the last commit joins this one
+            group = [job]
+            rows = len(job[0])
+            job = None
+            while rows < self.max_group_rows:
+                try:
+                    job = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                if callable(job[0]):
+                    # Runs after this group, keeping queue order
+                    break
+                group.append(job)
+                rows += len(job[0])
+                job = None
+
+            # Callers that gave up waiting are dropped
+            group = [
+                (snapshots, future)
+                for snapshots, future in group
+                if future.set_running_or_notify_cancel()
+            ]
+            if group:
+                self._commit_group(group)
+
+    def _run_call(self, call: Callable, future: Future):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            with metrics.span("db.commit"):
+                result = call(self._writer_db)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        self.commits += 1
+        self.writes += 1
+        metrics.inc("twitch_mcp_db_commits_total")
+        future.set_result(result)
+
+    def _commit_group(self, group: list[tuple[list[StreamSnapshot], Future]]):
+        try:
+            with metrics.span("db.commit"):
+                written = self._writer_db.insert_stream_snapshots(
+                    [snapshot for snapshots, _ in group for snapshot in snapshots]
+                )
+        except Exception as e:
+            if len(group) == 1:
+                group[0][1].set_exception(e)
+                return
+            # Retry one by one so only the offending caller sees the error
+            logger.warning("Group commit of %s writes failed: %s", len(group), e)
+            for snapshots, future in group:
+                try:
+                    written = self._writer_db.insert_stream_snapshots(snapshots)
+                    self.commits += 1
+                    self.writes += 1
+                    metrics.inc("twitch_mcp_db_commits_total")
+                    metrics.inc("twitch_mcp_db_rows_written_total", written)
+                    future.set_result(len(snapshots))
+                except Exception as single_error:
+                    future.set_exception(single_error)
+            return
+
+        self.commits += 1
+        self.writes += len(group)
+        metrics.inc("twitch_mcp_db_commits_total")
+        metrics.inc("twitch_mcp_db_rows_written_total", written)
+        for snapshots, future in group:
+            future.set_result(len(snapshots))
+
+    async def read(self, func: Callable, *args, **kwargs):
+        """Run func(db_service, *args, **kwargs) on a reader thread
+
+        Args:
+            func: Callable taking a DatabaseService first, e.g. an unbound
+                DatabaseService method
+        """
+        loop = asyncio.get_running_loop()
+        with metrics.span("db.read"):
+            return await loop.run_in_executor(
+                self._readers, lambda: func(self._reader(), *args, **kwargs)
+            )
+
+    def _reader(self) -> DatabaseService:
+        """Connection of the current reader thread, opened on first use"""
+        db_service = getattr(self._local, "db_service", None)
+        if db_service is None:
+            self._schema_ready.wait()
+            if self._open_error is not None:
+                raise self._open_error
+            db_service = DatabaseService(self.db_path)
+            # Guards against writes slipping past the writer thread
+            db_service.connection.cursor().execute("PRAGMA query_only = 1")
+            self._local.db_service = db_service
+            with self._reader_lock:
+                self._reader_dbs.append(db_service)
+        return db_service
+
+    async def query_streams(self, **kwargs):
+        """DatabaseService.query_streams on a reader thread"""
+        return await self.read(DatabaseService.query_streams, **kwargs)
+
+    async def get_channel_viewer_history(self, user_login: str, **kwargs):
+        """DatabaseService.get_channel_viewer_history on a reader thread"""
+        return await self.read(
+            DatabaseService.get_channel_viewer_history, user_login, **kwargs
+        )
+
+    async def get_game_viewer_history(self, game_id: str, **kwargs):
+        """DatabaseService.get_game_viewer_history on a reader thread"""
+        return await self.read(
+            DatabaseService.get_game_viewer_history, game_id, **kwargs
+        )
+
+    async def search_titles(self, query: str, **kwargs):
+        """DatabaseService.search_titles on a reader thread"""
+        return await self.read(DatabaseService.search_titles, query, **kwargs)
+
+    async def get_game_metadata(self, game_ids: list[str]):
+        """DatabaseService.get_game_metadata on a reader thread"""
+        return await self.read(DatabaseService.get_game_metadata, game_ids)
+
+    async def upsert_game_metadata(self, games) -> int:
+        """DatabaseService.upsert_game_metadata on the writer thread"""
+        return await self.write(DatabaseService.upsert_game_metadata, games)
+
+    async def insert_rank_snapshot(self, board: str, polled_at, ranked) -> int:
+        """DatabaseService.insert_rank_snapshot on the writer thread"""
+        return await self.write(
+            DatabaseService.insert_rank_snapshot, board, polled_at, ranked
+        )
+
+    async def get_rank_changes(self, board: str, since, until=None):
+        """DatabaseService.get_rank_changes on a reader thread"""
+        return await self.read(DatabaseService.get_rank_changes, board, since, until)
+
+    async def get_rank_history(self, board: str, key: str, **kwargs):
+        """DatabaseService.get_rank_history on a reader thread"""
+        return await self.read(DatabaseService.get_rank_history, board, key, **kwargs)
+
+    async def storage_stats(self) -> dict:
+        """DatabaseService.storage_stats on a reader thread"""
+        return await self.read(DatabaseService.storage_stats)
+
+    def stats(self) -> dict:
+        """Commit counters of the writer thread"""
+        return {
+            "commits": self.commits,
+            "writes": self.writes,
+            "pending_writes": self._writes.qsize(),
+        }
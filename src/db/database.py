@@ -1,118 +1,1339 @@
 import apsw
+import base64
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
-from src.models import StreamSnapshot
+from datetime import datetime, timezone
+from src.db.migrations import MIGRATIONS, SCHEMA_VERSION
+from src.db.rankings import (
+    BOARDS,
+    INSERT_RANK_ENTRY_QUERY,
+    INSERT_RANK_POLL_QUERY,
+    decode_ranks,
+    encode_ranks,
+)
+from src.db.rollups import (
+    PRESENCE_SLOT_SECONDS,
+    RESOLUTIONS,
+    RollupAccumulator,
+    histogram_percentile,
+    merge_histograms,
+)
+from src.models import (
+    GameMetadata,
+    RankChange,
+    RankHistoryPoint,
+    SnapshotRecord,
+    StreamSnapshot,
+    TitleSearchResult,
+    ViewerHistoryBucket,
+)
 from src.utils.logging_config import logger
-from src.utils.exceptions import DatabaseError
+from src.utils.exceptions import DatabaseError, InvalidParameterError
+
+# Connection tuning applied once when the long-lived connection is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",  # 64 MiB
+    "PRAGMA mmap_size = 268435456",  # 256 MiB
+)
+
+# Only takes effect on new files, or on existing ones at the next VACUUM.
+# Setting it locks the database, so it is not part of every connection's setup.
+AUTO_VACUUM_PRAGMA = "PRAGMA auto_vacuum = INCREMENTAL"
+
+DEFAULT_DB_PATH = "twitch_analytics.db"
+
+BUSY_TIMEOUT_MS = 5000
+
+# Wait for another connection's migrations before giving up
+MIGRATION_BUSY_TIMEOUT_MS = 600_000
+
+# Width of the observation bucket that makes (stream id, bucket) unique
+OBSERVATION_BUCKET_SECONDS = 60
+
+# Raw rows per chunk when rebuilding rollups
+ROLLUP_BACKFILL_CHUNK = 50_000
+
+UPSERT_CHANNEL_QUERY = """
+    INSERT INTO channels(user_login, user_name) VALUES (?, ?)
+    ON CONFLICT(user_login) DO UPDATE SET user_name = excluded.user_name
+    WHERE user_name != excluded.user_name
+"""
+
+UPSERT_GAME_QUERY = """
+    INSERT INTO games(game_id, game_name) VALUES (?, ?)
+    ON CONFLICT(game_id) DO UPDATE SET game_name = excluded.game_name
+    WHERE game_name IS NOT excluded.game_name
+"""
+
+# Metadata fetched earlier never overwrites a newer fetch
+UPSERT_GAME_METADATA_QUERY = """
+    INSERT INTO games(game_id, game_name, box_art_url, igdb_id, metadata_updated_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(game_id) DO UPDATE SET
+        game_name = excluded.game_name,
+        box_art_url = excluded.box_art_url,
+        igdb_id = excluded.igdb_id,
+        metadata_updated_at = excluded.metadata_updated_at
+    WHERE excluded.metadata_updated_at >= COALESCE(metadata_updated_at, 0)
+"""
+
+INSERT_TITLE_QUERY = "INSERT OR IGNORE INTO titles(title) VALUES (?)"
+
+# Re-observing a stream within the same bucket updates the row in place
+UPSERT_STREAM_SNAPSHOT_QUERY = """
+    INSERT INTO stream_snapshots
+    (channel_id, game_key, title_id, viewer_count, timestamp, is_live, language,
+     stream_id, started_at, observed_bucket)
+    VALUES (
+        (SELECT id FROM channels WHERE user_login = ?),
+        (SELECT id FROM games WHERE game_id = ?),
+        (SELECT id FROM titles WHERE title = ?),
+        ?, ?, ?, ?, ?, ?, ?
+    )
+    ON CONFLICT(stream_id, observed_bucket) DO UPDATE SET
+        channel_id = excluded.channel_id,
+        game_key = excluded.game_key,
+        title_id = excluded.title_id,
+        viewer_count = excluded.viewer_count,
+        timestamp = excluded.timestamp,
+        is_live = excluded.is_live,
+        language = excluded.language
+    RETURNING id
+"""
+
+
+def to_epoch(value: datetime) -> int:
+    """Convert a datetime to epoch seconds, treating naive values as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def from_epoch(value: int) -> datetime:
+    """Convert stored epoch seconds back to an aware UTC datetime"""
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+def snapshot_row(snapshot: StreamSnapshot) -> tuple:
+    """Flatten a StreamSnapshot into the plain tuple insert_snapshot_rows takes
+
+    Fields are (user_login, user_name, game_id, game_name, title,
+    viewer_count, timestamp, is_live, language, stream_id, started_at) with
+    times as epoch seconds, so rows pickle compactly between processes.
+    """
+    return (
+        snapshot.user_login,
+        snapshot.user_name,
+        snapshot.game_id or None,
+        snapshot.game_name,
+        snapshot.title,
+        snapshot.viewer_count,
+        to_epoch(snapshot.timestamp),
+        1 if snapshot.is_live else 0,
+        snapshot.language,
+        snapshot.stream_id,
+        to_epoch(snapshot.started_at) if snapshot.started_at else None,
+    )
+
+
+def _encode_cursor(key: tuple[int, int]) -> str:
+    """Encode a (timestamp, id) keyset position as an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[int, int]:
+    """Decode a cursor produced by _encode_cursor"""
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return int(timestamp), int(row_id)
+    except Exception:
+        raise InvalidParameterError("Invalid pagination cursor")
 
 
 class DatabaseService:
-    """Handles all database operations for Twitch MCP"""
+    """Handles all database operations for Twitch MCP
+
+    Intended to be created once per process and shared; the connection stays
+    open so apsw's statement cache keeps queries prepared between calls.
+    """
 
     def __init__(self, db_path: str = "twitch_mcp.db"):
         self.db_path = Path(db_path)
         self.connection = apsw.Connection(str(self.db_path))
+        # Serializes write transactions when inserts run in worker threads
+        self._write_lock = threading.Lock()
         self._initialize_database()
 
     def _initialize_database(self):
-        """Initialize database connection and create tables"""
+        """Configure the connection and bring the schema up to date"""
         try:
-            self.connection.cursor().execute("PRAGMA foreign_keys = ON")
-            self._create_tables()
-            logger.info(f"Database initialized at {self.db_path}")
+            self.connection.setbusytimeout(BUSY_TIMEOUT_MS)
+            self.connection.create_scalar_function(
+                "merge_histograms", merge_histograms, 2, deterministic=True
+            )
+            cursor = self.connection.cursor()
+            if cursor.execute("PRAGMA page_count").fetchall()[0][0] == 0:
+                cursor.execute(AUTO_VACUUM_PRAGMA)
+            for pragma in CONNECTION_PRAGMAS:
+                self._apply_pragma(cursor, pragma)
+            self._migrate()
+            logger.info("Database initialized at %s", self.db_path)
         except Exception as e:
-            logger.error(f"Error initializing database: {e}")
+            logger.error("Error initializing database: %s", e)
             raise DatabaseError("Failed to initialize database")
 
-    def _create_tables(self):
-        """Create all required tables"""
+    @staticmethod
+    def _apply_pragma(cursor, pragma: str):
+        """Run a connection pragma, retrying while another connection is busy
+
+        Switching a new file to WAL upgrades a read lock to an exclusive one,
+        which SQLite refuses at once (without the busy handler) when another
+        connection opening the same file holds a read lock too.
+        """
+        deadline = time.monotonic() + BUSY_TIMEOUT_MS / 1000
+        while True:
+            try:
+                return cursor.execute(pragma).fetchall()
+            except apsw.BusyError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.01)
+
+    def _migrate(self):
+        """Apply pending schema migrations tracked by PRAGMA user_version
+
+        Each migration runs in its own BEGIN IMMEDIATE transaction that
+        re-reads the version first, so a connection opened while another one
+        is migrating waits for it and skips what it already applied.
+        """
         cursor = self.connection.cursor()
+        version = cursor.execute("PRAGMA user_version").fetchall()[0][0]
+        if version >= SCHEMA_VERSION:
+            return
 
-        # Stream snapshots table - stores real-time stream data
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS stream_snapshots(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_login TEXT NOT NULL,
-                user_name TEXT NOT NULL,
-                viewer_count INTEGER NOT NULL,
-                game_name TEXT,
-                game_id TEXT,
-                title TEXT NOT NULL,
-                timestamp DATETIME NOT NULL,
-                is_live BOOLEAN NOT NULL DEFAULT 1,
-                language TEXT DEFAULT 'en'
-            )
-        """)
+        # Rewriting a large legacy table can hold the lock for minutes
+        self.connection.setbusytimeout(MIGRATION_BUSY_TIMEOUT_MS)
+        try:
+            for target in range(version + 1, SCHEMA_VERSION + 1):
+                with self._write_transaction():
+                    current = cursor.execute("PRAGMA user_version").fetchall()[0][0]
+                    if current < target:
+                        MIGRATIONS[target](cursor)
+                        cursor.execute(f"PRAGMA user_version = {target}")
+                if current < target:
+                    logger.info("Migrated database schema to version %s", target)
+        finally:
+            self.connection.setbusytimeout(BUSY_TIMEOUT_MS)
+
+    @contextmanager
+    def _write_transaction(self):
+        """Run the block in a BEGIN IMMEDIATE transaction under the write lock
+
+        Under WAL, a deferred transaction that reads before writing fails
+        with SQLITE_BUSY at once when another connection wrote in between,
+        without honouring the busy timeout. Taking the write lock up front
+        makes concurrent writers wait for each other instead.
+        """
+        with self._write_lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self.connection.execute("COMMIT")
+            except BaseException:
+                if not self.connection.getautocommit():
+                    self.connection.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        """Close the underlying connection"""
+        try:
+            self.connection.close()
+        except Exception as e:
+            logger.warning("Error while closing database: %s", e)
 
     def insert_stream_snapshots(self, snapshots: list[StreamSnapshot]) -> int:
-        """Insert multiple stream snapshots into the database"""
-        if not snapshots:
+        """Upsert multiple stream snapshots into the database
+
+        Snapshots of the same stream within one observation bucket collapse
+        into a single row holding the latest values, so retried and
+        overlapping polls are idempotent. Rollups count each row once, when
+        it is first inserted.
+
+        Returns:
+            Number of snapshots written (inserted or updated)
+        """
+        return self.insert_snapshot_rows([snapshot_row(s) for s in snapshots])
+
+    def insert_snapshot_rows(self, snapshot_rows: list[tuple]) -> int:
+        """Upsert stream snapshots given as snapshot_row tuples
+
+        The bulk path behind insert_stream_snapshots, for writers that
+        receive rows from other processes and skip building models.
+
+        Returns:
+            Number of snapshots written (inserted or updated)
+        """
+        if not snapshot_rows:
             return 0
 
         cursor = self.connection.cursor()
 
-        # Prepare the insert query
-        query = """
-            INSERT INTO stream_snapshots 
-            (user_login, user_name, viewer_count, game_name, game_id, 
-             title, timestamp, is_live, language)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-
-        # Convert snapshots to tuples for bulk insert
-        data = []
-        for snapshot in snapshots:
-            data.append(
-                (
-                    snapshot.user_login,
-                    snapshot.user_name,
-                    snapshot.viewer_count,
-                    snapshot.game_name,
-                    snapshot.game_id,
-                    snapshot.title,
-                    snapshot.timestamp.isoformat() if snapshot.timestamp else None,
-                    1 if snapshot.is_live else 0,
-                    snapshot.language,
-                )
+        # Split rows into dimension and fact tuples, last one per key wins
+        channels = {}
+        games = {}
+        titles = set()
+        rows: dict = {}
+        for index, (
+            user_login,
+            user_name,
+            game_id,
+            game_name,
+            title,
+            viewer_count,
+            timestamp,
+            is_live,
+            language,
+            stream_id,
+            started_at,
+        ) in enumerate(snapshot_rows):
+            bucket = None
+            key = index
+            if stream_id:
+                bucket = timestamp // OBSERVATION_BUCKET_SECONDS
+                key = (stream_id, bucket)
+            channels[user_login] = user_name
+            if game_id:
+                games[game_id] = game_name
+            titles.add(title)
+            rows[key] = (
+                user_login,
+                game_id,
+                title,
+                viewer_count,
+                timestamp,
+                is_live,
+                language,
+                stream_id,
+                started_at,
+                bucket,
             )
+        data = list(rows.values())
 
         try:
-            cursor.executemany(query, data)
-            inserted_count = len(data)
-            logger.info(f"Inserted {inserted_count} stream snapshots")
-            return inserted_count
+            # One transaction per batch so the whole batch costs a single commit
+            with self._write_transaction():
+                last_id = cursor.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM stream_snapshots"
+                ).fetchall()[0][0]
+                cursor.executemany(UPSERT_CHANNEL_QUERY, channels.items())
+                cursor.executemany(UPSERT_GAME_QUERY, games.items())
+                cursor.executemany(INSERT_TITLE_QUERY, ((t,) for t in titles))
+                row_ids = [
+                    row_id
+                    for (row_id,) in cursor.executemany(
+                        UPSERT_STREAM_SNAPSHOT_QUERY, data
+                    )
+                ]
+
+                # Rollups are maintained incrementally inside the same
+                # transaction; rows that updated an existing one are skipped
+                rollups = RollupAccumulator()
+                for row_id, row in zip(row_ids, data):
+                    if row_id > last_id:
+                        rollups.add(row[0], row[1], row[3], row[4])
+                rollups.flush(cursor)
+            written_count = len(data)
+            # Every page of every poll lands here, so keep it out of INFO
+            logger.debug("Inserted %s stream snapshots", written_count)
+            return written_count
         except Exception as e:
-            logger.error(f"Error inserting stream snapshots: {e}")
+            logger.error("Error inserting stream snapshots: %s", e)
             raise DatabaseError(f"Failed to insert stream snapshots: {e}")
 
-    def get_all_streams(self) -> list[StreamSnapshot]:
-        """Fetch all stream snapshots from the database"""
-        cursor = self.connection.cursor()
+    @staticmethod
+    def _row_to_snapshot(row) -> StreamSnapshot:
+        """Build a StreamSnapshot from a stream_snapshots row"""
+        return StreamSnapshot(
+            user_login=str(row[0] or ""),
+            user_name=str(row[1] or ""),
+            viewer_count=int(row[2] or 0),
+            game_name=str(row[3]) if row[3] else None,
+            game_id=str(row[4]) if row[4] else None,
+            title=str(row[5] or ""),
+            timestamp=from_epoch(row[6])
+            if row[6] is not None
+            else datetime.now(timezone.utc),
+            is_live=bool(row[7]) if row[7] is not None else False,
+            language=str(row[8] or "en"),
+            stream_id=str(row[9]) if row[9] is not None else None,
+            started_at=from_epoch(row[10]) if row[10] is not None else None,
+        )
+
+    def iter_streams(
+        self,
+        user_login: str | None = None,
+        game_id: str | None = None,
+        language: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        min_viewers: int | None = None,
+        after: tuple[int, int] | None = None,
+        limit: int | None = None,
+        records: bool = False,
+    ) -> Iterator[tuple[tuple[int, int], StreamSnapshot | SnapshotRecord]]:
+        """Stream matching snapshots, newest first, without loading them all
+
+        Args:
+            user_login: Only snapshots of this channel
+            game_id: Only snapshots of this game
+            language: Only snapshots in this language
+            since: Only snapshots at or after this time
+            until: Only snapshots before this time
+            min_viewers: Only snapshots with at least this many viewers
+            after: Keyset position (timestamp, id) to continue after
+            limit: Maximum number of rows to yield
+            records: Yield unvalidated SnapshotRecord tuples instead of
+                StreamSnapshot models, skipping per-column conversion
+
+        Yields:
+            Tuples of (keyset position, stream snapshot)
+        """
+        conditions = []
+        params: list = []
+        if user_login is not None:
+            conditions.append(
+                "channel_id = (SELECT id FROM channels WHERE user_login = ?)"
+            )
+            params.append(user_login)
+        if game_id is not None:
+            conditions.append("game_key = (SELECT id FROM games WHERE game_id = ?)")
+            params.append(game_id)
+        if language is not None:
+            conditions.append("language = ?")
+            params.append(language)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(to_epoch(since))
+        if until is not None:
+            conditions.append("timestamp < ?")
+            params.append(to_epoch(until))
+        if min_viewers is not None:
+            conditions.append("viewer_count >= ?")
+            params.append(min_viewers)
+        if after is not None:
+            conditions.append("(timestamp, id) < (?, ?)")
+            params.extend(after)
+
         query = """
             SELECT user_login, user_name, viewer_count, game_name, game_id,
-                   title, timestamp, is_live, language
+                   title, timestamp, is_live, language, stream_id, started_at, id
+            FROM stream_snapshot_details
+        """
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        decode = SnapshotRecord._make if records else self._row_to_snapshot
+        try:
+            for row in self.connection.cursor().execute(query, params):
+                yield (row[6], row[11]), decode(row[:11])
+        except Exception as e:
+            logger.error("Error fetching streams: %s", e)
+            raise DatabaseError(f"Failed to fetch stream snapshots: {e}")
+
+    def query_streams(
+        self,
+        limit: int = 100,
+        cursor: str | None = None,
+        records: bool = False,
+        **filters,
+    ) -> tuple[list[StreamSnapshot] | list[SnapshotRecord], str | None]:
+        """Fetch one page of snapshots matching the filters
+
+        Args:
+            limit: Maximum number of snapshots in the page
+            cursor: Continuation cursor returned by the previous page
+            records: Return SnapshotRecord tuples instead of StreamSnapshot models
+            **filters: Filters accepted by iter_streams
+
+        Returns:
+            The page of snapshots and the cursor for the next page (None if last)
+        """
+        after = _decode_cursor(cursor) if cursor else None
+        page = []
+        last_key: tuple[int, int] | None = None
+
+        # Ask for one extra row to learn whether another page exists
+        for key, snapshot in self.iter_streams(
+            after=after, limit=limit + 1, records=records, **filters
+        ):
+            if len(page) == limit:
+                return page, _encode_cursor(last_key)
+            page.append(snapshot)
+            last_key = key
+
+        return page, None
+
+    def get_all_streams(self) -> list[StreamSnapshot]:
+        """Fetch all stream snapshots from the database
+
+        Loads the whole table; prefer query_streams or iter_streams.
+        """
+        return [snapshot for _, snapshot in self.iter_streams()]
+
+    def search_titles(
+        self,
+        query: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        min_viewers: int | None = None,
+        language: str | None = None,
+        order_by: str = "viewers",
+        limit: int = 20,
+    ) -> list[TitleSearchResult]:
+        """Channels whose snapshot titles match a full-text query
+
+        The query is matched against the FTS5 index of distinct titles, and
+        only snapshots with a matching title are read, through the
+        (title_id, timestamp) index.
+
+        Args:
+            query: FTS5 query, e.g. "speedrun OR tournament", '"any percent"'
+                or "speedrun*"
+            since: Only snapshots at or after this time
+            until: Only snapshots before this time
+            min_viewers: Only snapshots with at least this many viewers
+            language: Only snapshots in this language
+            order_by: "viewers" (peak viewers) or "relevance" (bm25 score)
+            limit: Maximum number of channels
+
+        Raises:
+            InvalidParameterError: Malformed query or unknown order_by
+            DatabaseError: Search failed
+        """
+        orders = {"viewers": "peak_viewers DESC", "relevance": "score ASC"}
+        if order_by not in orders:
+            raise InvalidParameterError(f"order_by must be one of: {', '.join(orders)}")
+        conditions = ["s.timestamp >= ?", "s.timestamp < ?"]
+        params: list = [
+            query,
+            to_epoch(since) if since else 0,
+            to_epoch(until) if until else 2**62,
+        ]
+        if min_viewers is not None:
+            conditions.append("s.viewer_count >= ?")
+            params.append(min_viewers)
+        if language is not None:
+            conditions.append("s.language = ?")
+            params.append(language)
+        params.append(limit)
+
+        # Matches are materialized so bm25() runs inside the FTS5 scan. With
+        # MAX() as the only min/max aggregate, SQLite takes the bare title,
+        # timestamp and score columns from the peak-viewer row.
+        sql = f"""
+            WITH matches AS MATERIALIZED (
+                SELECT rowid AS title_id, bm25(titles_fts) AS score
+                FROM titles_fts WHERE titles_fts MATCH ?
+            )
+            SELECT c.user_login, c.user_name, t.title,
+                   MAX(s.viewer_count) AS peak_viewers,
+                   AVG(s.viewer_count), COUNT(*), s.timestamp, m.score AS score
+            FROM matches m
+            JOIN stream_snapshots s ON s.title_id = m.title_id
+            JOIN channels c ON c.id = s.channel_id
+            JOIN titles t ON t.id = s.title_id
+            WHERE {" AND ".join(conditions)}
+            GROUP BY s.channel_id
+            ORDER BY {orders[order_by]}
+            LIMIT ?
+        """
+        try:
+            rows = self.connection.cursor().execute(sql, params).fetchall()
+        except apsw.SQLError as e:
+            # The statement is fixed, so this comes from parsing the MATCH query
+            raise InvalidParameterError(f"Invalid search query: {e}")
+        except Exception as e:
+            logger.error("Error searching titles: %s", e)
+            raise DatabaseError(f"Failed to search titles: {e}")
+        return [
+            TitleSearchResult(
+                user_login=user_login,
+                user_name=user_name,
+                title=title,
+                peak_viewers=peak,
+                avg_viewers=round(avg, 1),
+                samples=samples,
+                peak_at=from_epoch(peak_at),
+                score=round(score, 3),
+            )
+            for user_login, user_name, title, peak, avg, samples, peak_at, score in rows
+        ]
+
+    def iter_snapshot_rows(self, after_id: int = 0) -> Iterator[tuple]:
+        """Stream raw snapshot rows in id order, skipping model construction
+
+        Args:
+            after_id: Only rows with a larger id
+
+        Yields:
+            Tuples of (id, timestamp, user_login, user_name, game_id, game_name,
+            title, viewer_count, is_live, language, stream_id, started_at),
+            times in epoch seconds
+        """
+        try:
+            yield from self.connection.cursor().execute(
+                """
+                SELECT id, timestamp, user_login, user_name, game_id, game_name,
+                       title, viewer_count, is_live, language, stream_id,
+                       started_at
+                FROM stream_snapshot_details
+                WHERE id > ?
+                ORDER BY id
+                """,
+                (after_id,),
+            )
+        except Exception as e:
+            logger.error("Error reading snapshot rows: %s", e)
+            raise DatabaseError(f"Failed to read snapshot rows: {e}")
+
+    def iter_viewer_samples(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        user_login: str | None = None,
+        game_id: str | None = None,
+    ) -> Iterator[tuple[int, int, int, int]]:
+        """Stream bare viewer samples keyed by dimension ids, oldest first
+
+        Meant for bulk loading into arrays: rows are plain integer tuples and
+        snapshots without a game get game_key 0.
+
+        Yields:
+            Tuples of (channel_id, game_key, viewer_count, timestamp)
+        """
+        conditions = []
+        params: list = []
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(to_epoch(since))
+        if until is not None:
+            conditions.append("timestamp < ?")
+            params.append(to_epoch(until))
+        if user_login is not None:
+            conditions.append(
+                "channel_id = (SELECT id FROM channels WHERE user_login = ?)"
+            )
+            params.append(user_login)
+        if game_id is not None:
+            conditions.append("game_key = (SELECT id FROM games WHERE game_id = ?)")
+            params.append(game_id)
+
+        query = """
+            SELECT channel_id, COALESCE(game_key, 0), viewer_count, timestamp
             FROM stream_snapshots
-            ORDER BY timestamp DESC
-        """
-        try:
-            rows = cursor.execute(query).fetchall()
-            snapshots = []
-            for row in rows:
-                snapshot = StreamSnapshot(
-                    user_login=str(row[0] or ""),
-                    user_name=str(row[1] or ""),
-                    viewer_count=int(row[2] or 0),
-                    game_name=str(row[3]) if row[3] else None,
-                    game_id=str(row[4]) if row[4] else None,
-                    title=str(row[5] or ""),
-                    timestamp=datetime.fromisoformat(str(row[6]))
-                    if row[6]
-                    else datetime.now(),
-                    is_live=bool(row[7]) if row[7] is not None else False,
-                    language=str(row[8] or "en"),
+        """
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY timestamp"
+
+        try:
+            yield from self.connection.cursor().execute(query, params)
+        except Exception as e:
+            logger.error("Error reading viewer samples: %s", e)
+            raise DatabaseError(f"Failed to read viewer samples: {e}")
+
+    def get_channel_logins(self, channel_ids) -> dict[int, str]:
+        """Map channel ids to user logins"""
+        rows = self._lookup("SELECT id, user_login FROM channels", channel_ids)
+        return {channel_id: user_login for channel_id, user_login in rows}
+
+    def get_game_names(self, game_keys) -> dict[int, tuple[str, str | None]]:
+        """Map game keys to (game_id, game_name)"""
+        rows = self._lookup("SELECT id, game_id, game_name FROM games", game_keys)
+        return {key: (game_id, game_name) for key, game_id, game_name in rows}
+
+    def upsert_game_metadata(self, games: list[GameMetadata]) -> int:
+        """Store fetched game metadata on the games dimension
+
+        Returns:
+            Number of games written
+        """
+        if not games:
+            return 0
+        rows = [
+            (g.game_id, g.game_name, g.box_art_url, g.igdb_id, to_epoch(g.updated_at))
+            for g in games
+        ]
+        try:
+            with self._write_transaction():
+                self.connection.cursor().executemany(UPSERT_GAME_METADATA_QUERY, rows)
+            return len(rows)
+        except Exception as e:
+            logger.error("Error storing game metadata: %s", e)
+            raise DatabaseError(f"Failed to store game metadata: {e}")
+
+    def get_game_metadata(self, game_ids: list[str]) -> dict[str, GameMetadata]:
+        """Stored metadata by Twitch game id; games never fetched are left out"""
+        if not game_ids:
+            return {}
+        placeholders = ",".join("?" * len(game_ids))
+        try:
+            rows = (
+                self.connection.cursor()
+                .execute(
+                    f"""
+                SELECT game_id, game_name, box_art_url, igdb_id, metadata_updated_at
+                FROM games
+                WHERE game_id IN ({placeholders}) AND metadata_updated_at IS NOT NULL
+                """,
+                    list(game_ids),
                 )
-                snapshots.append(snapshot)
-            return snapshots
+                .fetchall()
+            )
         except Exception as e:
-            logger.error(f"Error fetching all streams: {e}")
-            raise DatabaseError(f"Failed to fetch stream snapshots: {e}")
+            logger.error("Error reading game metadata: %s", e)
+            raise DatabaseError(f"Failed to read game metadata: {e}")
+        return {
+            game_id: GameMetadata(
+                game_id=game_id,
+                game_name=game_name or "",
+                box_art_url=box_art_url,
+                igdb_id=igdb_id,
+                updated_at=from_epoch(updated_at),
+            )
+            for game_id, game_name, box_art_url, igdb_id, updated_at in rows
+        }
+
+    def insert_rank_snapshot(
+        self, board: str, polled_at: datetime, ranked: list[tuple[str, str | None]]
+    ) -> int:
+        """Store one poll of a leaderboard
+
+        Args:
+            board: "games" or "streams"
+            polled_at: When the leaderboard was fetched
+            ranked: (game_id, game_name) or (user_login, user_name) pairs,
+                first place first
+
+        Returns:
+            Number of ranks stored; 0 if this board already has a poll at
+            that second
+
+        Raises:
+            InvalidParameterError: Unknown board
+            DatabaseError: Writing the poll failed
+        """
+        table, key_column, _ = self._board(board)
+        # A stream can appear on two pages when viewer counts shift mid-scan
+        names: dict[str, str | None] = {}
+        for key, name in ranked:
+            names.setdefault(key, name)
+        if not names:
+            return 0
+        polled = to_epoch(polled_at)
+
+        cursor = self.connection.cursor()
+        try:
+            with self._write_transaction():
+                if board == "games":
+                    cursor.executemany(UPSERT_GAME_QUERY, names.items())
+                else:
+                    cursor.executemany(
+                        UPSERT_CHANNEL_QUERY,
+                        ((login, name or login) for login, name in names.items()),
+                    )
+                placeholders = ",".join("?" * len(names))
+                ids = dict(
+                    cursor.execute(
+                        f"SELECT {key_column}, id FROM {table} "
+                        f"WHERE {key_column} IN ({placeholders})",
+                        list(names),
+                    ).fetchall()
+                )
+                keys = [ids[key] for key in names]
+                stored = cursor.execute(
+                    INSERT_RANK_POLL_QUERY, (board, polled, encode_ranks(keys))
+                ).fetchall()
+                if not stored:
+                    return 0
+                cursor.executemany(
+                    INSERT_RANK_ENTRY_QUERY,
+                    ((board, key, polled, rank) for rank, key in enumerate(keys, 1)),
+                )
+            return len(keys)
+        except Exception as e:
+            logger.error("Error storing %s ranks: %s", board, e)
+            raise DatabaseError(f"Failed to store {board} ranks: {e}")
+
+    def get_rank_changes(
+        self, board: str, since: datetime, until: datetime | None = None
+    ) -> tuple[datetime | None, datetime | None, list[RankChange]]:
+        """Compare the first and the last poll of a leaderboard in a window
+
+        Only the two polls are read. Ranks are compared down to the depth of
+        the shorter poll, so a top 100 poll next to a top 10 one does not
+        count places 11-100 as entering or dropping out.
+
+        Returns:
+            Time of the first and the last poll (None if the window has no
+            polls) and the change of every ranked entity
+
+        Raises:
+            InvalidParameterError: Unknown board
+            DatabaseError: Reading the polls failed
+        """
+        table, key_column, name_column = self._board(board)
+        query = """
+            SELECT polled_at, ranked FROM rank_polls
+            WHERE board = ? AND polled_at >= ? AND polled_at < ?
+            ORDER BY polled_at {order} LIMIT 1
+        """
+        params = (board, to_epoch(since), to_epoch(until) if until else 2**62)
+        cursor = self.connection.cursor()
+        try:
+            first = cursor.execute(query.format(order="ASC"), params).fetchall()
+            last = cursor.execute(query.format(order="DESC"), params).fetchall()
+        except Exception as e:
+            logger.error("Error reading %s polls: %s", board, e)
+            raise DatabaseError(f"Failed to read {board} polls: {e}")
+        if not first:
+            return None, None, []
+
+        before = decode_ranks(first[0][1])
+        after = decode_ranks(last[0][1])
+        depth = min(len(before), len(after))
+        keys = {k for k, rank in before.items() if rank <= depth or k in after}
+        keys.update(k for k, rank in after.items() if rank <= depth or k in before)
+        names = {
+            row[0]: row[1:]
+            for row in self._lookup(
+                f"SELECT id, {key_column}, {name_column} FROM {table}", keys
+            )
+        }
+
+        changes = []
+        for k in keys:
+            key, name = names.get(k, (str(k), None))
+            previous, rank = before.get(k), after.get(k)
+            changes.append(
+                RankChange(
+                    key=key,
+                    name=name,
+                    previous_rank=previous,
+                    rank=rank,
+                    change=previous - rank if previous and rank else None,
+                )
+            )
+        return from_epoch(first[0][0]), from_epoch(last[0][0]), changes
+
+    def get_rank_history(
+        self,
+        board: str,
+        key: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[RankHistoryPoint]:
+        """Ranks of one game or channel per poll, oldest first
+
+        Polls the entity was not part of are left out.
+
+        Args:
+            board: "games" or "streams"
+            key: Game id or user login
+
+        Raises:
+            InvalidParameterError: Unknown board
+            DatabaseError: Reading the ranks failed
+        """
+        table, key_column, _ = self._board(board)
+        try:
+            rows = (
+                self.connection.cursor()
+                .execute(
+                    f"""
+                SELECT polled_at, rank FROM rank_entries
+                WHERE board = ?
+                  AND entity_key = (SELECT id FROM {table} WHERE {key_column} = ?)
+                  AND polled_at >= ? AND polled_at < ?
+                ORDER BY polled_at
+                """,
+                    (
+                        board,
+                        key,
+                        to_epoch(since) if since else 0,
+                        to_epoch(until) if until else 2**62,
+                    ),
+                )
+                .fetchall()
+            )
+        except Exception as e:
+            logger.error("Error reading %s rank history: %s", board, e)
+            raise DatabaseError(f"Failed to read {board} rank history: {e}")
+        return [
+            RankHistoryPoint(polled_at=from_epoch(polled_at), rank=rank)
+            for polled_at, rank in rows
+        ]
+
+    @staticmethod
+    def _board(board: str) -> tuple[str, str, str]:
+        if board not in BOARDS:
+            raise InvalidParameterError(f"board must be one of: {', '.join(BOARDS)}")
+        return BOARDS[board]
+
+    def _lookup(self, query: str, ids) -> list[tuple]:
+        """Run a dimension query restricted to the given primary keys"""
+        ids = [int(i) for i in ids]
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        try:
+            return (
+                self.connection.cursor()
+                .execute(f"{query} WHERE id IN ({placeholders})", ids)
+                .fetchall()
+            )
+        except Exception as e:
+            logger.error("Error looking up dimension rows: %s", e)
+            raise DatabaseError(f"Failed to look up dimension rows: {e}")
+
+    def compact_snapshots(self) -> int:
+        """Deduplicate snapshots stored before observation times were recorded
+
+        Those rows carry the stream start time and no stream id, so repeated
+        polls of one stream are indistinguishable in time. Each (channel,
+        stream start) keeps only its most recent row. Rollups still count the
+        removed rows until rebuild_rollups is run.
+
+        Returns:
+            Number of rows deleted
+        """
+        cursor = self.connection.cursor()
+        try:
+            with self._write_transaction():
+                cursor.execute(
+                    """
+                    DELETE FROM stream_snapshots
+                    WHERE stream_id IS NULL AND id NOT IN (
+                        SELECT MAX(id) FROM stream_snapshots
+                        WHERE stream_id IS NULL
+                        GROUP BY channel_id, timestamp
+                    )
+                    """
+                )
+                deleted = self.connection.changes()
+                cursor.execute(
+                    """
+                    DELETE FROM titles WHERE id NOT IN (
+                        SELECT DISTINCT title_id FROM stream_snapshots
+                    )
+                    """
+                )
+            logger.info("Compacted %s duplicate stream snapshots", deleted)
+            return deleted
+        except Exception as e:
+            logger.error("Error compacting stream snapshots: %s", e)
+            raise DatabaseError(f"Failed to compact stream snapshots: {e}")
+
+    def delete_snapshots_before(self, cutoff: int, batch_size: int) -> int:
+        """Delete one batch of raw snapshots observed before cutoff (epoch seconds)
+
+        Returns:
+            Number of rows deleted; fewer than batch_size means none are left
+        """
+        cursor = self.connection.cursor()
+        try:
+            with self._write_transaction():
+                cursor.execute(
+                    """
+                    DELETE FROM stream_snapshots WHERE id IN (
+                        SELECT id FROM stream_snapshots
+                        WHERE timestamp < ? ORDER BY timestamp LIMIT ?
+                    )
+                    """,
+                    (cutoff, batch_size),
+                )
+                return self.connection.changes()
+        except Exception as e:
+            logger.error("Error deleting expired snapshots: %s", e)
+            raise DatabaseError(f"Failed to delete expired snapshots: {e}")
+
+    def rollups_cover_snapshots(self, resolution: int) -> bool:
+        """Whether the oldest raw snapshot falls within the rollups
+
+        Snapshots stored before the rollup tables existed are older than
+        every rollup bucket until backfill-rollups rebuilds them. The bucket
+        just before the oldest one counts as covered, since rebuild_rollups
+        leaves out the bucket straddling the first snapshot.
+
+        Args:
+            resolution: Bucket width in seconds of the rollups to compare with
+
+        Returns:
+            False if raw snapshots predate the oldest channel rollup bucket
+        """
+        cursor = self.connection.cursor()
+        try:
+            oldest_snapshot = cursor.execute(
+                "SELECT MIN(timestamp) FROM stream_snapshots"
+            ).fetchall()[0][0]
+            if oldest_snapshot is None:
+                return True
+            oldest_bucket = cursor.execute(
+                "SELECT MIN(bucket_start) FROM channel_rollups WHERE resolution = ?",
+                (resolution,),
+            ).fetchall()[0][0]
+            return (
+                oldest_bucket is not None
+                and oldest_snapshot >= oldest_bucket - resolution
+            )
+        except Exception as e:
+            logger.error("Error comparing snapshots with rollups: %s", e)
+            raise DatabaseError(f"Failed to compare snapshots with rollups: {e}")
+
+    def delete_rollups_before(
+        self, resolution: int, cutoff: int, batch_size: int
+    ) -> int:
+        """Delete one batch of channel and game rollups older than cutoff
+
+        Args:
+            resolution: Bucket width in seconds of the rollups to expire
+            cutoff: Buckets starting before this epoch time are deleted
+            batch_size: Maximum rows deleted from each rollup table
+
+        Returns:
+            Most rows deleted from either table; fewer than batch_size means
+            none are left
+        """
+        cursor = self.connection.cursor()
+        deleted = 0
+        try:
+            with self._write_transaction():
+                for table, key in (
+                    ("channel_rollups", "channel_id"),
+                    ("game_rollups", "game_key"),
+                ):
+                    cursor.execute(
+                        f"""
+                        DELETE FROM {table}
+                        WHERE (resolution, {key}, bucket_start) IN (
+                            SELECT resolution, {key}, bucket_start FROM {table}
+                            WHERE resolution = ? AND bucket_start < ? LIMIT ?
+                        )
+                        """,
+                        (resolution, cutoff, batch_size),
+                    )
+                    deleted = max(deleted, self.connection.changes())
+            return deleted
+        except Exception as e:
+            logger.error("Error deleting expired rollups: %s", e)
+            raise DatabaseError(f"Failed to delete expired rollups: {e}")
+
+    def delete_rank_polls_before(self, cutoff: int, batch_size: int) -> int:
+        """Delete leaderboard polls taken before cutoff, oldest first
+
+        Each poll's own rank array says which rank entries to delete, so the
+        entries are removed by primary key instead of by scanning for old ones.
+        Whole polls are deleted until about batch_size ranks are gone.
+
+        Returns:
+            Number of ranks deleted; fewer than batch_size means none are left
+        """
+        read_cursor = self.connection.cursor()
+        write_cursor = self.connection.cursor()
+        try:
+            with self._write_transaction():
+                polls = []
+                entries = []
+                for poll_id, board, polled_at, ranked in read_cursor.execute(
+                    """
+                    SELECT id, board, polled_at, ranked FROM rank_polls
+                    WHERE polled_at < ? ORDER BY polled_at
+                    """,
+                    (cutoff,),
+                ):
+                    polls.append((poll_id,))
+                    entries.extend(
+                        (board, key, polled_at) for key in decode_ranks(ranked)
+                    )
+                    if len(entries) >= batch_size:
+                        break
+                write_cursor.executemany(
+                    """
+                    DELETE FROM rank_entries
+                    WHERE board = ? AND entity_key = ? AND polled_at = ?
+                    """,
+                    entries,
+                )
+                write_cursor.executemany("DELETE FROM rank_polls WHERE id = ?", polls)
+            return len(entries)
+        except Exception as e:
+            logger.error("Error deleting expired rank polls: %s", e)
+            raise DatabaseError(f"Failed to delete expired rank polls: {e}")
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """Return up to pages free pages to the filesystem
+
+        Has no effect unless the file uses auto_vacuum = INCREMENTAL.
+
+        Returns:
+            Free pages left afterwards
+        """
+        cursor = self.connection.cursor()
+        try:
+            with self._write_lock:
+                cursor.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+            return cursor.execute("PRAGMA freelist_count").fetchall()[0][0]
+        except Exception as e:
+            logger.error("Error running incremental vacuum: %s", e)
+            raise DatabaseError(f"Failed to run incremental vacuum: {e}")
+
+    def storage_stats(self) -> dict:
+        """Report file sizes, free space and row counts per storage tier"""
+        cursor = self.connection.cursor()
+
+        def pragma(name: str):
+            return cursor.execute(f"PRAGMA {name}").fetchall()[0][0]
+
+        def file_size(path: str) -> int:
+            return os.path.getsize(path) if os.path.exists(path) else 0
+
+        try:
+            raw_rows, oldest, newest = cursor.execute(
+                "SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM stream_snapshots"
+            ).fetchall()[0]
+            names = {width: name for name, width in RESOLUTIONS.items()}
+            rollups = {
+                names.get(width, str(width)): {
+                    "channel_rows": channel_rows,
+                    "game_rows": game_rows,
+                    "oldest": str(from_epoch(first)),
+                }
+                for width, channel_rows, game_rows, first in cursor.execute(
+                    """
+                    SELECT resolution, SUM(channel_rows), SUM(game_rows),
+                           MIN(first_bucket)
+                    FROM (
+                        SELECT resolution, COUNT(*) AS channel_rows,
+                               0 AS game_rows, MIN(bucket_start) AS first_bucket
+                        FROM channel_rollups GROUP BY resolution
+                        UNION ALL
+                        SELECT resolution, 0, COUNT(*), MIN(bucket_start)
+                        FROM game_rollups GROUP BY resolution
+                    )
+                    GROUP BY resolution ORDER BY resolution
+                    """
+                )
+            }
+            ranks = {
+                board: {"polls": polls, "oldest": str(from_epoch(first))}
+                for board, polls, first in cursor.execute(
+                    """
+                    SELECT board, COUNT(*), MIN(polled_at) FROM rank_polls
+                    GROUP BY board ORDER BY board
+                    """
+                )
+            }
+
+            return {
+                "file_bytes": file_size(str(self.db_path)),
+                "wal_bytes": file_size(f"{self.db_path}-wal"),
+                "page_size": pragma("page_size"),
+                "page_count": pragma("page_count"),
+                "free_pages": pragma("freelist_count"),
+                "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}[
+                    pragma("auto_vacuum")
+                ],
+                "raw": {
+                    "rows": raw_rows,
+                    "oldest": str(from_epoch(oldest)) if oldest is not None else None,
+                    "newest": str(from_epoch(newest)) if newest is not None else None,
+                },
+                "rollups": rollups,
+                "ranks": ranks,
+            }
+        except Exception as e:
+            logger.error("Error reading storage stats: %s", e)
+            raise DatabaseError(f"Failed to read storage stats: {e}")
+
+    def rebuild_rollups(self, chunk_size: int = ROLLUP_BACKFILL_CHUNK) -> int:
+        """Rebuild the rollups covered by raw snapshots in one streaming pass
+
+        Retention keeps rollups longer than raw snapshots, so only buckets
+        starting at or after the oldest remaining snapshot are replaced.
+        Older buckets, including one that straddles that snapshot, keep their
+        stored values; with no raw snapshots nothing is touched.
+
+        Args:
+            chunk_size: Raw rows aggregated in memory before each upsert
+
+        Returns:
+            Number of snapshots rolled up
+        """
+        read_cursor = self.connection.cursor()
+        write_cursor = self.connection.cursor()
+        processed = 0
+
+        try:
+            with self._write_transaction():
+                since = write_cursor.execute(
+                    "SELECT MIN(timestamp) FROM stream_snapshots"
+                ).fetchall()[0][0]
+                if since is None:
+                    return 0
+                rollups = RollupAccumulator(since=since)
+                write_cursor.execute(
+                    "DELETE FROM channel_rollups WHERE bucket_start >= ?", (since,)
+                )
+                write_cursor.execute(
+                    "DELETE FROM game_rollups WHERE bucket_start >= ?", (since,)
+                )
+                for user_login, game_id, viewers, timestamp in read_cursor.execute(
+                    """
+                    SELECT user_login, game_id, viewer_count, timestamp
+                    FROM stream_snapshot_details
+                    ORDER BY id
+                    """
+                ):
+                    rollups.add(user_login, game_id, viewers, timestamp)
+                    processed += 1
+                    if processed % chunk_size == 0:
+                        rollups.flush(write_cursor)
+                        logger.info("Rolled up %s snapshots", processed)
+                rollups.flush(write_cursor)
+            logger.info("Rebuilt rollups from %s snapshots", processed)
+            return processed
+        except Exception as e:
+            logger.error("Error rebuilding rollups: %s", e)
+            raise DatabaseError(f"Failed to rebuild rollups: {e}")
+
+    def get_channel_viewer_history(
+        self,
+        user_login: str,
+        resolution: str = "hour",
+        since: datetime | None = None,
+        until: datetime | None = None,
+        poll_interval: float | None = None,
+    ) -> list[ViewerHistoryBucket]:
+        """Fetch bucketed viewer statistics for a channel from the rollups
+
+        Hours streamed are capped at the bucket width since a channel cannot
+        stream longer than the bucket lasts. See _viewer_history for
+        poll_interval.
+        """
+        return self._viewer_history(
+            "channel_rollups",
+            "channel_id = (SELECT id FROM channels WHERE user_login = ?)",
+            user_login,
+            resolution,
+            since,
+            until,
+            poll_interval,
+            cap_hours=True,
+        )
+
+    def get_game_viewer_history(
+        self,
+        game_id: str,
+        resolution: str = "hour",
+        since: datetime | None = None,
+        until: datetime | None = None,
+        poll_interval: float | None = None,
+    ) -> list[ViewerHistoryBucket]:
+        """Fetch bucketed viewer statistics for a game from the rollups
+
+        Viewer statistics are per stream; hours streamed sum all channels.
+        See _viewer_history for poll_interval.
+        """
+        return self._viewer_history(
+            "game_rollups",
+            "game_key = (SELECT id FROM games WHERE game_id = ?)",
+            game_id,
+            resolution,
+            since,
+            until,
+            poll_interval,
+            cap_hours=False,
+        )
+
+    def _viewer_history(
+        self,
+        table: str,
+        key_condition: str,
+        key: str,
+        resolution: str,
+        since: datetime | None,
+        until: datetime | None,
+        poll_interval: float | None,
+        cap_hours: bool,
+    ) -> list[ViewerHistoryBucket]:
+        """Read rollup rows for one entity and turn them into history buckets
+
+        Each presence slot a channel was seen in counts as streamed for the
+        slot width, or for poll_interval seconds when polls are further
+        apart. poll_interval defaults to COLLECTOR_INTERVAL_SECONDS.
+        """
+        if resolution not in RESOLUTIONS:
+            raise InvalidParameterError(
+                f"resolution must be one of: {', '.join(RESOLUTIONS)}"
+            )
+        width = RESOLUTIONS[resolution]
+        if poll_interval is None:
+            poll_interval = float(os.getenv("COLLECTOR_INTERVAL_SECONDS", "300"))
+        slot_seconds = max(PRESENCE_SLOT_SECONDS, poll_interval)
+
+        query = f"""
+            SELECT bucket_start, samples, slots, viewer_sum, viewer_peak,
+                   viewer_histogram
+            FROM {table}
+            WHERE resolution = ? AND {key_condition}
+              AND bucket_start >= ? AND bucket_start < ?
+            ORDER BY bucket_start
+        """
+        params = (
+            width,
+            key,
+            to_epoch(since) - to_epoch(since) % width if since else 0,
+            to_epoch(until) if until else 2**62,
+        )
+
+        try:
+            buckets = []
+            for (
+                bucket_start,
+                samples,
+                slots,
+                viewer_sum,
+                peak,
+                histogram,
+            ) in self.connection.cursor().execute(query, params):
+                seconds = slots * slot_seconds
+                if cap_hours:
+                    seconds = min(seconds, width)
+                p95 = histogram_percentile(histogram, 0.95)
+                buckets.append(
+                    ViewerHistoryBucket(
+                        bucket_start=from_epoch(bucket_start),
+                        samples=samples,
+                        avg_viewers=round(viewer_sum / samples, 1),
+                        peak_viewers=peak,
+                        p95_viewers=min(p95, peak) if p95 is not None else None,
+                        hours_streamed=round(seconds / 3600, 2),
+                    )
+                )
+            return buckets
+        except Exception as e:
+            logger.error("Error fetching viewer history from %s: %s", table, e)
+            raise DatabaseError(f"Failed to fetch viewer history: {e}")
@@ -0,0 +1,253 @@
+"""Columnar export of stream snapshots to Parquet or Arrow IPC files
+
+Rows are streamed out of SQLite in id order and written in fixed-size chunks
+to one directory per UTC day:
+
+    <output>/date=2025-01-31/part-00000000000000012345.parquet
+
+Repeated columns (channel, game, title, language) are dictionary-encoded.
+The highest exported id is kept in <output>/_export_state.json so the next
+run only writes newer rows. Requires the optional pyarrow dependency.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from src.db.database import DatabaseService
+from src.models import ExportSummary
+from src.utils.exceptions import ConfigurationError
+from src.utils.logging_config import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # optional "export" extra
+    pa = ipc = pq = None
+
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrows"}
+DEFAULT_EXPORT_CHUNK = 50_000
+STATE_FILE = "_export_state.json"
+
+# Day partitions kept open at once; rows arriving for a closed day start a new part
+MAX_OPEN_PARTITIONS = 4
+
+_COLUMNS = (
+    "id",
+    "timestamp",
+    "user_login",
+    "user_name",
+    "game_id",
+    "game_name",
+    "title",
+    "viewer_count",
+    "is_live",
+    "language",
+    "stream_id",
+    "started_at",
+)
+_DICTIONARY_COLUMNS = {
+    "user_login",
+    "user_name",
+    "game_id",
+    "game_name",
+    "title",
+    "language",
+}
+
+
+def _schema():
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("timestamp", pa.timestamp("s", tz="UTC")),
+            ("user_login", dictionary),
+            ("user_name", dictionary),
+            ("game_id", dictionary),
+            ("game_name", dictionary),
+            ("title", dictionary),
+            ("viewer_count", pa.int32()),
+            ("is_live", pa.bool_()),
+            ("language", dictionary),
+            ("stream_id", pa.int64()),
+            ("started_at", pa.timestamp("s", tz="UTC")),
+        ]
+    )
+
+
+class _Partition:
+    """One open output file for a single day"""
+
+    def __init__(self, path: Path, schema, file_format: str):
+        self.path = path
+        self.tmp_path = path.with_name(path.name + ".tmp")
+        self.rows = 0
+        self._sink = None
+        if file_format == "parquet":
+            self._writer = pq.ParquetWriter(
+                self.tmp_path, schema, compression="zstd", use_dictionary=True
+            )
+        else:
+            # The stream format allows a fresh dictionary per batch
+            self._sink = pa.OSFile(str(self.tmp_path), "wb")
+            self._writer = ipc.new_stream(self._sink, schema)
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def close(self):
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        # Only complete files get their final name
+        os.replace(self.tmp_path, self.path)
+
+
+class SnapshotExporter:
+    """Streams stream_snapshots into day-partitioned columnar files
+
+    Memory stays bounded by chunk_size rows plus at most MAX_OPEN_PARTITIONS
+    open writers, whatever the size of the table.
+    """
+
+    def __init__(
+        self,
+        db_service: DatabaseService,
+        output_dir: str | Path,
+        file_format: str = "parquet",
+        chunk_size: int = DEFAULT_EXPORT_CHUNK,
+    ):
+        if pa is None:
+            raise ConfigurationError(
+                "pyarrow is required for exports; install the 'export' extra"
+            )
+        if file_format not in EXPORT_FORMATS:
+            raise ConfigurationError(
+                f"Unknown export format '{file_format}', "
+                f"expected one of {', '.join(EXPORT_FORMATS)}"
+            )
+        self.db_service = db_service
+        self.output_dir = Path(output_dir)
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self.schema = _schema()
+        self._partitions: dict[str, _Partition] = {}
+
+    @property
+    def state_path(self) -> Path:
+        return self.output_dir / STATE_FILE
+
+    def last_exported_id(self) -> int:
+        """Highest snapshot id written by previous runs into this directory"""
+        try:
+            return int(json.loads(self.state_path.read_text())["last_id"])
+        except FileNotFoundError:
+            return 0
+
+    def _save_state(self, last_id: int):
+        tmp_path = self.state_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "last_id": last_id,
+                    "format": self.file_format,
+                    "exported_at": datetime.now(timezone.utc).isoformat(),
+                }
+            )
+        )
+        os.replace(tmp_path, self.state_path)
+
+    def export(self, incremental: bool = True) -> ExportSummary:
+        """Write every snapshot newer than the last export (or all of them)
+
+        Args:
+            incremental: Continue after the last exported id instead of from scratch
+
+        Returns:
+            Summary of rows and files written
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        start_id = self.last_exported_id() if incremental else 0
+        summary = ExportSummary(start_id=start_id, last_id=start_id)
+        files: set[str] = set()
+
+        chunk: list[tuple] = []
+        try:
+            for row in self.db_service.iter_snapshot_rows(after_id=start_id):
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    files.update(self._write_chunk(chunk))
+                    summary.rows += len(chunk)
+                    summary.last_id = chunk[-1][0]
+                    chunk = []
+            if chunk:
+                files.update(self._write_chunk(chunk))
+                summary.rows += len(chunk)
+                summary.last_id = chunk[-1][0]
+        finally:
+            self._close_partitions()
+
+        if summary.rows:
+            self._save_state(summary.last_id)
+        summary.files = sorted(files)
+        logger.info(
+            "Exported %s snapshots after id %s into %s files",
+            summary.rows,
+            start_id,
+            len(summary.files),
+        )
+        return summary
+
+    def _write_chunk(self, rows: list[tuple]) -> set[str]:
+        """Split a chunk by UTC day and append each slice to its partition"""
+        by_day: dict[str, list[tuple]] = {}
+        for row in rows:
+            day = datetime.fromtimestamp(row[1], timezone.utc).strftime("%Y-%m-%d")
+            by_day.setdefault(day, []).append(row)
+
+        written = set()
+        for day, day_rows in by_day.items():
+            partition = self._partition(day, first_id=day_rows[0][0])
+            partition.write(self._to_batch(day_rows))
+            written.add(str(partition.path.relative_to(self.output_dir)))
+        return written
+
+    def _partition(self, day: str, first_id: int) -> _Partition:
+        partition = self._partitions.get(day)
+        if partition is not None:
+            return partition
+
+        if len(self._partitions) >= MAX_OPEN_PARTITIONS:
+            oldest = min(self._partitions)
+            self._partitions.pop(oldest).close()
+
+        directory = self.output_dir / f"date={day}"
+        directory.mkdir(exist_ok=True)
+        # Named after the first row so reruns of an interrupted export overwrite
+        path = directory / f"part-{first_id:020d}{EXPORT_FORMATS[self.file_format]}"
+        partition = _Partition(path, self.schema, self.file_format)
+        self._partitions[day] = partition
+        return partition
+
+    def _close_partitions(self):
+        while self._partitions:
+            _, partition = self._partitions.popitem()
+            partition.close()
+
+    def _to_batch(self, rows: list[tuple]):
+        columns = list(zip(*rows))
+        arrays = []
+        for name, values in zip(_COLUMNS, columns):
+            field = self.schema.field(name)
+            if name in _DICTIONARY_COLUMNS:
+                arrays.append(
+                    pa.array(values, pa.string()).dictionary_encode().cast(field.type)
+                )
+            elif name == "is_live":
+                arrays.append(pa.array([bool(v) for v in values], field.type))
+            else:
+                arrays.append(pa.array(values, field.type))
+        return pa.record_batch(arrays, schema=self.schema)
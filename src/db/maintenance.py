@@ -0,0 +1,128 @@
+import os
+import argparse
+import asyncio
+from src.db.async_database import AsyncDatabaseService
+from src.db.database import AUTO_VACUUM_PRAGMA, DEFAULT_DB_PATH, DatabaseService
+from src.db.export import DEFAULT_EXPORT_CHUNK, EXPORT_FORMATS, SnapshotExporter
+from src.services.retention import RetentionTask
+from src.utils.logging_config import logger
+
+
+def backfill_rollups(db_service: DatabaseService, args: argparse.Namespace):
+    """Rebuild viewer rollups from all stored snapshots"""
+    processed = db_service.rebuild_rollups(chunk_size=args.chunk_size)
+    print(f"Rolled up {processed} snapshots")
+
+
+def compact_snapshots(db_service: DatabaseService, args: argparse.Namespace):
+    """Deduplicate legacy snapshots, then rebuild the rollups they inflated"""
+    deleted = db_service.compact_snapshots()
+    print(f"Deleted {deleted} duplicate snapshots")
+    if deleted:
+        processed = db_service.rebuild_rollups(chunk_size=args.chunk_size)
+        print(f"Rolled up {processed} snapshots")
+    if args.vacuum:
+        cursor = db_service.connection.cursor()
+        # Converts older files so retention can reclaim space incrementally
+        cursor.execute(AUTO_VACUUM_PRAGMA)
+        cursor.execute("VACUUM")
+        print("Vacuumed database")
+
+
+def apply_retention(db_service: DatabaseService, args: argparse.Namespace):
+    """Expire rows past the configured retention once and reclaim free pages"""
+
+    async def run_once():
+        database = AsyncDatabaseService(args.db)
+        task = RetentionTask.from_env(database)
+        try:
+            return await task.run_once()
+        finally:
+            await task.stop()
+            await asyncio.to_thread(database.close)
+
+    metrics = asyncio.run(run_once())
+    if metrics.error:
+        raise RuntimeError(metrics.error)
+    for tier, deleted in metrics.deleted.items():
+        print(f"{tier}: deleted {deleted} rows")
+    print(f"Free pages left: {metrics.free_pages}")
+
+
+def export_snapshots(db_service: DatabaseService, args: argparse.Namespace):
+    """Export snapshots newer than the last export to columnar files"""
+    exporter = SnapshotExporter(
+        db_service, args.output, file_format=args.format, chunk_size=args.chunk_size
+    )
+    summary = exporter.export(incremental=not args.full)
+    print(
+        f"Exported {summary.rows} snapshots (ids {summary.start_id + 1}-{summary.last_id}) "
+        f"into {len(summary.files)} files under {args.output}"
+    )
+
+
+def main():
+    """Database maintenance commands
+
+    Usage:
+        python -m src.db.maintenance backfill-rollups [--db PATH]
+        python -m src.db.maintenance compact-snapshots [--vacuum]
+        python -m src.db.maintenance apply-retention
+        python -m src.db.maintenance export OUTPUT_DIR [--format parquet|arrow] [--full]
+    """
+    parser = argparse.ArgumentParser(
+        description="Twitch analytics database maintenance"
+    )
+    parser.add_argument(
+        "--db",
+        default=os.getenv("TWITCH_ANALYTICS_DB", DEFAULT_DB_PATH),
+        help="SQLite database path",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill-rollups", help="Rebuild viewer rollups from raw snapshots"
+    )
+    backfill.add_argument("--chunk-size", type=int, default=50_000)
+    backfill.set_defaults(handler=backfill_rollups)
+
+    compact = commands.add_parser(
+        "compact-snapshots",
+        help="Deduplicate snapshots stored before observation times were recorded",
+    )
+    compact.add_argument("--chunk-size", type=int, default=50_000)
+    compact.add_argument(
+        "--vacuum", action="store_true", help="Reclaim freed space afterwards"
+    )
+    compact.set_defaults(handler=compact_snapshots)
+
+    retention = commands.add_parser(
+        "apply-retention",
+        help="Delete rows past the RETENTION_*_DAYS policy and reclaim space",
+    )
+    retention.set_defaults(handler=apply_retention)
+
+    export = commands.add_parser(
+        "export", help="Export snapshots to day-partitioned Parquet or Arrow files"
+    )
+    export.add_argument("output", help="Output directory")
+    export.add_argument("--format", choices=list(EXPORT_FORMATS), default="parquet")
+    export.add_argument("--chunk-size", type=int, default=DEFAULT_EXPORT_CHUNK)
+    export.add_argument(
+        "--full", action="store_true", help="Ignore the last export and write all rows"
+    )
+    export.set_defaults(handler=export_snapshots)
+
+    args = parser.parse_args()
+    db_service = DatabaseService(args.db)
+    try:
+        args.handler(db_service, args)
+    except Exception as e:
+        logger.error("Maintenance command %s failed: %s", args.command, e)
+        raise SystemExit(1)
+    finally:
+        db_service.close()
+
+
+if __name__ == "__main__":
+    main()
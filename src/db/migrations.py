@@ -0,0 +1,331 @@
+"""Versioned schema migrations for the analytics database
+
+Each migration receives a cursor inside an open transaction and brings the
+schema from the previous version to its own. DatabaseService applies the
+pending ones in order and records progress in PRAGMA user_version.
+"""
+
+from src.utils.exceptions import DatabaseError
+
+
+def create_stream_snapshots(cursor):
+    """Version 1: original denormalized stream_snapshots table"""
+    # Stream snapshots table - stores real-time stream data
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stream_snapshots(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_login TEXT NOT NULL,
+            user_name TEXT NOT NULL,
+            viewer_count INTEGER NOT NULL,
+            game_name TEXT,
+            game_id TEXT,
+            title TEXT NOT NULL,
+            timestamp DATETIME NOT NULL,
+            is_live BOOLEAN NOT NULL DEFAULT 1,
+            language TEXT DEFAULT 'en'
+        )
+    """)
+
+
+def normalize_stream_snapshots(cursor):
+    """Version 2: dimension tables, epoch timestamps and lookup indexes
+
+    Channels, games and titles move into their own tables so each snapshot row
+    only stores integer keys. Existing rows are copied across in place.
+
+    Raises:
+        DatabaseError: Some timestamps cannot be converted to epoch seconds
+    """
+    # Refuse rather than store them as 1970, where retention would delete them
+    count, first_id, first_value = cursor.execute("""
+        SELECT COUNT(*), MIN(id), (
+            SELECT timestamp FROM stream_snapshots
+            WHERE strftime('%s', timestamp) IS NULL ORDER BY id LIMIT 1
+        )
+        FROM stream_snapshots WHERE strftime('%s', timestamp) IS NULL
+    """).fetchall()[0]
+    if count:
+        raise DatabaseError(
+            f"{count} stream snapshots have timestamps SQLite cannot parse "
+            f"(first: id {first_id}, {first_value!r}); fix or delete them, "
+            f"then restart to finish the migration"
+        )
+
+    cursor.execute("""
+        CREATE TABLE channels(
+            id INTEGER PRIMARY KEY,
+            user_login TEXT NOT NULL UNIQUE,
+            user_name TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE games(
+            id INTEGER PRIMARY KEY,
+            game_id TEXT NOT NULL UNIQUE,
+            game_name TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE titles(
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL UNIQUE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE stream_snapshots_v2(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel_id INTEGER NOT NULL REFERENCES channels(id),
+            game_key INTEGER REFERENCES games(id),
+            title_id INTEGER NOT NULL REFERENCES titles(id),
+            viewer_count INTEGER NOT NULL,
+            timestamp INTEGER NOT NULL,
+            is_live INTEGER NOT NULL DEFAULT 1,
+            language TEXT DEFAULT 'en'
+        )
+    """)
+
+    # Latest name wins for channels and games that were renamed over time
+    cursor.execute("""
+        INSERT INTO channels(user_login, user_name)
+        SELECT user_login, user_name FROM stream_snapshots
+        WHERE id IN (SELECT MAX(id) FROM stream_snapshots GROUP BY user_login)
+    """)
+    cursor.execute("""
+        INSERT INTO games(game_id, game_name)
+        SELECT game_id, game_name FROM stream_snapshots
+        WHERE id IN (
+            SELECT MAX(id) FROM stream_snapshots
+            WHERE game_id IS NOT NULL AND game_id != ''
+            GROUP BY game_id
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO titles(title) SELECT DISTINCT title FROM stream_snapshots
+    """)
+    cursor.execute("""
+        INSERT INTO stream_snapshots_v2
+        (id, channel_id, game_key, title_id, viewer_count, timestamp,
+         is_live, language)
+        SELECT s.id, c.id, g.id, t.id, s.viewer_count,
+               CAST(strftime('%s', s.timestamp) AS INTEGER),
+               s.is_live, s.language
+        FROM stream_snapshots s
+        JOIN channels c ON c.user_login = s.user_login
+        JOIN titles t ON t.title = s.title
+        LEFT JOIN games g ON g.game_id = s.game_id
+        ORDER BY s.id
+    """)
+    cursor.execute("DROP TABLE stream_snapshots")
+    cursor.execute("ALTER TABLE stream_snapshots_v2 RENAME TO stream_snapshots")
+
+    cursor.execute("""
+        CREATE INDEX idx_snapshots_channel_time
+        ON stream_snapshots(channel_id, timestamp)
+    """)
+    cursor.execute("""
+        CREATE INDEX idx_snapshots_game_time
+        ON stream_snapshots(game_key, timestamp)
+    """)
+    cursor.execute("""
+        CREATE INDEX idx_snapshots_time ON stream_snapshots(timestamp)
+    """)
+
+    # Denormalized read view so queries can keep filtering on natural keys
+    cursor.execute("""
+        CREATE VIEW stream_snapshot_details AS
+        SELECT s.id, c.user_login, c.user_name, s.viewer_count, g.game_name,
+               g.game_id, t.title, s.timestamp, s.is_live, s.language,
+               s.channel_id, s.game_key
+        FROM stream_snapshots s
+        JOIN channels c ON c.id = s.channel_id
+        JOIN titles t ON t.id = s.title_id
+        LEFT JOIN games g ON g.id = s.game_key
+    """)
+
+
+def create_rollup_tables(cursor):
+    """Version 3: per-channel and per-game viewer rollups at several resolutions
+
+    Rows are keyed by bucket width in seconds and bucket start (epoch seconds).
+    The histogram column holds log-scale viewer bins used to estimate p95.
+    Existing snapshots are not rolled up here; run the backfill command.
+    """
+    cursor.execute("""
+        CREATE TABLE channel_rollups(
+            resolution INTEGER NOT NULL,
+            channel_id INTEGER NOT NULL REFERENCES channels(id),
+            bucket_start INTEGER NOT NULL,
+            samples INTEGER NOT NULL,
+            viewer_sum INTEGER NOT NULL,
+            viewer_peak INTEGER NOT NULL,
+            viewer_histogram BLOB NOT NULL,
+            PRIMARY KEY (resolution, channel_id, bucket_start)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE game_rollups(
+            resolution INTEGER NOT NULL,
+            game_key INTEGER NOT NULL REFERENCES games(id),
+            bucket_start INTEGER NOT NULL,
+            samples INTEGER NOT NULL,
+            viewer_sum INTEGER NOT NULL,
+            viewer_peak INTEGER NOT NULL,
+            viewer_histogram BLOB NOT NULL,
+            PRIMARY KEY (resolution, game_key, bucket_start)
+        ) WITHOUT ROWID
+    """)
+
+
+def add_observation_keys(cursor):
+    """Version 4: observation time separate from stream start, deduplicated per bucket
+
+    timestamp now holds when a snapshot was observed and started_at when the
+    stream went live. A snapshot is identified by its Twitch stream id and
+    observation bucket, enforced by a unique index used for upserts. Older
+    rows stored the stream start in timestamp; it is copied to started_at and
+    they keep a NULL stream id (run the compact-snapshots maintenance command
+    to deduplicate them).
+    """
+    cursor.execute("ALTER TABLE stream_snapshots ADD COLUMN stream_id INTEGER")
+    cursor.execute("ALTER TABLE stream_snapshots ADD COLUMN started_at INTEGER")
+    cursor.execute("ALTER TABLE stream_snapshots ADD COLUMN observed_bucket INTEGER")
+    cursor.execute("UPDATE stream_snapshots SET started_at = timestamp")
+    cursor.execute("""
+        CREATE UNIQUE INDEX idx_snapshots_stream_bucket
+        ON stream_snapshots(stream_id, observed_bucket)
+    """)
+
+    cursor.execute("DROP VIEW stream_snapshot_details")
+    cursor.execute("""
+        CREATE VIEW stream_snapshot_details AS
+        SELECT s.id, c.user_login, c.user_name, s.viewer_count, g.game_name,
+               g.game_id, t.title, s.timestamp, s.is_live, s.language,
+               s.channel_id, s.game_key, s.stream_id, s.started_at
+        FROM stream_snapshots s
+        JOIN channels c ON c.id = s.channel_id
+        JOIN titles t ON t.id = s.title_id
+        LEFT JOIN games g ON g.id = s.game_key
+    """)
+
+
+def add_game_metadata(cursor):
+    """Version 5: box art, IGDB id and fetch time on the games dimension
+
+    metadata_updated_at stays NULL for games only seen in stream snapshots
+    until their metadata is fetched from Helix.
+    """
+    cursor.execute("ALTER TABLE games ADD COLUMN box_art_url TEXT")
+    cursor.execute("ALTER TABLE games ADD COLUMN igdb_id TEXT")
+    cursor.execute("ALTER TABLE games ADD COLUMN metadata_updated_at INTEGER")
+
+
+def create_rank_snapshots(cursor):
+    """Version 6: per-poll leaderboards of top games and top streams
+
+    rank_polls stores each poll once as a packed array of dimension keys in
+    rank order (games.id or channels.id), so comparing two polls reads two
+    rows. rank_entries repeats the ranks keyed by entity and poll time, so
+    one entity's rank history is a single index range.
+    """
+    cursor.execute("""
+        CREATE TABLE rank_polls(
+            id INTEGER PRIMARY KEY,
+            board TEXT NOT NULL,
+            polled_at INTEGER NOT NULL,
+            ranked BLOB NOT NULL,
+            UNIQUE (board, polled_at)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE rank_entries(
+            board TEXT NOT NULL,
+            entity_key INTEGER NOT NULL,
+            polled_at INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            PRIMARY KEY (board, entity_key, polled_at)
+        ) WITHOUT ROWID
+    """)
+
+
+def add_title_search(cursor):
+    """Version 7: FTS5 index over stream titles
+
+    Snapshots reference deduplicated titles, so the index covers the titles
+    table (as external content) and each distinct title is indexed once.
+    Triggers keep it in sync with every insert and delete of a title; a
+    title_id index joins matches back to snapshots within a time window.
+    """
+    cursor.execute("""
+        CREATE VIRTUAL TABLE titles_fts USING fts5(
+            title,
+            content='titles',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER titles_fts_insert AFTER INSERT ON titles BEGIN
+            INSERT INTO titles_fts(rowid, title) VALUES (new.id, new.title);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER titles_fts_delete AFTER DELETE ON titles BEGIN
+            INSERT INTO titles_fts(titles_fts, rowid, title)
+            VALUES ('delete', old.id, old.title);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER titles_fts_update AFTER UPDATE ON titles BEGIN
+            INSERT INTO titles_fts(titles_fts, rowid, title)
+            VALUES ('delete', old.id, old.title);
+            INSERT INTO titles_fts(rowid, title) VALUES (new.id, new.title);
+        END
+    """)
+    cursor.execute("INSERT INTO titles_fts(titles_fts) VALUES ('rebuild')")
+    cursor.execute("""
+        CREATE INDEX idx_snapshots_title_time ON stream_snapshots(title_id, timestamp)
+    """)
+
+
+def add_rollup_presence(cursor):
+    """Version 8: distinct presence slots per rollup bucket
+
+    slots counts the distinct (channel, 5 minute slot) pairs seen in a
+    bucket, so hours streamed no longer grow with extra snapshots of the
+    same stream. Buckets still covered by raw snapshots are recounted from
+    them; older buckets are estimated from their sample counts.
+    """
+    for table, key in (("channel_rollups", "channel_id"), ("game_rollups", "game_key")):
+        cursor.execute(
+            f"ALTER TABLE {table} ADD COLUMN slots INTEGER NOT NULL DEFAULT 0"
+        )
+        cursor.execute(f"""
+            UPDATE {table} SET slots = (
+                SELECT COUNT(DISTINCT s.channel_id || ':' || (s.timestamp / 300))
+                FROM stream_snapshots s
+                WHERE s.{key} = {table}.{key}
+                  AND s.timestamp >= {table}.bucket_start
+                  AND s.timestamp < {table}.bucket_start + {table}.resolution
+            )
+            WHERE bucket_start >= (SELECT MIN(timestamp) FROM stream_snapshots)
+        """)
+    cursor.execute("""
+        UPDATE channel_rollups SET slots = MIN(samples, resolution / 300)
+        WHERE slots = 0
+    """)
+    cursor.execute("UPDATE game_rollups SET slots = samples WHERE slots = 0")
+
+
+# Schema version -> migration producing it, applied in ascending order
+MIGRATIONS = {
+    1: create_stream_snapshots,
+    2: normalize_stream_snapshots,
+    3: create_rollup_tables,
+    4: add_observation_keys,
+    5: add_game_metadata,
+    6: create_rank_snapshots,
+    7: add_title_search,
+    8: add_rollup_presence,
+}
+
+SCHEMA_VERSION = max(MIGRATIONS)
@@ -0,0 +1,33 @@
+import struct
+
+# Snapshotted leaderboards -> (dimension table, Twitch key column, name column)
+BOARDS = {
+    "games": ("games", "game_id", "game_name"),
+    "streams": ("channels", "user_login", "user_name"),
+}
+
+# One row per poll: the board's dimension keys in rank order. The first poll
+# stored for a board and second wins, e.g. over a later cache-served repeat.
+INSERT_RANK_POLL_QUERY = """
+    INSERT INTO rank_polls(board, polled_at, ranked) VALUES (?, ?, ?)
+    ON CONFLICT(board, polled_at) DO NOTHING
+    RETURNING id
+"""
+
+# The same poll indexed by entity, for rank history without decoding polls
+INSERT_RANK_ENTRY_QUERY = """
+    INSERT INTO rank_entries(board, entity_key, polled_at, rank) VALUES (?, ?, ?, ?)
+"""
+
+
+def encode_ranks(keys: list[int]) -> bytes:
+    """Pack dimension keys in rank order as little-endian uint32"""
+    return struct.pack(f"<{len(keys)}I", *keys)
+
+
+def decode_ranks(blob: bytes | None) -> dict[int, int]:
+    """Unpack a poll produced by encode_ranks into key -> rank (1-based)"""
+    if not blob:
+        return {}
+    keys = struct.unpack(f"<{len(blob) // 4}I", blob)
+    return {key: rank for rank, key in enumerate(keys, start=1)}
@@ -0,0 +1,192 @@
+import math
+import struct
+from collections import defaultdict
+
+# Rollup bucket widths in seconds, keyed by the name tools accept
+RESOLUTIONS = {
+    "5m": 300,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# A channel counts as streaming for at most one slot of this width however
+# often it is snapshotted; the 5m rollups record which slots were seen
+PRESENCE_SLOT_SECONDS = RESOLUTIONS["5m"]
+
+# Histogram bins per doubling of viewer count (~9% relative error for p95)
+BINS_PER_OCTAVE = 8
+MAX_BIN = 255
+
+_BIN_ENTRY = struct.Struct("<BI")
+
+UPSERT_CHANNEL_ROLLUP_QUERY = """
+    INSERT INTO channel_rollups
+    (resolution, channel_id, bucket_start, samples, slots, viewer_sum, viewer_peak,
+     viewer_histogram)
+    VALUES (?, (SELECT id FROM channels WHERE user_login = ?), ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(resolution, channel_id, bucket_start) DO UPDATE SET
+        samples = samples + excluded.samples,
+        slots = slots + excluded.slots,
+        viewer_sum = viewer_sum + excluded.viewer_sum,
+        viewer_peak = MAX(viewer_peak, excluded.viewer_peak),
+        viewer_histogram = merge_histograms(viewer_histogram, excluded.viewer_histogram)
+"""
+
+UPSERT_GAME_ROLLUP_QUERY = """
+    INSERT INTO game_rollups
+    (resolution, game_key, bucket_start, samples, slots, viewer_sum, viewer_peak,
+     viewer_histogram)
+    VALUES (?, (SELECT id FROM games WHERE game_id = ?), ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(resolution, game_key, bucket_start) DO UPDATE SET
+        samples = samples + excluded.samples,
+        slots = slots + excluded.slots,
+        viewer_sum = viewer_sum + excluded.viewer_sum,
+        viewer_peak = MAX(viewer_peak, excluded.viewer_peak),
+        viewer_histogram = merge_histograms(viewer_histogram, excluded.viewer_histogram)
+"""
+
+# A channel's presence slot was already counted if its 5m rollup exists
+SEEN_SLOT_QUERY = """
+    SELECT 1 FROM channel_rollups
+    WHERE resolution = ? AND bucket_start = ?
+      AND channel_id = (SELECT id FROM channels WHERE user_login = ?)
+"""
+
+
+def viewer_bin(viewers: int) -> int:
+    """Map a viewer count to its log-scale histogram bin"""
+    if viewers <= 0:
+        return 0
+    return min(1 + int(math.log2(viewers) * BINS_PER_OCTAVE), MAX_BIN)
+
+
+def bin_value(bin_index: int) -> int:
+    """Representative viewer count (geometric midpoint) of a histogram bin"""
+    if bin_index == 0:
+        return 0
+    return round(2 ** ((bin_index - 0.5) / BINS_PER_OCTAVE))
+
+
+def encode_histogram(counts: dict[int, int]) -> bytes:
+    """Pack sparse bin counts as (bin, count) pairs"""
+    return b"".join(
+        _BIN_ENTRY.pack(bin_index, count) for bin_index, count in sorted(counts.items())
+    )
+
+
+def decode_histogram(blob: bytes | None) -> dict[int, int]:
+    """Unpack a histogram produced by encode_histogram"""
+    if not blob:
+        return {}
+    return dict(_BIN_ENTRY.iter_unpack(blob))
+
+
+def merge_histograms(left: bytes | None, right: bytes | None) -> bytes:
+    """SQL function merging two encoded histograms"""
+    counts = decode_histogram(left)
+    for bin_index, count in decode_histogram(right).items():
+        counts[bin_index] = counts.get(bin_index, 0) + count
+    return encode_histogram(counts)
+
+
+def histogram_percentile(blob: bytes | None, percentile: float) -> int | None:
+    """Estimate a percentile of the viewer counts summarized by a histogram"""
+    counts = decode_histogram(blob)
+    total = sum(counts.values())
+    if not total:
+        return None
+    target = math.ceil(percentile * total)
+    seen = 0
+    for bin_index in sorted(counts):
+        seen += counts[bin_index]
+        if seen >= target:
+            return bin_value(bin_index)
+    return bin_value(max(counts))
+
+
+class _Bucket:
+    __slots__ = ("samples", "slots", "viewer_sum", "viewer_peak", "histogram")
+
+    def __init__(self):
+        self.samples = 0
+        self.slots = 0
+        self.viewer_sum = 0
+        self.viewer_peak = 0
+        self.histogram: dict[int, int] = defaultdict(int)
+
+    def add(self, viewers: int):
+        self.samples += 1
+        self.viewer_sum += viewers
+        self.viewer_peak = max(self.viewer_peak, viewers)
+        self.histogram[viewer_bin(viewers)] += 1
+
+    def row(self) -> tuple:
+        return (
+            self.samples,
+            self.slots,
+            self.viewer_sum,
+            self.viewer_peak,
+            encode_histogram(self.histogram),
+        )
+
+
+class RollupAccumulator:
+    """Aggregates snapshots into rollup buckets in memory before one upsert
+
+    Feeding a batch through add() and then flush() costs one upsert per
+    touched bucket instead of one per snapshot per resolution. Buckets
+    starting before since (epoch seconds) are left out.
+
+    Each bucket also counts the distinct presence slots its channels were
+    seen in. A slot is credited once, to the game of the channel's first
+    snapshot in it, and not again if an earlier flush already wrote it.
+    """
+
+    def __init__(self, since: int = 0):
+        self.since = since
+        self._channels: dict[tuple[int, str, int], _Bucket] = defaultdict(_Bucket)
+        self._games: dict[tuple[int, str, int], _Bucket] = defaultdict(_Bucket)
+        self._slots: dict[tuple[str, int], tuple[str | None, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._channels) + len(self._games)
+
+    def add(self, user_login: str, game_id: str | None, viewers: int, timestamp: int):
+        """Account one snapshot (timestamp in epoch seconds) in every resolution"""
+        slot_start = timestamp - timestamp % PRESENCE_SLOT_SECONDS
+        if slot_start >= self.since:
+            self._slots.setdefault((user_login, slot_start), (game_id, timestamp))
+        for width in RESOLUTIONS.values():
+            bucket_start = timestamp - timestamp % width
+            if bucket_start < self.since:
+                continue
+            self._channels[(width, user_login, bucket_start)].add(viewers)
+            if game_id:
+                self._games[(width, game_id, bucket_start)].add(viewers)
+
+    def flush(self, cursor):
+        """Merge the accumulated buckets into the rollup tables and reset"""
+        for (user_login, slot_start), (game_id, timestamp) in self._slots.items():
+            seen = cursor.execute(
+                SEEN_SLOT_QUERY, (PRESENCE_SLOT_SECONDS, slot_start, user_login)
+            ).fetchall()
+            if seen:
+                continue
+            for width in RESOLUTIONS.values():
+                bucket_start = timestamp - timestamp % width
+                if bucket_start < self.since:
+                    continue
+                self._channels[(width, user_login, bucket_start)].slots += 1
+                if game_id:
+                    self._games[(width, game_id, bucket_start)].slots += 1
+        cursor.executemany(
+            UPSERT_CHANNEL_ROLLUP_QUERY,
+            (key + bucket.row() for key, bucket in self._channels.items()),
+        )
+        cursor.executemany(
+            UPSERT_GAME_ROLLUP_QUERY,
+            (key + bucket.row() for key, bucket in self._games.items()),
+        )
+        self._channels.clear()
+        self._games.clear()
+        self._slots.clear()
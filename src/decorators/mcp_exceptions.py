@@ -4,31 +4,53 @@ from src.utils.exceptions import (
     ServiceUnavailableError,
     ResourceNotFoundError,
     DatabaseError,
+    InvalidParameterError,
+    RateLimitError,
 )
 from src.utils.logging_config import logger
+from src.utils.metrics import metrics
 
 
 def handle_mcp_exceptions(func):
-    """Decorator to handle common MCP tool exceptions"""
+    """Decorator to handle common MCP tool exceptions
+
+    Each call is also traced: its latency, outcome and the stages it went
+    through are recorded when metrics are enabled.
+    """
 
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
+        if not metrics.enabled:
+            return await handle(*args, **kwargs)
+        with metrics.trace(func.__name__) as trace:
+            result = await handle(*args, **kwargs)
+            if isinstance(result, dict) and "error" in result:
+                trace.outcome = "error"
+            return result
+
+    async def handle(*args, **kwargs):
         try:
             return await func(*args, **kwargs)
         except AuthenticationError as e:
-            logger.error(f"Authentication error in {func.__name__}: {e}")
+            logger.error("Authentication error in %s: %s", func.__name__, e)
             return {"error": f"Authentication failed: {e}"}
+        except RateLimitError as e:
+            logger.warning("Rate limited in %s: %s", func.__name__, e)
+            return {"error": f"Twitch rate limit reached, try again shortly: {e}"}
         except ServiceUnavailableError as e:
-            logger.error(f"Service unavailable in {func.__name__}: {e}")
+            logger.error("Service unavailable in %s: %s", func.__name__, e)
             return {"error": f"Service temporarily unavailable: {e}"}
         except ResourceNotFoundError as e:
-            logger.warning(f"No resources found in {func.__name__}: {e}")
+            logger.warning("No resources found in %s: %s", func.__name__, e)
             return {"message": str(e)}
+        except InvalidParameterError as e:
+            logger.warning("Invalid parameter in %s: %s", func.__name__, e)
+            return {"error": f"Invalid parameter: {e}"}
         except DatabaseError as e:
-            logger.error(f"Database error in {func.__name__}: {e}")
+            logger.error("Database error in %s: %s", func.__name__, e)
             return {"error": f"Database operation failed: {e}"}
         except Exception as e:
-            logger.error(f"Unexpected error in {func.__name__}: {e}")
+            logger.error("Unexpected error in %s: %s", func.__name__, e)
             return {"error": f"An unexpected error occurred: {e}"}
 
     return wrapper
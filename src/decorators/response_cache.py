@@ -0,0 +1,33 @@
+import functools
+import inspect
+
+
+def cached_response(endpoint: str, ignore: tuple[str, ...] = ()):
+    """Decorator to serve a TwitchService read method through its ResponseCache
+
+    The cache key is built from the call arguments except limit, which the
+    cache uses to answer smaller requests from larger cached responses, and
+    any arguments named in ignore (e.g. callbacks that do not affect the data).
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop("self")
+            limit = arguments.pop("limit", None)
+            for name in ignore:
+                arguments.pop(name, None)
+            key = tuple(sorted(arguments.items()))
+
+            return await self.cache.get_or_fetch(
+                endpoint, key, lambda: func(self, *args, **kwargs), limit=limit
+            )
+
+        return wrapper
+
+    return decorator
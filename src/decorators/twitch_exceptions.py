@@ -1,7 +1,9 @@
 import functools
+import inspect
 from src.utils.exceptions import (
     AuthenticationError,
     ServiceUnavailableError,
+    TwitchAnalyticsException,
 )
 from twitchAPI.type import (
     TwitchAPIException,
@@ -10,33 +12,61 @@ from twitchAPI.type import (
     TwitchBackendException,
     MissingScopeException,
 )
+from src.utils.metrics import metrics
+
+
+def _translate_exception(e: Exception) -> TwitchAnalyticsException:
+    """Map a Twitch API exception to the matching domain exception"""
+    if isinstance(
+        e, (InvalidTokenException, UnauthorizedException, MissingScopeException)
+    ):
+        return AuthenticationError(f"Invalid Twitch API credentials: {e}")
+    if isinstance(e, TwitchBackendException):
+        return ServiceUnavailableError(
+            "Twitch API is currently unavailable. Please try again later."
+        )
+    if isinstance(e, TwitchAPIException):
+        return ServiceUnavailableError(f"Error communicating with Twitch API: {e}")
+    return ServiceUnavailableError(f"An unexpected error occurred: {e}")
 
 
 def handle_twitch_exceptions(func):
     """Decorator to transform Twitch API exceptions to domain exceptions
 
-    Only handles exception transformation - logging is handled by caller
+    Works for both coroutines and async generators.
+    Only handles exception transformation - logging is handled by caller.
+    Coroutine calls are timed as a "twitch.<method>" stage and failures are
+    counted per method.
     """
+    stage = f"twitch.{func.__name__}"
+
+    if inspect.isasyncgenfunction(func):
+
+        @functools.wraps(func)
+        async def gen_wrapper(self, *args, **kwargs):
+            try:
+                async for item in func(self, *args, **kwargs):
+                    yield item
+            except TwitchAnalyticsException:
+                metrics.inc("twitch_mcp_twitch_errors_total", method=func.__name__)
+                raise
+            except Exception as e:
+                metrics.inc("twitch_mcp_twitch_errors_total", method=func.__name__)
+                raise _translate_exception(e) from e
+
+        return gen_wrapper
 
     @functools.wraps(func)
     async def wrapper(self, *args, **kwargs):
         try:
-            result = await func(self, *args, **kwargs)
+            with metrics.span(stage):
+                result = await func(self, *args, **kwargs)
             return result
-
-        except (
-            InvalidTokenException,
-            UnauthorizedException,
-            MissingScopeException,
-        ) as e:
-            raise AuthenticationError(f"Invalid Twitch API credentials: {e}")
-        except TwitchBackendException:
-            raise ServiceUnavailableError(
-                "Twitch API is currently unavailable. Please try again later."
-            )
-        except TwitchAPIException as e:
-            raise ServiceUnavailableError(f"Error communicating with Twitch API: {e}")
+        except TwitchAnalyticsException:
+            metrics.inc("twitch_mcp_twitch_errors_total", method=func.__name__)
+            raise
         except Exception as e:
-            raise ServiceUnavailableError(f"An unexpected error occurred: {e}")
+            metrics.inc("twitch_mcp_twitch_errors_total", method=func.__name__)
+            raise _translate_exception(e) from e
 
     return wrapper
@@ -1,59 +1,103 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 from fastmcp import FastMCP
-from src.services.twitch_api import TwitchService
-from src.db.database import DatabaseService
+from src.models import LiveStatus
+from src.services.cache import served_from_cache
+from src.services.registry import services
 from src.utils.logging_config import logger
+from src.utils.metrics import metrics
 from src.decorators.mcp_exceptions import handle_mcp_exceptions
-from src.utils.exceptions import DatabaseError
+from src.utils.exceptions import DatabaseError, InvalidParameterError
 
-mcp = FastMCP("Twitch MCP")
+# Upper bound for paginated tool results
+MAX_PAGE_SIZE = 1000
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Own the shared Twitch client and database for the lifetime of the server
+
+    Services start in the background so the client's first requests are not
+    held up by the Twitch token handshake; tools create what they need on
+    first use.
+    """
+    startup = asyncio.create_task(services.start())
+    try:
+        yield
+    finally:
+        startup.cancel()
+        await asyncio.gather(startup, return_exceptions=True)
+        await services.close()
+
+
+mcp = FastMCP("Twitch MCP", lifespan=lifespan)
 
 
 @mcp.tool
 @handle_mcp_exceptions
-async def get_trending_channels(limit: int = 10) -> list[dict]:
+async def get_trending_channels(
+    limit: int = 10, min_viewers: int | None = None
+) -> list[dict]:
     """Get current trending streamers from Twitch
 
     Args:
-        limit: Maximum number of streamers to fetch (default: 10)
+        limit: Maximum number of streamers to fetch (default: 10, any depth)
+        min_viewers: Only streamers with at least this many viewers
 
     Returns:
         List of trending streamers with their details
     """
-    try:
-        logger.info(f"Fetching {limit} trending streamers")
+    if limit < 1:
+        raise InvalidParameterError("limit must be at least 1")
 
-        twitch_service = TwitchService()
-        db_service = DatabaseService("twitch_analytics.db")
+    logger.info("Fetching %s trending streamers", limit)
 
-        streams = await twitch_service.get_trending_streams(limit)
+    twitch_service = await services.get_twitch()
+    db_service = services.get_database()
 
+    fetched_pages = 0
+
+    async def store_page(page):
+        nonlocal fetched_pages
+        fetched_pages += 1
+        # Committed by the writer thread while the next page is being fetched
         try:
-            db_service.insert_stream_snapshots(streams)
+            await db_service.insert_stream_snapshots(page)
         except Exception as db_error:
             raise DatabaseError(f"Failed to save stream snapshots: {db_error}")
 
-        result = [
-            {
-                "user": s.user_name,
-                "viewers": s.viewer_count,
-                "game": s.game_name,
-                "title": s.title,
-                "language": s.language,
-                "is_live": s.is_live,
-                "timestamp": str(s.timestamp),
-            }
-            for s in streams
-        ]
+    # Pages are only stored when fetched; cache hits were stored by the fetching call
+    streams = await twitch_service.get_trending_streams(
+        limit, min_viewers=min_viewers, on_page=store_page
+    )
 
-        logger.info(f"Successfully returned {len(result)} trending streamers")
-        return result
+    if fetched_pages:
+        try:
+            await db_service.insert_rank_snapshot(
+                "streams",
+                streams[0].timestamp,
+                [(s.user_login, s.user_name) for s in streams],
+            )
+        except Exception as db_error:
+            raise DatabaseError(f"Failed to save stream rankings: {db_error}")
+
+    result = [
+        {
+            "user": s.user_name,
+            "viewers": s.viewer_count,
+            "game": s.game_name,
+            "title": s.title,
+            "language": s.language,
+            "is_live": s.is_live,
+            "timestamp": str(s.timestamp),
+            "started_at": str(s.started_at) if s.started_at else None,
+        }
+        for s in streams
+    ]
 
-    finally:
-        if "twitch_service" in locals() and twitch_service:
-            try:
-                await twitch_service.close()
-            except Exception as cleanup_error:
-                logger.warning(f"Error during cleanup: {cleanup_error}")
+    logger.info("Successfully returned %s trending streamers", len(result))
+    return result
 
 
 @mcp.tool
@@ -67,33 +111,126 @@ async def get_top_games(limit: int = 10) -> list[dict]:
     Returns:
         List of top games with their rankings and details
     """
-    try:
-        logger.info(f"Fetching {limit} top games")
+    logger.info("Fetching %s top games", limit)
+
+    twitch_service = await services.get_twitch()
+    games = await twitch_service.get_top_games(limit)
+
+    if not served_from_cache() and games:
+        catalog = await services.get_game_catalog()
+        db_service = services.get_database()
+        try:
+            await catalog.record_rankings(games)
+            await db_service.insert_rank_snapshot(
+                "games", games[0].timestamp, [(g.game_id, g.game_name) for g in games]
+            )
+        except Exception as db_error:
+            raise DatabaseError(f"Failed to save game rankings: {db_error}")
+
+    result = [
+        {
+            "rank": g.rank,
+            "game_name": g.game_name,
+            "game_id": g.game_id,
+            "box_art_url": g.box_art_url,
+            "igdb_id": g.igdb_id,
+            "timestamp": str(g.timestamp),
+        }
+        for g in games
+    ]
+
+    logger.info("Successfully returned %s top games", len(result))
+    return result
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_top_games_live(limit: int = 10, max_streams: int = 1000) -> dict:
+    """Get current top games with their live viewer and channel counts
+
+    Viewers and channels are summed over the most viewed live streams of
+    those games, scanning at most max_streams streams.
 
-        twitch_service = TwitchService()
-        games = await twitch_service.get_top_games(limit)
+    Args:
+        limit: Number of top games (1-100, default: 10)
+        max_streams: Most viewed streams of these games to aggregate (default: 1000)
+
+    Returns:
+        A dictionary with the ranked games, their metadata and live totals,
+        and how many streams were scanned
+    """
+    from src.services.twitch_api import HELIX_MAX_IDS_PER_REQUEST
+
+    if not 1 <= limit <= HELIX_MAX_IDS_PER_REQUEST:
+        raise InvalidParameterError(
+            f"limit must be between 1 and {HELIX_MAX_IDS_PER_REQUEST}"
+        )
+    if max_streams < 1:
+        raise InvalidParameterError("max_streams must be at least 1")
+
+    logger.info("Fetching %s top games with live totals", limit)
+
+    twitch_service = await services.get_twitch()
+    db_service = services.get_database()
+    catalog = await services.get_game_catalog()
+
+    games = await twitch_service.get_top_games(limit)
+    if not games:
+        # Without game ids the stream scan would not be filtered at all
+        return {
+            "games": [],
+            "streams_scanned": 0,
+            "truncated": False,
+            "timestamp": str(datetime.now(timezone.utc)),
+        }
+    if not served_from_cache():
+        await catalog.record_rankings(games)
+    game_ids = [g.game_id for g in games]
+    metadata = await catalog.get_games(game_ids)
+
+    totals = {game_id: [0, 0] for game_id in game_ids}
+    scanned = 0
+    writes = []
+    async for page in twitch_service.iter_stream_pages(max_streams, game_ids=game_ids):
+        scanned += len(page)
+        for s in page:
+            game_total = totals.get(s.game_id)
+            if game_total is not None:
+                game_total[0] += s.viewer_count
+                game_total[1] += 1
+        # Committed by the writer thread while the next page is fetched
+        writes.append(asyncio.ensure_future(db_service.insert_stream_snapshots(page)))
+
+    try:
+        await asyncio.gather(*writes)
+    except Exception as db_error:
+        raise DatabaseError(f"Failed to save stream snapshots: {db_error}")
 
-        result = [
+    result_games = []
+    for g in games:
+        game = metadata.get(g.game_id)
+        viewers, channels = totals[g.game_id]
+        result_games.append(
             {
                 "rank": g.rank,
-                "game_name": g.game_name,
                 "game_id": g.game_id,
-                "box_art_url": g.box_art_url,
-                "igdb_id": g.igdb_id,
-                "timestamp": str(g.timestamp),
+                "game_name": game.game_name if game else g.game_name,
+                "box_art_url": game.box_art_url if game else g.box_art_url,
+                "igdb_id": game.igdb_id if game else g.igdb_id,
+                "viewers": viewers,
+                "channels": channels,
             }
-            for g in games
-        ]
-
-        logger.info(f"Successfully returned {len(result)} top games")
-        return result
+        )
 
-    finally:
-        if "twitch_service" in locals() and twitch_service:
-            try:
-                await twitch_service.close()
-            except Exception as cleanup_error:
-                logger.warning(f"Error during cleanup: {cleanup_error}")
+    logger.info(
+        "Successfully returned %s top games over %s streams", len(result_games), scanned
+    )
+    return {
+        "games": result_games,
+        "streams_scanned": scanned,
+        "truncated": scanned >= max_streams,
+        "timestamp": str(games[0].timestamp),
+    }
 
 
 @mcp.tool
@@ -107,72 +244,665 @@ async def get_channel_current_performance(user_login: str) -> dict:
     Returns:
         A dictionary with the streamer's current performance metrics
     """
-    try:
-        logger.info(f"Fetching current performance for user: {user_login}")
+    logger.info("Fetching current performance for user: %s", user_login)
 
-        twitch_service = TwitchService()
-        db_service = DatabaseService("twitch_analytics.db")
+    twitch_service = await services.get_twitch()
+    db_service = services.get_database()
 
-        snapshot = await twitch_service.get_user_performance(user_login)
+    snapshot = await twitch_service.get_user_performance(user_login)
 
+    if not served_from_cache():
         try:
-            db_service.insert_stream_snapshots([snapshot])
+            await db_service.insert_stream_snapshots([snapshot])
         except Exception as db_error:
             raise DatabaseError(f"Failed to save stream snapshot: {db_error}")
 
-        result = {
-            "user": snapshot.user_name,
-            "viewers": snapshot.viewer_count,
-            "game": snapshot.game_name,
-            "title": snapshot.title,
-            "language": snapshot.language,
-            "is_live": snapshot.is_live,
-            "timestamp": str(snapshot.timestamp),
-        }
+    result = {
+        "user": snapshot.user_name,
+        "viewers": snapshot.viewer_count,
+        "game": snapshot.game_name,
+        "title": snapshot.title,
+        "language": snapshot.language,
+        "is_live": snapshot.is_live,
+        "timestamp": str(snapshot.timestamp),
+        "started_at": str(snapshot.started_at) if snapshot.started_at else None,
+    }
 
-        logger.info(f"Successfully fetched performance for user: {user_login}")
-        return result
+    logger.info("Successfully fetched performance for user: %s", user_login)
+    return result
 
-    finally:
-        if "twitch_service" in locals() and twitch_service:
-            try:
-                await twitch_service.close()
-            except Exception as cleanup_error:
-                logger.warning(f"Error during cleanup: {cleanup_error}")
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_channels_current_performance(user_logins: list[str]) -> dict:
+    """Get current live status and performance metrics for many streamers at once
+
+    Args:
+        user_logins: Twitch usernames of the streamers (any number)
+
+    Returns:
+        A dictionary with live/offline counts and one entry per requested channel
+    """
+    if not user_logins:
+        raise InvalidParameterError("user_logins must not be empty")
+
+    logger.info("Fetching current performance for %s users", len(user_logins))
+
+    twitch_service = await services.get_twitch()
+    db_service = services.get_database()
+
+    performance = await twitch_service.get_users_performance(user_logins)
+    live_snapshots = [s for s in performance.values() if s is not None]
+
+    try:
+        await db_service.insert_stream_snapshots(live_snapshots)
+    except Exception as db_error:
+        raise DatabaseError(f"Failed to save stream snapshots: {db_error}")
+
+    channels = []
+    for login, s in performance.items():
+        if s is None:
+            channels.append({"user": login, "is_live": False})
+        else:
+            channels.append(
+                {
+                    "user": s.user_name,
+                    "viewers": s.viewer_count,
+                    "game": s.game_name,
+                    "title": s.title,
+                    "language": s.language,
+                    "is_live": s.is_live,
+                    "timestamp": str(s.timestamp),
+                    "started_at": str(s.started_at) if s.started_at else None,
+                }
+            )
+
+    result = {
+        "live_count": len(live_snapshots),
+        "offline_count": len(channels) - len(live_snapshots),
+        "channels": channels,
+    }
+
+    logger.info(
+        "Successfully fetched performance for %s users (%s live)",
+        len(channels),
+        len(live_snapshots),
+    )
+    return result
 
 
 @mcp.tool
 @handle_mcp_exceptions
-async def get_all_stream_snapshots_from_db() -> list[dict]:
-    """Get all stored stream snapshots from the database
+async def get_live_status(user_logins: list[str]) -> dict:
+    """Get whether streamers are live and what they are playing
+
+    Channels tracked over EventSub are answered from memory; the rest are
+    looked up on Twitch in one batched request.
+
+    Args:
+        user_logins: Twitch usernames of the streamers
+
+    Returns:
+        A dictionary with live/offline counts and one entry per requested
+        channel, each noting whether it came from EventSub or Helix
+    """
+    if not user_logins:
+        raise InvalidParameterError("user_logins must not be empty")
+
+    monitor = await services.get_live_status()
+    known, missing = monitor.lookup(user_logins)
+    statuses = dict(known)
+
+    if missing:
+        twitch_service = await services.get_twitch()
+        db_service = services.get_database()
+
+        observed_at = datetime.now(timezone.utc)
+        performance = await twitch_service.get_users_performance(missing)
+        live_snapshots = [s for s in performance.values() if s is not None]
+
+        try:
+            await db_service.insert_stream_snapshots(live_snapshots)
+        except Exception as db_error:
+            raise DatabaseError(f"Failed to save stream snapshots: {db_error}")
+
+        for login, snapshot in performance.items():
+            statuses[login] = LiveStatus.from_snapshot(login, snapshot, observed_at)
+
+    channels = [
+        statuses[login].to_dict()
+        for login in dict.fromkeys(u.lower() for u in user_logins)
+    ]
+    live_count = sum(1 for channel in channels if channel["is_live"])
+
+    logger.info(
+        "Returned live status for %s users (%s from EventSub)",
+        len(channels),
+        len(known),
+    )
+    return {
+        "live_count": live_count,
+        "offline_count": len(channels) - live_count,
+        "channels": channels,
+    }
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def track_live_channels(user_logins: list[str]) -> dict:
+    """Start following streamers over EventSub so get_live_status answers from memory
+
+    Connects the EventSub WebSocket first if it is not running yet. Needs
+    TWITCH_USER_ACCESS_TOKEN.
+
+    Args:
+        user_logins: Twitch usernames of the streamers to track
 
     Returns:
-        List of all stream snapshots with their details
+        A dictionary with the newly tracked channels, the channels whose
+        subscriptions were rejected and the monitor status
     """
+    if not user_logins:
+        raise InvalidParameterError("user_logins must not be empty")
+
+    monitor = await services.get_live_status()
+    await monitor.start()
+    result = await monitor.track(user_logins)
+    result["status"] = monitor.status()
+    return result
+
+
+def _parse_time(value: str | None, name: str) -> datetime | None:
+    """Parse an ISO 8601 tool argument, treating naive values as UTC"""
+    if value is None:
+        return None
     try:
-        logger.info("Fetching all stored stream snapshots")
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise InvalidParameterError(f"{name} must be an ISO 8601 timestamp")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
 
-        db_service = DatabaseService("twitch_analytics.db")
-        snapshots = db_service.get_all_streams()
 
-        result = [
-            {
-                "user": s.user_name,
-                "viewers": s.viewer_count,
-                "game": s.game_name,
-                "title": s.title,
-                "language": s.language,
-                "is_live": s.is_live,
-                "timestamp": str(s.timestamp),
-            }
-            for s in snapshots
-        ]
+@mcp.tool
+@handle_mcp_exceptions
+async def get_stream_snapshots_from_db(
+    user_login: str | None = None,
+    game_id: str | None = None,
+    language: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    min_viewers: int | None = None,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> dict:
+    """Get stored stream snapshots from the database, newest first, one page at a time
 
-        logger.info(f"Successfully returned {len(result)} stored stream snapshots")
-        return result
+    Args:
+        user_login: Only snapshots of this channel
+        game_id: Only snapshots of this game
+        language: Only snapshots in this language (e.g. "en")
+        since: Only snapshots at or after this ISO 8601 time
+        until: Only snapshots before this ISO 8601 time
+        min_viewers: Only snapshots with at least this many viewers
+        limit: Maximum number of snapshots to return (default: 100, max: 1000)
+        cursor: Continuation cursor from a previous call
 
-    except Exception as db_error:
-        raise DatabaseError(f"Failed to fetch stored stream snapshots: {db_error}")
+    Returns:
+        A dictionary with the page of snapshots and next_cursor (null on the last page)
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise InvalidParameterError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    logger.info("Fetching up to %s stored stream snapshots", limit)
+
+    db_service = services.get_database()
+    # Records skip model validation and serialize straight to the response shape
+    snapshots, next_cursor = await db_service.query_streams(
+        limit=limit,
+        cursor=cursor,
+        records=True,
+        user_login=user_login,
+        game_id=game_id,
+        language=language,
+        since=_parse_time(since, "since"),
+        until=_parse_time(until, "until"),
+        min_viewers=min_viewers,
+    )
+
+    result = {
+        "snapshots": [s.to_dict() for s in snapshots],
+        "next_cursor": next_cursor,
+    }
+
+    logger.info("Successfully returned %s stored stream snapshots", len(snapshots))
+    return result
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def search_stream_titles(
+    query: str,
+    since: str | None = None,
+    until: str | None = None,
+    min_viewers: int | None = None,
+    language: str | None = None,
+    order_by: str = "viewers",
+    limit: int = 20,
+) -> list[dict]:
+    """Find channels whose stored stream titles match a full-text search
+
+    Args:
+        query: Words to search for, with FTS5 syntax: "speedrun OR tournament",
+            "speedrun NOT practice", a "quoted phrase" or a prefix like "speedrun*"
+        since: Only snapshots at or after this ISO 8601 time (default: 7 days ago)
+        until: Only snapshots before this ISO 8601 time
+        min_viewers: Only snapshots with at least this many viewers
+        language: Only snapshots in this language (e.g. "en")
+        order_by: "viewers" (peak viewers, default) or "relevance"
+        limit: Maximum number of channels (1-100, default: 20)
+
+    Returns:
+        List of matching channels with their best-viewed matching title, peak
+        and average viewers over the matching snapshots
+    """
+    if not query.strip():
+        raise InvalidParameterError("query must not be empty")
+    if not 1 <= limit <= 100:
+        raise InvalidParameterError("limit must be between 1 and 100")
+
+    logger.info("Searching stream titles for: %s", query)
+
+    db_service = services.get_database()
+    results = await db_service.search_titles(
+        query,
+        since=_parse_time(since, "since")
+        or datetime.now(timezone.utc) - timedelta(days=7),
+        until=_parse_time(until, "until"),
+        min_viewers=min_viewers,
+        language=language,
+        order_by=order_by,
+        limit=limit,
+    )
+
+    result = [r.model_dump(mode="json") for r in results]
+
+    logger.info("Successfully returned %s matching channels", len(result))
+    return result
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_channel_viewer_history(
+    user_login: str,
+    resolution: str = "hour",
+    since: str | None = None,
+    until: str | None = None,
+) -> list[dict]:
+    """Get average, peak and p95 viewers and hours streamed for a channel over time
+
+    Args:
+        user_login: Twitch username of the streamer
+        resolution: Bucket size, one of "5m", "hour" or "day" (default: "hour")
+        since: Only buckets at or after this ISO 8601 time
+        until: Only buckets before this ISO 8601 time
+
+    Returns:
+        List of time buckets with viewer statistics, oldest first
+    """
+    logger.info("Fetching %s viewer history for user: %s", resolution, user_login)
+
+    db_service = services.get_database()
+    buckets = await db_service.get_channel_viewer_history(
+        user_login,
+        resolution=resolution,
+        since=_parse_time(since, "since"),
+        until=_parse_time(until, "until"),
+    )
+
+    result = [b.model_dump(mode="json") for b in buckets]
+
+    logger.info("Successfully returned %s history buckets", len(result))
+    return result
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_game_viewer_history(
+    game_id: str,
+    resolution: str = "hour",
+    since: str | None = None,
+    until: str | None = None,
+) -> list[dict]:
+    """Get per-stream average, peak and p95 viewers and total hours streamed for a game
+
+    Args:
+        game_id: Twitch game id (as returned by get_top_games)
+        resolution: Bucket size, one of "5m", "hour" or "day" (default: "hour")
+        since: Only buckets at or after this ISO 8601 time
+        until: Only buckets before this ISO 8601 time
+
+    Returns:
+        List of time buckets with viewer statistics, oldest first
+    """
+    logger.info("Fetching %s viewer history for game: %s", resolution, game_id)
+
+    db_service = services.get_database()
+    buckets = await db_service.get_game_viewer_history(
+        game_id,
+        resolution=resolution,
+        since=_parse_time(since, "since"),
+        until=_parse_time(until, "until"),
+    )
+
+    result = [b.model_dump(mode="json") for b in buckets]
+
+    logger.info("Successfully returned %s history buckets", len(result))
+    return result
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_rank_movers(
+    board: str = "games", hours: float = 24, limit: int = 10
+) -> dict:
+    """Get the games or streams that climbed or fell the most in the last hours
+
+    Compares the first and the last stored leaderboard poll of the window.
+    Polls are stored by get_top_games, get_trending_channels and the collector.
+
+    Args:
+        board: "games" (top games) or "streams" (top streams by viewers)
+        hours: Length of the window ending now (default: 24)
+        limit: Entries per list (default: 10)
+
+    Returns:
+        A dictionary with the compared poll times and the biggest climbers,
+        the biggest fallers, and entries that entered or dropped off the board
+    """
+    if hours <= 0:
+        raise InvalidParameterError("hours must be positive")
+    if limit < 1:
+        raise InvalidParameterError("limit must be at least 1")
+
+    logger.info("Computing %s rank movers over %s hours", board, hours)
+
+    db_service = services.get_database()
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    first, last, changes = await db_service.get_rank_changes(board, since)
+
+    moved = [c for c in changes if c.change]
+    result = {
+        "board": board,
+        "from": str(first) if first else None,
+        "to": str(last) if last else None,
+        "climbers": [
+            c.model_dump()
+            for c in sorted(moved, key=lambda c: -c.change)[:limit]
+            if c.change > 0
+        ],
+        "fallers": [
+            c.model_dump()
+            for c in sorted(moved, key=lambda c: c.change)[:limit]
+            if c.change < 0
+        ],
+        "entered": [
+            c.model_dump()
+            for c in sorted(changes, key=lambda c: c.rank or 0)
+            if c.previous_rank is None
+        ][:limit],
+        "dropped": [
+            c.model_dump()
+            for c in sorted(changes, key=lambda c: c.previous_rank or 0)
+            if c.rank is None
+        ][:limit],
+    }
+
+    logger.info("Successfully compared %s ranked %s", len(changes), board)
+    return result
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_game_rank_history(
+    game_id: str, since: str | None = None, until: str | None = None
+) -> list[dict]:
+    """Get a game's rank in each stored top games poll
+
+    Args:
+        game_id: Twitch game id (as returned by get_top_games)
+        since: Only polls at or after this ISO 8601 time
+        until: Only polls before this ISO 8601 time
+
+    Returns:
+        List of (polled_at, rank) entries, oldest first; polls the game was
+        not part of are left out
+    """
+    logger.info("Fetching rank history for game: %s", game_id)
+
+    db_service = services.get_database()
+    points = await db_service.get_rank_history(
+        "games",
+        game_id,
+        since=_parse_time(since, "since"),
+        until=_parse_time(until, "until"),
+    )
+
+    result = [p.model_dump(mode="json") for p in points]
+
+    logger.info("Successfully returned %s ranks", len(result))
+    return result
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_game_share_of_voice(
+    since: str | None = None,
+    until: str | None = None,
+    resolution: str = "hour",
+    top: int = 10,
+) -> list[dict]:
+    """Get each top game's share of all stored viewers per time bucket
+
+    Args:
+        since: Start of the window as ISO 8601 (default: 7 days ago)
+        until: End of the window as ISO 8601 (default: now)
+        resolution: Bucket size, one of "5m", "hour" or "day" (default: "hour")
+        top: Number of games by total viewers to include (default: 10)
+
+    Returns:
+        List of (bucket, game, share) entries, oldest bucket first
+    """
+    if top < 1:
+        raise InvalidParameterError("top must be at least 1")
+
+    logger.info("Computing %s share of voice for top %s games", resolution, top)
+
+    # numpy is only loaded by the analytics tools
+    from src.services.analytics import AnalyticsService
+
+    db_service = services.get_database()
+    shares = await db_service.read(
+        lambda db: AnalyticsService(db).game_share_of_voice(
+            since=_parse_time(since, "since"),
+            until=_parse_time(until, "until"),
+            resolution=resolution,
+            top=top,
+        )
+    )
+
+    result = [s.model_dump(mode="json") for s in shares]
+
+    logger.info("Successfully returned %s share of voice entries", len(result))
+    return result
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_channel_growth(
+    since: str | None = None,
+    until: str | None = None,
+    limit: int = 20,
+    min_samples: int = 10,
+    declining: bool = False,
+) -> list[dict]:
+    """Get the channels whose viewers grew (or declined) fastest over a window
+
+    Growth is the least-squares viewer trend per day relative to the channel's
+    average, e.g. 0.05 means +5% of its average viewers per day.
+
+    Args:
+        since: Start of the window as ISO 8601 (default: 7 days ago)
+        until: End of the window as ISO 8601 (default: now)
+        limit: Maximum number of channels to return (default: 20)
+        min_samples: Ignore channels with fewer stored snapshots (default: 10)
+        declining: Return the fastest declining channels instead
+
+    Returns:
+        List of channels with sample count, average viewers and daily growth rate
+    """
+    if limit < 1:
+        raise InvalidParameterError("limit must be at least 1")
+    if min_samples < 1:
+        raise InvalidParameterError("min_samples must be at least 1")
+
+    logger.info("Computing channel growth for %s channels", limit)
+
+    from src.services.analytics import AnalyticsService
+
+    db_service = services.get_database()
+    growth = await db_service.read(
+        lambda db: AnalyticsService(db).channel_growth(
+            since=_parse_time(since, "since"),
+            until=_parse_time(until, "until"),
+            limit=limit,
+            min_samples=min_samples,
+            declining=declining,
+        )
+    )
+
+    result = [g.model_dump(mode="json") for g in growth]
+
+    logger.info("Successfully returned growth for %s channels", len(result))
+    return result
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_viewer_anomalies(
+    user_login: str | None = None,
+    game_id: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    resolution: str = "5m",
+    window: int = 12,
+    threshold: float = 3.0,
+    limit: int = 50,
+) -> list[dict]:
+    """Find viewer spikes more than threshold standard deviations above a channel's rolling baseline
+
+    Args:
+        user_login: Only check this channel
+        game_id: Only check snapshots of this game
+        since: Start of the window as ISO 8601 (default: 7 days ago)
+        until: End of the window as ISO 8601 (default: now)
+        resolution: Bucket size, one of "5m", "hour" or "day" (default: "5m")
+        window: Number of previous buckets forming the baseline (default: 12)
+        threshold: Minimum z-score to report (default: 3.0)
+        limit: Maximum number of anomalies to return, strongest first (default: 50)
+
+    Returns:
+        List of anomalies with viewers, baseline mean and deviation and z-score
+    """
+    if limit < 1:
+        raise InvalidParameterError("limit must be at least 1")
+
+    logger.info("Detecting viewer anomalies above %s sigma", threshold)
+
+    from src.services.analytics import AnalyticsService
+
+    db_service = services.get_database()
+    anomalies = await db_service.read(
+        lambda db: AnalyticsService(db).viewer_anomalies(
+            since=_parse_time(since, "since"),
+            until=_parse_time(until, "until"),
+            user_login=user_login,
+            game_id=game_id,
+            resolution=resolution,
+            window=window,
+            threshold=threshold,
+            limit=limit,
+        )
+    )
+
+    result = [a.model_dump(mode="json") for a in anomalies]
+
+    logger.info("Successfully returned %s viewer anomalies", len(result))
+    return result
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_collector_status() -> dict:
+    """Get the state and recent timing metrics of the background snapshot collector
+
+    Returns:
+        A dictionary with cycle counters and the latest cycle's timings
+    """
+    collector = await services.get_collector()
+    return collector.status()
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_live_status_monitor() -> dict:
+    """Get the state of the EventSub live status monitor
+
+    Returns:
+        A dictionary with connection state, tracked and failed channels and
+        event counters
+    """
+    monitor = await services.get_live_status()
+    return monitor.status()
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_storage_stats() -> dict:
+    """Get database size, free space and row counts per storage tier
+
+    Returns:
+        A dictionary with file sizes, raw snapshot and rollup row counts, and
+        the retention policy with its latest run
+    """
+    db_service = services.get_database()
+    stats = await db_service.storage_stats()
+    stats["writer"] = db_service.stats()
+    stats["retention"] = services.get_retention().status()
+    return stats
+
+
+@mcp.tool
+@handle_mcp_exceptions
+async def get_cache_stats() -> dict:
+    """Get hit, miss and coalescing counters of the Twitch response cache
+
+    Returns:
+        A dictionary with cache size, evictions and per-endpoint counters and
+        TTLs, plus where game metadata lookups were answered from
+    """
+    twitch_service = await services.get_twitch()
+    stats = twitch_service.cache.stats()
+    stats["game_catalog"] = (await services.get_game_catalog()).stats()
+    return stats
+
+
+@mcp.resource("metrics://prometheus", mime_type="text/plain")
+def prometheus_metrics() -> str:
+    """Tool, Twitch and database counters and latency histograms in the
+    Prometheus text format (recorded when METRICS_ENABLED=1)"""
+    return metrics.render()
 
 
 if __name__ == "__main__":
@@ -1,9 +1,14 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import NamedTuple
 
 
 class StreamSnapshot(BaseModel):
-    """Pydantic model for a stream snapshot data"""
+    """Pydantic model for a stream snapshot data
+
+    timestamp is when the stream was observed; started_at is when it went live.
+    """
 
     user_login: str
     user_name: str
@@ -14,6 +19,61 @@ class StreamSnapshot(BaseModel):
     timestamp: datetime
     is_live: bool = True
     language: str = "en"
+    stream_id: str | None = None
+    started_at: datetime | None = None
+
+
+@lru_cache(maxsize=4096)
+def _format_epoch(epoch: int) -> str:
+    """str() of the UTC datetime; snapshots of one poll share a timestamp"""
+    return str(datetime.fromtimestamp(epoch, timezone.utc))
+
+
+class SnapshotRecord(NamedTuple):
+    """Unvalidated snapshot row for bulk reads, built straight from a query row
+
+    Column values are kept as stored; the epoch timestamp is only turned into
+    a datetime when timestamp or to_dict() is accessed.
+    """
+
+    user_login: str
+    user_name: str
+    viewer_count: int
+    game_name: str | None
+    game_id: str | None
+    title: str
+    epoch: int
+    is_live: int
+    language: str | None
+    stream_id: int | None
+    started_epoch: int | None
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.epoch, timezone.utc)
+
+    @property
+    def started_at(self) -> datetime | None:
+        if self.started_epoch is None:
+            return None
+        return datetime.fromtimestamp(self.started_epoch, timezone.utc)
+
+    def to_dict(self) -> dict:
+        """Tool response shape, identical to the one built from StreamSnapshot"""
+        return {
+            "user": self.user_name,
+            "viewers": self.viewer_count,
+            "game": self.game_name,
+            "title": self.title,
+            "language": self.language or "en",
+            "is_live": bool(self.is_live),
+            "timestamp": _format_epoch(self.epoch),
+            "started_at": (
+                _format_epoch(self.started_epoch)
+                if self.started_epoch is not None
+                else None
+            ),
+        }
 
 
 class GameRanking(BaseModel):
@@ -25,3 +85,182 @@ class GameRanking(BaseModel):
     igdb_id: str | None = None
     rank: int
     timestamp: datetime
+
+
+class GameMetadata(BaseModel):
+    """Pydantic model for a cached game, updated_at being when Helix returned it"""
+
+    game_id: str
+    game_name: str
+    box_art_url: str | None = None
+    igdb_id: str | None = None
+    updated_at: datetime
+
+
+class CollectorCycleMetrics(BaseModel):
+    """Pydantic model for timing metrics of one collector poll cycle"""
+
+    started_at: datetime
+    fetch_seconds: float = 0.0
+    write_seconds: float = 0.0
+    total_seconds: float = 0.0
+    pages: int = 0
+    rows_written: int = 0
+    games: int = 0
+    error: str | None = None
+
+
+class ViewerHistoryBucket(BaseModel):
+    """Pydantic model for one time bucket of channel or game viewer history"""
+
+    bucket_start: datetime
+    samples: int
+    avg_viewers: float
+    peak_viewers: int
+    p95_viewers: int | None = None
+    hours_streamed: float
+
+
+class ExportSummary(BaseModel):
+    """Pydantic model for the outcome of one columnar snapshot export"""
+
+    start_id: int
+    last_id: int
+    rows: int = 0
+    files: list[str] = []
+
+
+class GameShare(BaseModel):
+    """Pydantic model for a game's share of all viewers in one time bucket"""
+
+    bucket_start: datetime
+    game_id: str | None = None
+    game_name: str | None = None
+    share: float
+
+
+class ChannelGrowth(BaseModel):
+    """Pydantic model for a channel's viewer trend over a time window"""
+
+    user_login: str
+    samples: int
+    avg_viewers: float
+    growth_per_day: float
+
+
+class ViewerAnomaly(BaseModel):
+    """Pydantic model for a viewer spike above a channel's rolling baseline"""
+
+    user_login: str
+    bucket_start: datetime
+    viewers: float
+    baseline: float
+    stddev: float
+    z_score: float
+
+
+class TitleSearchResult(BaseModel):
+    """Pydantic model for a channel whose stream titles matched a search
+
+    title, peak_at and score are those of the snapshot with the most viewers;
+    a lower score is a better match (FTS5 bm25).
+    """
+
+    user_login: str
+    user_name: str
+    title: str
+    peak_viewers: int
+    avg_viewers: float
+    samples: int
+    peak_at: datetime
+    score: float
+
+
+class RankChange(BaseModel):
+    """Pydantic model for an entity's rank at the start and end of a window
+
+    key is the game id or user login. A rank is None when the entity was
+    not on that poll's leaderboard; change is positive for a climb.
+    """
+
+    key: str
+    name: str | None = None
+    previous_rank: int | None = None
+    rank: int | None = None
+    change: int | None = None
+
+
+class RankHistoryPoint(BaseModel):
+    """Pydantic model for an entity's rank in one leaderboard poll"""
+
+    polled_at: datetime
+    rank: int
+
+
+class RetentionRunMetrics(BaseModel):
+    """Pydantic model for the outcome of one retention run"""
+
+    started_at: datetime
+    deleted: dict[str, int] = {}
+    free_pages: int | None = None
+    total_seconds: float = 0.0
+    error: str | None = None
+
+
+class LiveStatus(BaseModel):
+    """Pydantic model for the last known live state of a tracked channel
+
+    updated_at is when the state was observed: the message time of an
+    EventSub notification or the request time of a Helix lookup.
+    """
+
+    user_login: str
+    user_name: str | None = None
+    user_id: str | None = None
+    is_live: bool | None = None
+    title: str | None = None
+    game_id: str | None = None
+    game_name: str | None = None
+    stream_id: str | None = None
+    started_at: datetime | None = None
+    updated_at: datetime
+    source: str
+
+    @classmethod
+    def from_snapshot(
+        cls, user_login: str, snapshot: StreamSnapshot | None, observed_at: datetime
+    ) -> "LiveStatus":
+        """State seen by a Helix streams lookup; None means the channel was offline"""
+        if snapshot is None:
+            return cls(
+                user_login=user_login,
+                is_live=False,
+                stream_id=None,
+                started_at=None,
+                updated_at=observed_at,
+                source="helix",
+            )
+        return cls(
+            user_login=user_login,
+            user_name=snapshot.user_name,
+            is_live=snapshot.is_live,
+            title=snapshot.title,
+            game_id=snapshot.game_id,
+            game_name=snapshot.game_name,
+            stream_id=snapshot.stream_id,
+            started_at=snapshot.started_at,
+            updated_at=snapshot.timestamp,
+            source="helix",
+        )
+
+    def to_dict(self) -> dict:
+        """Tool response shape"""
+        return {
+            "user": self.user_name or self.user_login,
+            "is_live": self.is_live,
+            "game": self.game_name,
+            "title": self.title,
+            "started_at": str(self.started_at) if self.started_at else None,
+            "updated_at": str(self.updated_at),
+            "source": self.source,
+        }
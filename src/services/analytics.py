@@ -0,0 +1,308 @@
+"""Vectorized viewer analytics over stored snapshots
+
+Samples are loaded straight from DatabaseService into one structured NumPy
+array of integer columns, then every metric is computed with grouped array
+operations (np.unique / np.bincount) instead of per-row Python objects.
+Names are only resolved for the handful of rows that end up in a result.
+"""
+
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from src.db.database import DatabaseService, from_epoch
+from src.db.rollups import RESOLUTIONS
+from src.models import ChannelGrowth, GameShare, ViewerAnomaly
+from src.utils.exceptions import InvalidParameterError
+
+SAMPLE_DTYPE = np.dtype(
+    [
+        ("channel", np.int64),
+        ("game", np.int64),
+        ("viewers", np.int64),
+        ("timestamp", np.int64),
+    ]
+)
+
+# Window loaded when a caller does not pass since
+DEFAULT_LOOKBACK = timedelta(days=7)
+
+SECONDS_PER_DAY = 86400
+
+
+def load_samples(rows) -> np.ndarray:
+    """Build a SAMPLE_DTYPE array from (channel, game, viewers, timestamp) rows"""
+    return np.fromiter(rows, dtype=SAMPLE_DTYPE)
+
+
+def _bucket_index(timestamps: np.ndarray, width: int) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct bucket starts and each sample's position among them"""
+    buckets = timestamps // width
+    if len(buckets) > 1 and np.all(buckets[1:] >= buckets[:-1]):
+        # Samples arrive in time order, so no sort is needed
+        changes = np.flatnonzero(np.diff(buckets)) + 1
+        starts = buckets[np.r_[0, changes]]
+        index = np.repeat(
+            np.arange(len(starts)), np.diff(np.r_[0, changes, len(buckets)])
+        )
+        return starts * width, index
+    starts, index = np.unique(buckets, return_inverse=True)
+    return starts * width, index
+
+
+def share_of_voice(
+    samples: np.ndarray, width: int, top: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Share of all viewers held by each of the top games in every time bucket
+
+    Game keys are small dense surrogate ids, so groups are summed with
+    np.bincount directly on them rather than sorting.
+
+    Args:
+        samples: SAMPLE_DTYPE array
+        width: Bucket width in seconds
+        top: Number of games (by total viewers in the window) to report
+
+    Returns:
+        Parallel arrays of bucket start, game key and share (0-1), ordered by
+        bucket then descending share
+    """
+    viewers = samples["viewers"].astype(np.float64)
+    bucket_starts, bucket_index = _bucket_index(samples["timestamp"], width)
+    totals = np.bincount(bucket_index, weights=viewers)
+
+    game_totals = np.bincount(samples["game"], weights=viewers)
+    top_games = np.argsort(-game_totals, kind="stable")[:top]
+    top_games = top_games[game_totals[top_games] > 0]
+    rank = np.full(len(game_totals), -1)
+    rank[top_games] = np.arange(len(top_games))
+
+    # Dense bucket x top-game matrix of summed viewers
+    sample_rank = rank[samples["game"]]
+    selected = sample_rank >= 0
+    matrix = np.bincount(
+        bucket_index[selected] * len(top_games) + sample_rank[selected],
+        weights=viewers[selected],
+        minlength=len(bucket_starts) * len(top_games),
+    ).reshape(len(bucket_starts), len(top_games))
+    shares = matrix / totals[:, None]
+
+    pair_bucket, pair_rank = np.nonzero(matrix)
+    pair_shares = shares[pair_bucket, pair_rank]
+    order = np.lexsort((-pair_shares, pair_bucket))
+    return (
+        bucket_starts[pair_bucket[order]],
+        top_games[pair_rank[order]],
+        pair_shares[order],
+    )
+
+
+def channel_growth(
+    samples: np.ndarray, min_samples: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Least-squares viewer trend of every channel, relative to its average
+
+    Args:
+        samples: SAMPLE_DTYPE array
+        min_samples: Channels with fewer samples are skipped
+
+    Returns:
+        Parallel arrays of channel id, sample count, average viewers and growth
+        rate per day (fraction of the channel's average)
+    """
+    channel = samples["channel"]
+    viewers = samples["viewers"].astype(np.float64)
+    # Days since the first sample keeps the sums well conditioned
+    days = (samples["timestamp"] - samples["timestamp"].min()) / SECONDS_PER_DAY
+
+    n = np.bincount(channel).astype(np.float64)
+    sum_t = np.bincount(channel, weights=days)
+    sum_v = np.bincount(channel, weights=viewers)
+    sum_tt = np.bincount(channel, weights=days * days)
+    sum_tv = np.bincount(channel, weights=days * viewers)
+
+    denominator = n * sum_tt - sum_t * sum_t
+    valid = (n >= max(min_samples, 2)) & (denominator > 1e-12) & (sum_v > 0)
+    channels = np.flatnonzero(valid)
+
+    slope = (n * sum_tv - sum_t * sum_v)[valid] / denominator[valid]
+    mean_v = sum_v[valid] / n[valid]
+    return channels, n[valid].astype(np.int64), mean_v, slope / mean_v
+
+
+def viewer_anomalies(
+    samples: np.ndarray, width: int, window: int, threshold: float
+) -> tuple[np.ndarray, ...]:
+    """Buckets whose average viewers exceed a rolling baseline by threshold sigmas
+
+    Each channel's series of bucket averages is compared with the mean and
+    standard deviation of its previous window observed buckets.
+
+    Returns:
+        Parallel arrays of channel id, bucket start, viewers, baseline mean,
+        baseline standard deviation and z-score
+    """
+    buckets = samples["timestamp"] // width
+    viewers = samples["viewers"].astype(np.float64)
+
+    # One point per (channel, bucket), sorted by channel then time
+    first_bucket = buckets.min()
+    span = buckets.max() - first_bucket + 1
+    combined = samples["channel"] * span + (buckets - first_bucket)
+    order = np.argsort(combined, kind="stable")
+    sorted_keys = combined[order]
+    run_start = np.r_[0, np.flatnonzero(np.diff(sorted_keys)) + 1]
+    series_channel, series_bucket = np.divmod(sorted_keys[run_start], span)
+    series_bucket += first_bucket
+    values = np.add.reduceat(viewers[order], run_start) / np.diff(
+        np.r_[run_start, len(sorted_keys)]
+    )
+
+    channel_start = np.r_[0, np.flatnonzero(np.diff(series_channel)) + 1]
+    sizes = np.diff(np.r_[channel_start, len(values)])
+    group = np.repeat(np.arange(len(channel_start)), sizes)
+    position = np.arange(len(values))
+    has_baseline = position - window >= channel_start[group]
+
+    # Rolling sums from cumulative sums; centering each channel on its mean
+    # keeps the running sum of squares small enough for float64
+    offsets = np.bincount(group, weights=values) / sizes
+    centered = values - offsets[group]
+    cumsum = np.r_[0.0, np.cumsum(centered)]
+    cumsum_sq = np.r_[0.0, np.cumsum(centered * centered)]
+
+    idx = position[has_baseline]
+    window_mean = (cumsum[idx] - cumsum[idx - window]) / window
+    window_mean_sq = (cumsum_sq[idx] - cumsum_sq[idx - window]) / window
+    variance = np.maximum(window_mean_sq - window_mean**2, 0.0)
+    # Viewer counts are integers; a flat baseline still needs a one-viewer spread
+    stddev = np.maximum(np.sqrt(variance), 1.0)
+    baseline = window_mean + offsets[group[idx]]
+    z_scores = (values[idx] - baseline) / stddev
+
+    flagged = z_scores > threshold
+    points = idx[flagged]
+    return (
+        series_channel[points],
+        series_bucket[points] * width,
+        values[points],
+        baseline[flagged],
+        stddev[flagged],
+        z_scores[flagged],
+    )
+
+
+def _resolution_width(resolution: str) -> int:
+    if resolution not in RESOLUTIONS:
+        raise InvalidParameterError(
+            f"resolution must be one of {', '.join(RESOLUTIONS)}"
+        )
+    return RESOLUTIONS[resolution]
+
+
+class AnalyticsService:
+    """Computes share of voice, growth and anomaly metrics from stored snapshots"""
+
+    def __init__(self, db_service: DatabaseService):
+        self.db_service = db_service
+
+    def load(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        user_login: str | None = None,
+        game_id: str | None = None,
+    ) -> np.ndarray:
+        """Load viewer samples into a SAMPLE_DTYPE array (default: last 7 days)"""
+        if since is None:
+            since = datetime.now(timezone.utc) - DEFAULT_LOOKBACK
+        return load_samples(
+            self.db_service.iter_viewer_samples(
+                since=since, until=until, user_login=user_login, game_id=game_id
+            )
+        )
+
+    def game_share_of_voice(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        resolution: str = "hour",
+        top: int = 10,
+    ) -> list[GameShare]:
+        """Share of total viewers held by the top games in each time bucket"""
+        width = _resolution_width(resolution)
+        samples = self.load(since, until)
+        if not len(samples):
+            return []
+
+        starts, game_keys, shares = share_of_voice(samples, width, top)
+        names = self.db_service.get_game_names(np.unique(game_keys))
+        return [
+            GameShare(
+                bucket_start=from_epoch(int(start)),
+                game_id=names.get(int(key), (None, None))[0],
+                game_name=names.get(int(key), (None, None))[1],
+                share=round(float(share), 4),
+            )
+            for start, key, share in zip(starts, game_keys, shares)
+        ]
+
+    def channel_growth(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        limit: int = 20,
+        min_samples: int = 10,
+        declining: bool = False,
+    ) -> list[ChannelGrowth]:
+        """Channels with the fastest viewer growth (or decline) over the window"""
+        samples = self.load(since, until)
+        if not len(samples):
+            return []
+
+        channels, counts, averages, growth = channel_growth(samples, min_samples)
+        order = np.argsort(growth if declining else -growth, kind="stable")[:limit]
+        logins = self.db_service.get_channel_logins(channels[order])
+        return [
+            ChannelGrowth(
+                user_login=logins.get(int(channels[i]), ""),
+                samples=int(counts[i]),
+                avg_viewers=round(float(averages[i]), 1),
+                growth_per_day=round(float(growth[i]), 4),
+            )
+            for i in order
+        ]
+
+    def viewer_anomalies(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        user_login: str | None = None,
+        game_id: str | None = None,
+        resolution: str = "5m",
+        window: int = 12,
+        threshold: float = 3.0,
+        limit: int = 50,
+    ) -> list[ViewerAnomaly]:
+        """Viewer spikes more than threshold sigmas above each channel's rolling baseline"""
+        width = _resolution_width(resolution)
+        if window < 2:
+            raise InvalidParameterError("window must be at least 2 buckets")
+        samples = self.load(since, until, user_login=user_login, game_id=game_id)
+        if not len(samples):
+            return []
+
+        channels, starts, values, baselines, stddevs, z_scores = viewer_anomalies(
+            samples, width, window, threshold
+        )
+        order = np.argsort(-z_scores, kind="stable")[:limit]
+        logins = self.db_service.get_channel_logins(channels[order])
+        return [
+            ViewerAnomaly(
+                user_login=logins.get(int(channels[i]), ""),
+                bucket_start=from_epoch(int(starts[i])),
+                viewers=round(float(values[i]), 1),
+                baseline=round(float(baselines[i]), 1),
+                stddev=round(float(stddevs[i]), 1),
+                z_score=round(float(z_scores[i]), 2),
+            )
+            for i in order
+        ]
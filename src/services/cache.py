@@ -0,0 +1,199 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from typing import Any
+from src.utils.logging_config import logger
+from src.utils.metrics import metrics
+
+# Default time-to-live in seconds per cached Twitch endpoint
+DEFAULT_TTLS = {
+    "streams": 30.0,
+    "top_games": 60.0,
+    "user_stream": 15.0,
+}
+
+DEFAULT_MAX_ENTRIES = 256
+
+_served_from_cache: ContextVar[bool] = ContextVar("served_from_cache", default=False)
+
+
+def served_from_cache() -> bool:
+    """Whether the last cached call in the current task reused an earlier response
+
+    Tools use this to skip re-inserting snapshots another call already stored.
+    """
+    return _served_from_cache.get()
+
+
+class _Entry:
+    __slots__ = ("value", "limit", "expires_at")
+
+    def __init__(self, value: Any, limit: int | None, expires_at: float):
+        self.value = value
+        self.limit = limit
+        self.expires_at = expires_at
+
+
+def _covers(cached_limit: int | None, value: Any, limit: int | None) -> bool:
+    """Whether a response fetched with cached_limit can answer a request for limit"""
+    if limit is None or cached_limit is None:
+        return True
+    # A short result means Twitch had nothing more, whatever the limit
+    return cached_limit >= limit or (
+        isinstance(value, list) and len(value) < cached_limit
+    )
+
+
+def _slice(value: Any, limit: int | None) -> Any:
+    if limit is not None and isinstance(value, list):
+        return value[:limit]
+    return value
+
+
+def _retrieve_exception(task: asyncio.Task):
+    """Mark a failed fetch's error as seen when every caller was cancelled"""
+    if not task.cancelled():
+        task.exception()
+
+
+class ResponseCache:
+    """In-process TTL cache with LRU eviction and request coalescing
+
+    Entries are keyed by endpoint and call arguments except limit, so a
+    cached response for a larger limit also answers smaller ones. Concurrent
+    identical requests share a single in-flight call.
+    """
+
+    def __init__(
+        self,
+        ttls: dict[str, float] | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._inflight: dict[tuple, tuple[int | None, asyncio.Task]] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache configured from TWITCH_CACHE_* environment variables"""
+        return cls(
+            ttls={
+                endpoint: float(os.getenv(f"TWITCH_CACHE_TTL_{endpoint.upper()}", ttl))
+                for endpoint, ttl in DEFAULT_TTLS.items()
+            },
+            max_entries=int(os.getenv("TWITCH_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        )
+
+    def _count(self, endpoint: str, counter: str):
+        stats = self._stats.setdefault(
+            endpoint, {"hits": 0, "misses": 0, "coalesced": 0}
+        )
+        stats[counter] += 1
+        metrics.inc(
+            "twitch_mcp_cache_requests_total", endpoint=endpoint, result=counter
+        )
+
+    async def get_or_fetch(
+        self,
+        endpoint: str,
+        key: tuple,
+        fetch: Callable[[], Awaitable[Any]],
+        limit: int | None = None,
+    ) -> Any:
+        """Return a fresh cached response or call fetch, sharing concurrent calls
+
+        Args:
+            endpoint: Cache namespace, also selects the TTL
+            key: Call arguments identifying the request (excluding limit)
+            fetch: Coroutine factory performing the real request
+            limit: Requested result size, if the endpoint is limit-based
+
+        Returns:
+            The response, truncated to limit
+        """
+        cache_key = (endpoint, key)
+
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            if entry.expires_at <= time.monotonic():
+                del self._entries[cache_key]
+            elif _covers(entry.limit, entry.value, limit):
+                self._entries.move_to_end(cache_key)
+                self._count(endpoint, "hits")
+                _served_from_cache.set(True)
+                return _slice(entry.value, limit)
+
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None and _covers(inflight[0], None, limit):
+            self._count(endpoint, "coalesced")
+            value = await asyncio.shield(inflight[1])
+            _served_from_cache.set(True)
+            return _slice(value, limit)
+
+        self._count(endpoint, "misses")
+        # The fetch runs as its own task so that cancelling the caller that
+        # started it does not cancel the callers coalesced onto it
+        task = asyncio.ensure_future(self._fetch(cache_key, endpoint, fetch, limit))
+        task.add_done_callback(_retrieve_exception)
+        self._inflight[cache_key] = (limit, task)
+        value = await asyncio.shield(task)
+        _served_from_cache.set(False)
+        return value
+
+    async def _fetch(
+        self,
+        cache_key: tuple,
+        endpoint: str,
+        fetch: Callable[[], Awaitable[Any]],
+        limit: int | None,
+    ) -> Any:
+        """Call fetch, store its response and release the in-flight slot"""
+        try:
+            value = await fetch()
+            self._store(cache_key, endpoint, value, limit)
+            return value
+        finally:
+            if self._inflight.get(cache_key, (None, None))[1] is asyncio.current_task():
+                del self._inflight[cache_key]
+
+    def _store(self, cache_key: tuple, endpoint: str, value: Any, limit: int | None):
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl <= 0:
+            return
+        self._entries[cache_key] = _Entry(value, limit, time.monotonic() + ttl)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all cached responses"""
+        self._entries.clear()
+        logger.info("Response cache cleared")
+
+    def stats(self) -> dict:
+        """Hit, miss and coalescing counters per endpoint"""
+        endpoints = {}
+        for endpoint, counters in self._stats.items():
+            lookups = counters["hits"] + counters["misses"] + counters["coalesced"]
+            endpoints[endpoint] = {
+                **counters,
+                "ttl_seconds": self.ttls.get(endpoint, 0),
+                "hit_ratio": round(
+                    (counters["hits"] + counters["coalesced"]) / lookups, 3
+                )
+                if lookups
+                else None,
+            }
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "endpoints": endpoints,
+        }
@@ -0,0 +1,228 @@
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+from src.db.async_database import AsyncDatabaseService
+from src.models import CollectorCycleMetrics, GameRanking, StreamSnapshot
+from src.services.twitch_api import TwitchService
+from src.utils.logging_config import logger
+
+# Number of recent cycles kept for get_collector_status
+METRICS_HISTORY = 50
+
+
+class SnapshotCollector:
+    """Polls Twitch on a fixed interval and bulk-inserts stream snapshots
+
+    Pages stream through a bounded queue into a writer task, so fetching the
+    next page overlaps with writing the previous one. Writes go through the
+    shared AsyncDatabaseService writer thread, where they share group commits
+    with tool writes and never contend with them for the database lock. If a
+    cycle is still running when the next one is due, the new poll is skipped
+    instead of queued. Each successful cycle also stores the
+    top streams and top games as leaderboard polls.
+    """
+
+    def __init__(
+        self,
+        twitch_service: TwitchService,
+        database: AsyncDatabaseService,
+        interval: float = 300.0,
+        max_streams: int = 1000,
+        include_games: bool = True,
+        max_pending_pages: int = 4,
+    ):
+        self.twitch_service = twitch_service
+        self.database = database
+        self.interval = interval
+        self.max_streams = max_streams
+        self.include_games = include_games
+        self.max_pending_pages = max_pending_pages
+
+        self.cycles_completed = 0
+        self.cycles_skipped = 0
+        self.cycles_failed = 0
+        self.history: deque[CollectorCycleMetrics] = deque(maxlen=METRICS_HISTORY)
+
+        self._runner: asyncio.Task | None = None
+        self._cycle: asyncio.Task | None = None
+        self._stop_event = asyncio.Event()
+
+    @classmethod
+    def from_env(cls, twitch_service: TwitchService, database: AsyncDatabaseService):
+        """Build a collector configured from COLLECTOR_* environment variables"""
+        return cls(
+            twitch_service,
+            database,
+            interval=float(os.getenv("COLLECTOR_INTERVAL_SECONDS", "300")),
+            max_streams=int(os.getenv("COLLECTOR_MAX_STREAMS", "1000")),
+            include_games=os.getenv("COLLECTOR_INCLUDE_GAMES", "1") == "1",
+        )
+
+    @property
+    def is_running(self) -> bool:
+        return self._runner is not None and not self._runner.done()
+
+    def start(self):
+        """Start polling in the background"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._runner = asyncio.create_task(self._run())
+        logger.info(
+            "Snapshot collector started (interval=%ss, max_streams=%s)",
+            self.interval,
+            self.max_streams,
+        )
+
+    async def stop(self):
+        """Stop polling and wait for an in-flight cycle to finish writing"""
+        self._stop_event.set()
+        for task in (self._runner, self._cycle):
+            if task is not None:
+                try:
+                    await task
+                except Exception as e:
+                    logger.warning("Collector task ended with error: %s", e)
+        self._runner = None
+        self._cycle = None
+        logger.info("Snapshot collector stopped")
+
+    async def _run(self):
+        """Schedule a cycle every interval, skipping ticks while one is running"""
+        while not self._stop_event.is_set():
+            if self._cycle is not None and not self._cycle.done():
+                self.cycles_skipped += 1
+                logger.warning("Previous collector cycle still running, skipping poll")
+            else:
+                self._cycle = asyncio.create_task(self.collect_once())
+
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def collect_once(self) -> CollectorCycleMetrics:
+        """Run one poll cycle and record its timing metrics"""
+        metrics = CollectorCycleMetrics(started_at=datetime.now(timezone.utc))
+        started = time.perf_counter()
+        queue: asyncio.Queue[list[StreamSnapshot] | None] = asyncio.Queue(
+            maxsize=self.max_pending_pages
+        )
+        writer = asyncio.create_task(self._write_pages(queue, metrics))
+        streams: list[StreamSnapshot] = []
+        games: list[GameRanking] = []
+
+        try:
+            async for page in self.twitch_service.iter_stream_pages(self.max_streams):
+                metrics.pages += 1
+                streams.extend(page)
+                # Blocks while the writer is max_pending_pages behind
+                await queue.put(page)
+
+            if self.include_games:
+                games = await self.twitch_service.get_top_games(100)
+                metrics.games = len(games)
+        except Exception as e:
+            metrics.error = str(e)
+        finally:
+            metrics.fetch_seconds = time.perf_counter() - started
+            await queue.put(None)
+            await writer
+
+        if not metrics.error:
+            await self._write_rankings(streams, games, metrics)
+
+        metrics.total_seconds = time.perf_counter() - started
+        self.history.append(metrics)
+        if metrics.error:
+            self.cycles_failed += 1
+            logger.error("Collector cycle failed: %s", metrics.error)
+        else:
+            self.cycles_completed += 1
+            logger.info(
+                "Collector cycle wrote %s snapshots from %s pages in %.2fs",
+                metrics.rows_written,
+                metrics.pages,
+                metrics.total_seconds,
+            )
+        return metrics
+
+    async def _write_pages(
+        self,
+        queue: asyncio.Queue[list[StreamSnapshot] | None],
+        metrics: CollectorCycleMetrics,
+    ):
+        """Drain pages from the queue into inserts on the writer thread"""
+        while (page := await queue.get()) is not None:
+            started = time.perf_counter()
+            try:
+                metrics.rows_written += await self.database.insert_stream_snapshots(
+                    page
+                )
+            except Exception as e:
+                metrics.error = metrics.error or str(e)
+            metrics.write_seconds += time.perf_counter() - started
+
+    async def _write_rankings(
+        self,
+        streams: list[StreamSnapshot],
+        games: list[GameRanking],
+        metrics: CollectorCycleMetrics,
+    ):
+        """Store the cycle's top streams and top games as leaderboard polls"""
+        started = time.perf_counter()
+        try:
+            if streams:
+                await self.database.insert_rank_snapshot(
+                    "streams",
+                    streams[0].timestamp,
+                    [(s.user_login, s.user_name) for s in streams],
+                )
+            if games:
+                await self.database.insert_rank_snapshot(
+                    "games",
+                    games[0].timestamp,
+                    [(g.game_id, g.game_name) for g in games],
+                )
+        except Exception as e:
+            metrics.error = str(e)
+        metrics.write_seconds += time.perf_counter() - started
+
+    def status(self) -> dict:
+        """Summarize collector state and recent cycle metrics"""
+        last = self.history[-1] if self.history else None
+        return {
+            "running": self.is_running,
+            "interval_seconds": self.interval,
+            "max_streams": self.max_streams,
+            "cycles_completed": self.cycles_completed,
+            "cycles_skipped": self.cycles_skipped,
+            "cycles_failed": self.cycles_failed,
+            "last_cycle": last.model_dump(mode="json") if last else None,
+            "avg_cycle_seconds": (
+                sum(m.total_seconds for m in self.history) / len(self.history)
+                if self.history
+                else None
+            ),
+        }
+
+
+async def main():
+    """Run the collector standalone until interrupted"""
+    from src.services.registry import services
+
+    collector = await services.get_collector()
+    collector.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await services.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,155 @@
+import asyncio
+import os
+import time
+from src.db.async_database import AsyncDatabaseService
+from src.models import GameMetadata, GameRanking
+from src.services.twitch_api import TwitchService
+from src.utils.logging_config import logger
+
+# Box art and IGDB ids rarely change, so a day-old entry is still good to serve
+DEFAULT_GAME_METADATA_TTL = 86400.0
+
+
+class GameCatalog:
+    """Game metadata (name, box art, IGDB id) persisted on the games dimension
+
+    Lookups are answered from memory, then from the database; only games
+    never fetched before wait for Helix. Entries older than ttl are returned
+    as they are and refreshed in the background (stale-while-revalidate),
+    100 ids per Helix request. Top games responses refresh the catalog for
+    free since they carry the same fields.
+    """
+
+    def __init__(
+        self,
+        twitch_service: TwitchService,
+        db_service: AsyncDatabaseService,
+        ttl: float = DEFAULT_GAME_METADATA_TTL,
+    ):
+        self.twitch_service = twitch_service
+        self.db_service = db_service
+        self.ttl = ttl
+
+        self.memory_hits = 0
+        self.database_hits = 0
+        self.fetched = 0
+        self.refreshes = 0
+
+        self._games: dict[str, GameMetadata] = {}
+        self._refreshing: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    @classmethod
+    def from_env(cls, twitch_service: TwitchService, db_service: AsyncDatabaseService):
+        """Build a catalog with the GAME_METADATA_TTL_SECONDS freshness window"""
+        return cls(
+            twitch_service,
+            db_service,
+            ttl=float(
+                os.getenv("GAME_METADATA_TTL_SECONDS", DEFAULT_GAME_METADATA_TTL)
+            ),
+        )
+
+    async def get_games(self, game_ids: list[str]) -> dict[str, GameMetadata]:
+        """Metadata of the given games, fetching unknown ones from Helix
+
+        Args:
+            game_ids: Twitch game ids
+
+        Returns:
+            Metadata by game id; ids Twitch does not know are left out
+
+        Raises:
+            DatabaseError: Reading or storing metadata failed
+            ServiceUnavailableError: Twitch API temporarily unavailable
+        """
+        ids = list(dict.fromkeys(str(game_id) for game_id in game_ids if game_id))
+        found = {i: self._games[i] for i in ids if i in self._games}
+        self.memory_hits += len(found)
+
+        unknown = [i for i in ids if i not in found]
+        if unknown:
+            stored = await self.db_service.get_game_metadata(unknown)
+            self.database_hits += len(stored)
+            self._remember(stored.values())
+            found.update(stored)
+            unknown = [i for i in unknown if i not in stored]
+        if unknown:
+            found.update(await self._fetch(unknown))
+
+        cutoff = time.time() - self.ttl
+        stale = [
+            game_id
+            for game_id, game in found.items()
+            if game.updated_at.timestamp() < cutoff and game_id not in self._refreshing
+        ]
+        if stale:
+            self._refreshing.update(stale)
+            task = asyncio.create_task(self._refresh(stale))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        return found
+
+    async def record(self, games: list[GameMetadata]):
+        """Store metadata that arrived with another response"""
+        if not games:
+            return
+        self._remember(games)
+        await self.db_service.upsert_game_metadata(games)
+
+    async def record_rankings(self, rankings: list[GameRanking]):
+        """Store the metadata carried by a top games response"""
+        await self.record(
+            [
+                GameMetadata(
+                    game_id=r.game_id,
+                    game_name=r.game_name,
+                    box_art_url=r.box_art_url,
+                    igdb_id=r.igdb_id or None,
+                    updated_at=r.timestamp,
+                )
+                for r in rankings
+            ]
+        )
+
+    def _remember(self, games):
+        for game in games:
+            current = self._games.get(game.game_id)
+            if current is None or game.updated_at >= current.updated_at:
+                self._games[game.game_id] = game
+
+    async def _fetch(self, game_ids: list[str]) -> dict[str, GameMetadata]:
+        games = await self.twitch_service.get_games(game_ids)
+        self.fetched += len(games)
+        await self.record(games)
+        return {game.game_id: game for game in games}
+
+    async def _refresh(self, game_ids: list[str]):
+        try:
+            await self._fetch(game_ids)
+            self.refreshes += 1
+        except Exception as e:
+            logger.warning(
+                "Failed to refresh metadata of %s games: %s", len(game_ids), e
+            )
+        finally:
+            self._refreshing.difference_update(game_ids)
+
+    async def close(self):
+        """Cancel background refreshes still in flight"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """Cached games and where lookups were answered from"""
+        return {
+            "games_in_memory": len(self._games),
+            "memory_hits": self.memory_hits,
+            "database_hits": self.database_hits,
+            "fetched_from_helix": self.fetched,
+            "background_refreshes": self.refreshes,
+            "refreshing": len(self._refreshing),
+            "ttl_seconds": self.ttl,
+        }
@@ -0,0 +1,468 @@
+import asyncio
+import os
+import threading
+from datetime import datetime, timezone
+from aiohttp import ClientSession, ClientTimeout
+from twitchAPI.eventsub.websocket import EventSubWebsocket
+from twitchAPI.object.eventsub import (
+    ChannelUpdateEvent,
+    StreamOfflineEvent,
+    StreamOnlineEvent,
+)
+from twitchAPI.twitch import Twitch
+from src.models import LiveStatus
+from src.services.twitch_api import TwitchService
+from src.utils.exceptions import ConfigurationError, ServiceUnavailableError
+from src.utils.logging_config import logger
+from src.utils.metrics import metrics
+
+# Seconds to wait for the EventSub welcome message on start
+DEFAULT_CONNECT_TIMEOUT = 30.0
+
+
+class LiveStatusIndex:
+    """Last known live state per channel, keyed by lowercased login
+
+    Written from the EventSub socket thread and read from the event loop.
+    Entries are never modified in place, only replaced, so lookups take no
+    lock; the lock only serialises concurrent merges.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, LiveStatus] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_login: str) -> LiveStatus | None:
+        return self._entries.get(user_login.lower())
+
+    def entries(self) -> list[LiveStatus]:
+        return list(self._entries.values())
+
+    def merge(self, status: LiveStatus) -> bool:
+        """Apply an observation unless a newer one is already stored
+
+        Fields the observation leaves unset keep their stored values, so a
+        channel.update event does not forget whether the channel is live.
+
+        Returns:
+            True if the observation was applied
+        """
+        login = status.user_login.lower()
+        with self._lock:
+            current = self._entries.get(login)
+            if current is not None:
+                if status.updated_at < current.updated_at:
+                    return False
+                changes = status.model_dump(exclude_unset=True, exclude={"user_login"})
+                status = current.model_copy(update=changes)
+            elif status.user_login != login:
+                status = status.model_copy(update={"user_login": login})
+            self._entries[login] = status
+        return True
+
+    def discard(self, user_login: str):
+        with self._lock:
+            self._entries.pop(user_login.lower(), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class LiveStatusMonitor:
+    """Keeps a LiveStatusIndex current from EventSub WebSocket notifications
+
+    Every tracked channel gets stream.online, stream.offline and
+    channel.update subscriptions and is seeded with one batched Helix streams
+    lookup, so "is X live / what are they playing" is answered from memory.
+    twitchAPI runs the socket on its own thread and event loop; callbacks run
+    there and only touch the index.
+
+    WebSocket subscriptions need a user access token (of any user, no scopes).
+    Twitch limits the total cost of subscriptions to channels that have not
+    authorized the app, so rejected channels are reported as failed and
+    callers fall back to Helix for them.
+    """
+
+    def __init__(
+        self,
+        twitch_service: TwitchService,
+        channels: list[str] | None = None,
+        user_token: str | None = None,
+        refresh_token: str | None = None,
+        websocket_url: str | None = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    ):
+        self.twitch_service = twitch_service
+        self.channels = [c.strip().lower() for c in channels or [] if c.strip()]
+        self.user_token = user_token
+        self.refresh_token = refresh_token
+        self.websocket_url = websocket_url
+        self.connect_timeout = connect_timeout
+
+        self.index = LiveStatusIndex()
+        self.events_received = 0
+        self.last_event_at: datetime | None = None
+        self.failed: dict[str, str] = {}
+
+        self._user_ids: dict[str, str] = {}
+        self._twitch: Twitch | None = None
+        self._eventsub: EventSubWebsocket | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_env(cls, twitch_service: TwitchService):
+        """Build a monitor configured from EVENTSUB_* and TWITCH_USER_* environment variables"""
+        return cls(
+            twitch_service,
+            channels=os.getenv("EVENTSUB_CHANNELS", "").split(","),
+            user_token=os.getenv("TWITCH_USER_ACCESS_TOKEN") or None,
+            refresh_token=os.getenv("TWITCH_USER_REFRESH_TOKEN") or None,
+            websocket_url=os.getenv("EVENTSUB_WEBSOCKET_URL") or None,
+            connect_timeout=float(
+                os.getenv("EVENTSUB_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)
+            ),
+        )
+
+    @property
+    def is_running(self) -> bool:
+        return self._eventsub is not None
+
+    @property
+    def tracked(self) -> list[str]:
+        return list(self._user_ids)
+
+    async def start(self):
+        """Open the EventSub WebSocket and track the configured channels
+
+        Raises:
+            ConfigurationError: No user access token is set or Twitch rejects it
+            ServiceUnavailableError: The WebSocket did not connect in time
+        """
+        async with self._lock:
+            if self.is_running:
+                return
+            if not self.user_token:
+                raise ConfigurationError(
+                    "EventSub needs a user access token. Please set TWITCH_USER_ACCESS_TOKEN (no scopes required)."
+                )
+            twitch = await self._user_client()
+            eventsub = EventSubWebsocket(
+                twitch,
+                connection_url=self.websocket_url,
+                subscription_url=self.twitch_service.base_url,
+                revocation_handler=self._on_revocation,
+            )
+            try:
+                await self._check_endpoint(eventsub.connection_url)
+                await self._start_socket(eventsub)
+            except ServiceUnavailableError:
+                await twitch.close()
+                raise
+            self._twitch = twitch
+            self._eventsub = eventsub
+            self._loop = asyncio.get_running_loop()
+            logger.info("EventSub WebSocket connected")
+
+        if self.channels:
+            await self.track(self.channels)
+
+    async def _check_endpoint(self, url: str):
+        """Wait for a session_welcome from url within the connect timeout
+
+        twitchAPI's start() waits for the welcome forever and cannot be
+        cancelled, so an unreachable endpoint is caught here first.
+
+        Raises:
+            ServiceUnavailableError: No welcome arrived in time
+        """
+        timeout = ClientTimeout(total=self.connect_timeout)
+        try:
+            async with ClientSession(timeout=timeout) as session:
+                async with session.ws_connect(url) as socket:
+                    message = await socket.receive_json(timeout=self.connect_timeout)
+        except Exception as e:
+            raise ServiceUnavailableError(
+                f"EventSub WebSocket did not connect within "
+                f"{self.connect_timeout}s: {e!r}"
+            )
+        message_type = message.get("metadata", {}).get("message_type")
+        if message_type != "session_welcome":
+            raise ServiceUnavailableError(
+                f"EventSub WebSocket sent {message_type!r} instead of session_welcome"
+            )
+
+    async def _start_socket(self, eventsub: EventSubWebsocket):
+        """Run eventsub.start() on its own thread, waiting at most the connect timeout
+
+        Raises:
+            ServiceUnavailableError: start() failed or did not return in time
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.create_future()
+
+        def settle(error: BaseException | None):
+            if not started.done():
+                if error is None:
+                    started.set_result(None)
+                else:
+                    started.set_exception(error)
+
+        def run():
+            error = None
+            try:
+                eventsub.start()
+            except BaseException as e:
+                error = e
+            try:
+                loop.call_soon_threadsafe(settle, error)
+            except RuntimeError:
+                # The loop closed while start() was still waiting
+                pass
+
+        # A daemon thread rather than the default executor, so a start() that
+        # never returns cannot hold up interpreter shutdown
+        threading.Thread(target=run, name="eventsub-start", daemon=True).start()
+        try:
+            await asyncio.wait_for(started, self.connect_timeout)
+        except asyncio.TimeoutError:
+            logger.error(
+                "EventSub start did not finish within %ss; leaving its thread behind",
+                self.connect_timeout,
+            )
+            raise ServiceUnavailableError(
+                f"EventSub WebSocket did not connect within {self.connect_timeout}s"
+            )
+        except Exception as e:
+            raise ServiceUnavailableError(f"EventSub WebSocket failed to start: {e!r}")
+
+    async def _user_client(self) -> Twitch:
+        """Twitch client authenticated as the configured user"""
+        service = self.twitch_service
+        twitch = await Twitch(
+            service.app_id,
+            service.app_secret,
+            authenticate_app=False,
+            base_url=service.base_url,
+            auth_base_url=service.auth_base_url,
+        )
+        # The token can only be renewed when a refresh token is available
+        twitch.auto_refresh_auth = self.refresh_token is not None
+        try:
+            await twitch.set_user_authentication(
+                self.user_token, [], self.refresh_token
+            )
+        except Exception as e:
+            await twitch.close()
+            raise ConfigurationError(f"Invalid TWITCH_USER_ACCESS_TOKEN: {e}")
+        return twitch
+
+    async def track(self, user_logins: list[str]) -> dict:
+        """Subscribe to live state events for channels that are not tracked yet
+
+        Args:
+            user_logins: Twitch usernames to track
+
+        Returns:
+            A dictionary with the newly tracked logins and, per failed login,
+            the reason its subscriptions were rejected
+
+        Raises:
+            ServiceUnavailableError: The monitor is not running
+        """
+        if not self.is_running:
+            raise ServiceUnavailableError("EventSub monitor is not running")
+
+        async with self._lock:
+            logins = [
+                login
+                for login in dict.fromkeys(u.strip().lower() for u in user_logins)
+                if login and login not in self._user_ids
+            ]
+            if not logins:
+                return {"tracked": [], "failed": {}}
+
+            user_ids = await self.twitch_service.get_user_ids(logins)
+            semaphore = asyncio.Semaphore(self.twitch_service.batch_concurrency)
+            failed = {
+                login: "unknown user" for login in logins if login not in user_ids
+            }
+
+            async def subscribe(login: str, user_id: str):
+                async with semaphore:
+                    try:
+                        await self._subscribe(user_id)
+                    except Exception as e:
+                        failed[login] = str(e) or type(e).__name__
+                    else:
+                        self._user_ids[login] = user_id
+                        self.failed.pop(login, None)
+
+            observed_at = datetime.now(timezone.utc)
+            await asyncio.gather(
+                *(
+                    subscribe(login, user_id)
+                    for login, user_id in user_ids.items()
+                    if login in logins
+                )
+            )
+            added = [login for login in logins if login in self._user_ids]
+            self.failed.update(failed)
+
+        if added:
+            await self._seed(added, observed_at)
+        if failed:
+            logger.warning(
+                "EventSub subscriptions failed for %s channels: %s", len(failed), failed
+            )
+        logger.info("Tracking live status of %s channels", len(self._user_ids))
+        return {"tracked": added, "failed": failed}
+
+    async def _subscribe(self, user_id: str):
+        """Subscribe to all three topics of a channel, or to none of them"""
+        topic_ids = []
+        try:
+            topic_ids.append(
+                await self._eventsub.listen_stream_online(user_id, self._on_online)
+            )
+            topic_ids.append(
+                await self._eventsub.listen_stream_offline(user_id, self._on_offline)
+            )
+            topic_ids.append(
+                await self._eventsub.listen_channel_update_v2(
+                    user_id, self._on_channel_update
+                )
+            )
+        except Exception:
+            for topic_id in topic_ids:
+                try:
+                    await self._eventsub.unsubscribe_topic(topic_id)
+                except Exception as e:
+                    logger.warning(
+                        "Failed to remove EventSub topic %s: %s", topic_id, e
+                    )
+            raise
+
+    async def _seed(self, user_logins: list[str], observed_at: datetime):
+        """Fill the index with the current state before the first event arrives
+
+        Subscriptions are made first; an event newer than this lookup wins.
+        """
+        try:
+            performance = await self.twitch_service.get_users_performance(user_logins)
+        except Exception as e:
+            logger.warning("Failed to seed live status from Helix: %s", e)
+            return
+        for login, snapshot in performance.items():
+            status = LiveStatus.from_snapshot(login, snapshot, observed_at)
+            status.user_id = self._user_ids.get(login)
+            self.index.merge(status)
+
+    async def stop(self):
+        """Close the WebSocket; Twitch drops the session's subscriptions with it"""
+        async with self._lock:
+            if self._eventsub is not None:
+                try:
+                    await self._eventsub.stop()
+                except Exception as e:
+                    logger.warning("Error while stopping EventSub WebSocket: %s", e)
+                finally:
+                    self._eventsub = None
+            if self._twitch is not None:
+                try:
+                    await self._twitch.close()
+                except Exception as e:
+                    logger.warning("Error while closing EventSub Twitch client: %s", e)
+                finally:
+                    self._twitch = None
+            self._user_ids.clear()
+            # Without events the stored state would silently go stale
+            self.index.clear()
+        logger.info("EventSub monitor stopped")
+
+    def lookup(self, user_logins: list[str]) -> tuple[dict[str, LiveStatus], list[str]]:
+        """Split logins into those the index answers and those it does not
+
+        Returns:
+            Known states by lowercased login, and the lowercased logins that
+            are untracked or whose live state is not known yet
+        """
+        known, missing = {}, []
+        for login in dict.fromkeys(u.lower() for u in user_logins):
+            status = self.index.get(login)
+            if status is None or status.is_live is None:
+                missing.append(login)
+            else:
+                known[login] = status
+        return known, missing
+
+    def status(self) -> dict:
+        """Connection state, tracked and failed channels and event counters"""
+        return {
+            "running": self.is_running,
+            "tracked": len(self._user_ids),
+            "live": sum(1 for status in self.index.entries() if status.is_live),
+            "events_received": self.events_received,
+            "last_event_at": str(self.last_event_at) if self.last_event_at else None,
+            "failed": dict(self.failed),
+        }
+
+    # EventSub callbacks, run on the socket thread
+
+    def _record(self, event, **fields):
+        self.events_received += 1
+        self.last_event_at = datetime.now(timezone.utc)
+        metrics.inc("twitch_mcp_eventsub_events_total", type=event.subscription.type)
+        data = event.event
+        self.index.merge(
+            LiveStatus(
+                user_login=data.broadcaster_user_login,
+                user_name=data.broadcaster_user_name,
+                user_id=data.broadcaster_user_id,
+                updated_at=event.metadata.message_timestamp,
+                source="eventsub",
+                **fields,
+            )
+        )
+
+    async def _on_online(self, event: StreamOnlineEvent):
+        self._record(
+            event,
+            is_live=True,
+            stream_id=event.event.id,
+            started_at=event.event.started_at,
+        )
+
+    async def _on_offline(self, event: StreamOfflineEvent):
+        self._record(event, is_live=False, stream_id=None, started_at=None)
+
+    async def _on_channel_update(self, event: ChannelUpdateEvent):
+        self._record(
+            event,
+            title=event.event.title,
+            game_id=event.event.category_id or None,
+            game_name=event.event.category_name or None,
+        )
+
+    async def _on_revocation(self, payload: dict):
+        user_id = (
+            payload.get("subscription", {})
+            .get("condition", {})
+            .get("broadcaster_user_id")
+        )
+        # Tracked channels belong to the monitor's loop, which may be
+        # iterating them right now
+        self._loop.call_soon_threadsafe(self._drop_revoked, user_id)
+
+    def _drop_revoked(self, user_id: str | None):
+        """Stop tracking a channel whose subscription was revoked (on the loop)"""
+        for login, tracked_id in list(self._user_ids.items()):
+            if tracked_id == user_id:
+                self._user_ids.pop(login, None)
+                self.index.discard(login)
+                self.failed[login] = "subscription revoked"
+                logger.warning("EventSub subscription revoked for %s", login)
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import random
+import time
+from collections.abc import Mapping
+from src.utils.logging_config import logger
+from src.utils.metrics import metrics
+
+# Helix app tokens get 800 points per minute
+DEFAULT_RATE_LIMIT = 800
+RATE_LIMIT_WINDOW_SECONDS = 60.0
+
+# Statuses worth retrying: throttling and transient backend failures
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RateLimiter:
+    """Token bucket shared by every Helix request of a TwitchService
+
+    The bucket refills continuously at limit/60 tokens per second and is
+    corrected from the Ratelimit-* headers Twitch returns, so requests made
+    by other processes with the same client id are accounted for too. A
+    share below 1 gives the bucket that fraction of the limit, for processes
+    that split one client id's budget between them.
+    """
+
+    def __init__(
+        self,
+        limit: int = DEFAULT_RATE_LIMIT,
+        window: float = RATE_LIMIT_WINDOW_SECONDS,
+        share: float = 1.0,
+    ):
+        self.window = window
+        self.share = share
+        self._configure(limit)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self.waits = 0
+
+    @classmethod
+    def from_env(cls, share: float = 1.0):
+        """Build a limiter configured from TWITCH_RATE_LIMIT"""
+        return cls(int(os.getenv("TWITCH_RATE_LIMIT", DEFAULT_RATE_LIMIT)), share=share)
+
+    def _configure(self, limit: int):
+        self.limit = limit
+        self.capacity = max(1, int(limit * self.share))
+        self.refill_rate = self.capacity / self.window
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        """Wait until a request may be sent and take one token"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    delay = (1 - self._tokens) / self.refill_rate
+                self.waits += 1
+                metrics.inc("twitch_mcp_rate_limit_waits_total")
+                await asyncio.sleep(delay)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Reconcile the bucket with Twitch's Ratelimit-* response headers"""
+        try:
+            limit = headers.get("Ratelimit-Limit")
+            remaining = headers.get("Ratelimit-Remaining")
+            reset = headers.get("Ratelimit-Reset")
+            if limit is not None and int(limit) != self.limit:
+                self._configure(int(limit))
+            if remaining is not None:
+                self._refill(time.monotonic())
+                self._tokens = min(self._tokens, float(remaining))
+                if int(remaining) == 0 and reset is not None:
+                    self.block_until_reset(int(reset))
+        except ValueError:
+            logger.debug("Ignoring malformed Ratelimit headers")
+
+    def block_until_reset(self, reset_epoch: int):
+        """Hold all requests until the given Unix time, when Twitch refills"""
+        delay = max(0.0, reset_epoch - time.time())
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.capacity,
+            "window_seconds": self.window,
+            "tokens_available": round(self._tokens, 1),
+            "waits": self.waits,
+        }
+
+
+class RetryPolicy:
+    """Jittered exponential backoff bounded by attempts and a deadline"""
+
+    def __init__(
+        self,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        deadline: float = 30.0,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retries = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build a policy configured from TWITCH_MAX_RETRIES and TWITCH_REQUEST_DEADLINE"""
+        return cls(
+            max_retries=int(os.getenv("TWITCH_MAX_RETRIES", "4")),
+            deadline=float(os.getenv("TWITCH_REQUEST_DEADLINE", "30")),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number attempt (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def next_delay(
+        self,
+        attempt: int,
+        started: float,
+        headers: Mapping[str, str] | None = None,
+    ) -> float | None:
+        """Delay before the next attempt, or None if retrying is not allowed
+
+        Throttled responses wait at least until Ratelimit-Reset.
+        """
+        if attempt >= self.max_retries:
+            return None
+        delay = self.backoff(attempt)
+        reset = headers.get("Ratelimit-Reset") if headers else None
+        if reset is not None:
+            try:
+                delay = max(delay, int(reset) - time.time())
+            except ValueError:
+                pass
+        if time.monotonic() + delay - started > self.deadline:
+            return None
+        self.retries += 1
+        return delay
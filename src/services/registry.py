@@ -0,0 +1,155 @@
+import asyncio
+import os
+from typing import TYPE_CHECKING
+from src.db.async_database import AsyncDatabaseService
+from src.db.database import DEFAULT_DB_PATH
+from src.utils.env import load_env
+from src.utils.logging_config import logger
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from src.services.collector import SnapshotCollector
+    from src.services.game_catalog import GameCatalog
+    from src.services.live_status import LiveStatusMonitor
+    from src.services.retention import RetentionTask
+    from src.services.twitch_api import TwitchService
+
+
+class ServiceRegistry:
+    """Holds process-wide service instances shared by all MCP tools
+
+    Services are created on first use (or eagerly by the server lifespan) and
+    closed once when the server shuts down. Their modules are imported on
+    first use too, since twitchAPI and aiohttp alone take a noticeable share
+    of the server's cold start.
+    """
+
+    def __init__(self):
+        self._twitch: "TwitchService | None" = None
+        self._database: AsyncDatabaseService | None = None
+        self._collector: "SnapshotCollector | None" = None
+        self._retention: "RetentionTask | None" = None
+        self._live_status: "LiveStatusMonitor | None" = None
+        self._game_catalog: "GameCatalog | None" = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def db_path(self) -> str:
+        """Path of the SQLite database, overridable with TWITCH_ANALYTICS_DB"""
+        return os.getenv("TWITCH_ANALYTICS_DB", DEFAULT_DB_PATH)
+
+    async def get_twitch(self) -> "TwitchService":
+        """Get the shared TwitchService, creating it on first use"""
+        if self._twitch is None:
+            async with self._lock:
+                if self._twitch is None:
+                    from src.services.twitch_api import TwitchService
+
+                    self._twitch = TwitchService()
+        return self._twitch
+
+    def get_database(self) -> AsyncDatabaseService:
+        """Get the shared database facade, opening the writer connection on first use"""
+        if self._database is None:
+            self._database = AsyncDatabaseService.from_env(self.db_path)
+        return self._database
+
+    async def get_collector(self) -> "SnapshotCollector":
+        """Get the background snapshot collector, configured from the environment"""
+        if self._collector is None:
+            from src.services.collector import SnapshotCollector
+
+            twitch_service = await self.get_twitch()
+            self._collector = SnapshotCollector.from_env(
+                twitch_service, self.get_database()
+            )
+        return self._collector
+
+    def get_retention(self) -> "RetentionTask":
+        """Get the background retention task, configured from the environment"""
+        if self._retention is None:
+            from src.services.retention import RetentionTask
+
+            self._retention = RetentionTask.from_env(self.get_database())
+        return self._retention
+
+    async def get_live_status(self) -> "LiveStatusMonitor":
+        """Get the EventSub live status monitor, configured from the environment"""
+        if self._live_status is None:
+            from src.services.live_status import LiveStatusMonitor
+
+            twitch_service = await self.get_twitch()
+            self._live_status = LiveStatusMonitor.from_env(twitch_service)
+        return self._live_status
+
+    async def get_game_catalog(self) -> "GameCatalog":
+        """Get the game metadata catalog, configured from the environment"""
+        if self._game_catalog is None:
+            from src.services.game_catalog import GameCatalog
+
+            twitch_service = await self.get_twitch()
+            self._game_catalog = GameCatalog.from_env(
+                twitch_service, self.get_database()
+            )
+        return self._game_catalog
+
+    async def start(self):
+        """Create shared services and perform the Twitch token handshake
+
+        Metrics are configured and the retention task is started (with
+        RETENTION_ENABLED=1) first, since neither needs Twitch. Then the
+        Twitch client is created, and the background snapshot collector starts
+        when COLLECTOR_ENABLED=1; with EVENTSUB_ENABLED=1 the live status
+        monitor connects and subscribes to EVENTSUB_CHANNELS. Startup failures
+        are logged rather than raised so the server still comes up; tools
+        retry the handshake lazily and report the error to the client.
+        """
+        load_env()
+        metrics.configure_from_env()
+        try:
+            self.get_database()
+            if os.getenv("RETENTION_ENABLED", "0") == "1":
+                self.get_retention().start()
+        except Exception as e:
+            logger.warning("Failed to start database services: %s", e)
+
+        try:
+            twitch_service = await self.get_twitch()
+            await twitch_service.start()
+            if os.getenv("COLLECTOR_ENABLED", "0") == "1":
+                (await self.get_collector()).start()
+            if os.getenv("EVENTSUB_ENABLED", "0") == "1":
+                await (await self.get_live_status()).start()
+            logger.info("Shared services started")
+        except Exception as e:
+            logger.warning("Failed to start shared services: %s", e)
+
+    async def close(self):
+        """Close all shared services"""
+        if self._live_status is not None:
+            await self._live_status.stop()
+            self._live_status = None
+        if self._collector is not None:
+            await self._collector.stop()
+            self._collector = None
+        if self._retention is not None:
+            await self._retention.stop()
+            self._retention = None
+        if self._game_catalog is not None:
+            await self._game_catalog.close()
+            self._game_catalog = None
+        if self._twitch is not None:
+            try:
+                await self._twitch.close()
+            except Exception as cleanup_error:
+                logger.warning("Error during cleanup: %s", cleanup_error)
+            finally:
+                self._twitch = None
+        if self._database is not None:
+            # Waits for queued writes to commit
+            await asyncio.to_thread(self._database.close)
+            self._database = None
+        logger.info("Shared services closed")
+
+
+services = ServiceRegistry()
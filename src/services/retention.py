@@ -0,0 +1,226 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from src.db.async_database import AsyncDatabaseService
+from src.db.database import DatabaseService
+from src.db.rollups import RESOLUTIONS
+from src.models import RetentionRunMetrics
+from src.utils.logging_config import logger
+
+# Days each tier is kept; None keeps it forever
+DEFAULT_RETENTION_DAYS = {
+    "raw": 7,
+    "5m": 90,
+    "hour": 365,
+    "day": None,
+    "ranks": 90,
+}
+
+SECONDS_PER_DAY = 86400
+
+
+class RetentionPolicy:
+    """How long raw snapshots, each rollup resolution and leaderboard polls are kept
+
+    Rollups are maintained as snapshots are inserted, so raw rows are already
+    downsampled into every resolution by the time they expire. Snapshots
+    stored before the rollups existed are the exception; see RetentionTask.
+    """
+
+    def __init__(self, days: dict[str, int | None] | None = None):
+        self.days = {**DEFAULT_RETENTION_DAYS, **(days or {})}
+
+    @classmethod
+    def from_env(cls):
+        """Build a policy from RETENTION_<TIER>_DAYS (0 or empty keeps forever)"""
+        days = {}
+        for tier in DEFAULT_RETENTION_DAYS:
+            value = os.getenv(f"RETENTION_{tier.upper()}_DAYS")
+            if value is not None:
+                days[tier] = int(value) if value.strip() not in ("", "0") else None
+        return cls(days)
+
+    def covering_resolution(self) -> str:
+        """Finest rollup resolution kept at least as long as raw snapshots"""
+        raw = self.days["raw"]
+        for tier in RESOLUTIONS:
+            days = self.days[tier]
+            if days is None or (raw is not None and days >= raw):
+                return tier
+        return max(RESOLUTIONS, key=RESOLUTIONS.get)
+
+    def cutoffs(self, now: float | None = None) -> dict[str, int]:
+        """Epoch cutoff per tier with a finite retention"""
+        now = time.time() if now is None else now
+        return {
+            tier: int(now - days * SECONDS_PER_DAY)
+            for tier, days in self.days.items()
+            if days is not None
+        }
+
+
+class RetentionTask:
+    """Periodically expires old rows in small batches and reclaims free pages
+
+    Each batch is its own short transaction on the shared AsyncDatabaseService
+    writer thread, with a pause in between, so inserts from tools and the
+    collector queue behind at most one batch. Raw snapshots are kept while
+    the oldest of them predates the rollups, since they were never rolled
+    up; the backfill-rollups maintenance command lifts that.
+    """
+
+    def __init__(
+        self,
+        database: AsyncDatabaseService,
+        policy: RetentionPolicy | None = None,
+        interval: float = 3600.0,
+        batch_size: int = 5000,
+        pause: float = 0.05,
+        vacuum_pages: int = 2000,
+    ):
+        self.database = database
+        self.policy = policy or RetentionPolicy()
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.vacuum_pages = vacuum_pages
+
+        self.runs_completed = 0
+        self.runs_failed = 0
+        self.last_run: RetentionRunMetrics | None = None
+
+        self._runner: asyncio.Task | None = None
+        self._stop_event = asyncio.Event()
+
+    @classmethod
+    def from_env(cls, database: AsyncDatabaseService):
+        """Build a task configured from RETENTION_* environment variables"""
+        return cls(
+            database,
+            RetentionPolicy.from_env(),
+            interval=float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600")),
+            batch_size=int(os.getenv("RETENTION_BATCH_SIZE", "5000")),
+        )
+
+    @property
+    def is_running(self) -> bool:
+        return self._runner is not None and not self._runner.done()
+
+    def start(self):
+        """Start applying the policy in the background"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._runner = asyncio.create_task(self._run())
+        logger.info(
+            "Retention task started (interval=%ss, policy=%s)",
+            self.interval,
+            self.policy.days,
+        )
+
+    async def stop(self):
+        """Stop after the current batch"""
+        self._stop_event.set()
+        if self._runner is not None:
+            try:
+                await self._runner
+            except Exception as e:
+                logger.warning("Retention task ended with error: %s", e)
+            self._runner = None
+        logger.info("Retention task stopped")
+
+    async def _run(self):
+        while not self._stop_event.is_set():
+            await self.run_once()
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> RetentionRunMetrics:
+        """Delete everything past its retention, then reclaim free pages"""
+        metrics = RetentionRunMetrics(started_at=datetime.now(timezone.utc))
+        started = time.perf_counter()
+
+        try:
+            for tier, cutoff in self.policy.cutoffs().items():
+                if tier == "raw":
+                    if not await self._raw_rolled_up():
+                        metrics.deleted[tier] = 0
+                        continue
+                    delete = DatabaseService.delete_snapshots_before
+                    args = (cutoff, self.batch_size)
+                elif tier == "ranks":
+                    delete = DatabaseService.delete_rank_polls_before
+                    args = (cutoff, self.batch_size)
+                else:
+                    delete = DatabaseService.delete_rollups_before
+                    args = (RESOLUTIONS[tier], cutoff, self.batch_size)
+                metrics.deleted[tier] = await self._delete_in_batches(delete, *args)
+
+            # Hand freed pages back to the filesystem a slice at a time; the
+            # count stops shrinking when the file is not in incremental mode
+            previous = None
+            while not self._stop_event.is_set():
+                free_pages = await self.database.write(
+                    DatabaseService.incremental_vacuum, self.vacuum_pages
+                )
+                metrics.free_pages = free_pages
+                if free_pages == 0 or free_pages == previous:
+                    break
+                previous = free_pages
+                await asyncio.sleep(self.pause)
+        except Exception as e:
+            metrics.error = str(e)
+
+        metrics.total_seconds = time.perf_counter() - started
+        self.last_run = metrics
+        if metrics.error:
+            self.runs_failed += 1
+            logger.error("Retention run failed: %s", metrics.error)
+        else:
+            self.runs_completed += 1
+            logger.info(
+                "Retention run deleted %s rows in %.2fs",
+                sum(metrics.deleted.values()),
+                metrics.total_seconds,
+            )
+        return metrics
+
+    async def _raw_rolled_up(self) -> bool:
+        """Whether raw snapshots can expire without losing unrolled history"""
+        resolution = RESOLUTIONS[self.policy.covering_resolution()]
+        if await self.database.read(
+            DatabaseService.rollups_cover_snapshots, resolution
+        ):
+            return True
+        logger.warning(
+            "Keeping raw snapshots older than the rollups; run "
+            "'python -m src.db.maintenance backfill-rollups' to let them expire"
+        )
+        return False
+
+    async def _delete_in_batches(self, delete, *args) -> int:
+        """Call a batch delete until it comes back short, pausing in between"""
+        total = 0
+        while not self._stop_event.is_set():
+            deleted = await self.database.write(delete, *args)
+            total += deleted
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+        return total
+
+    def status(self) -> dict:
+        """Summarize the policy and the latest run"""
+        return {
+            "running": self.is_running,
+            "interval_seconds": self.interval,
+            "retention_days": self.policy.days,
+            "runs_completed": self.runs_completed,
+            "runs_failed": self.runs_failed,
+            "last_run": (
+                self.last_run.model_dump(mode="json") if self.last_run else None
+            ),
+        }
@@ -0,0 +1,304 @@
+import asyncio
+import multiprocessing
+import os
+import time
+import zlib
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from src.db.database import DatabaseService, snapshot_row
+from src.utils.logging_config import forward_logs, logger, receive_logs
+
+# Seconds the writer waits for a batch before checking its pipes again
+WRITER_POLL_SECONDS = 1.0
+
+# Failed writes in a row after which held rows are given up
+MAX_WRITE_ATTEMPTS = 5
+
+
+def shard_of(user_login: str, shards: int) -> int:
+    """Stable shard index of a login, independent of list order and process"""
+    return zlib.crc32(user_login.lower().encode()) % shards
+
+
+def partition_logins(user_logins: list[str], shards: int) -> list[list[str]]:
+    """Split lowercased, deduplicated logins into shards by shard_of"""
+    partitions: list[list[str]] = [[] for _ in range(shards)]
+    for login in dict.fromkeys(login.lower() for login in user_logins):
+        partitions[shard_of(login, shards)].append(login)
+    return partitions
+
+
+def read_logins(value: str = "", path: str | None = None) -> list[str]:
+    """Logins from a comma-separated string plus a file of one login per line
+
+    Blank lines and lines starting with # in the file are ignored.
+    """
+    logins = [login.strip() for login in value.split(",")]
+    if path:
+        for line in Path(path).read_text().splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                logins.append(line)
+    return [login for login in logins if login]
+
+
+async def _poll_shard(
+    shard: int,
+    user_logins: list[str],
+    interval: float,
+    rate_limit_share: float,
+    conn: Connection,
+    stop_event,
+    cycles: int | None,
+):
+    """Poll one shard's logins every interval and send their rows to the writer"""
+    from src.services.twitch_api import TwitchService
+
+    twitch_service = TwitchService(rate_limit_share=rate_limit_share)
+    completed = 0
+    try:
+        while not stop_event.is_set() and (cycles is None or completed < cycles):
+            started = time.perf_counter()
+            rows: list[tuple] = []
+            error = None
+            try:
+                snapshots = await twitch_service.get_users_performance(user_logins)
+                rows = [snapshot_row(s) for s in snapshots.values() if s is not None]
+            except Exception as e:
+                error = str(e)
+            fetch_seconds = time.perf_counter() - started
+            # Blocks while the pipe is full, so a slow writer throttles polling
+            await asyncio.to_thread(conn.send, (shard, rows, fetch_seconds, error))
+            completed += 1
+
+            remaining = interval - (time.perf_counter() - started)
+            if remaining > 0 and (cycles is None or completed < cycles):
+                await asyncio.to_thread(stop_event.wait, remaining)
+    finally:
+        await twitch_service.close()
+        conn.close()
+
+
+def _run_shard(log_queue, *args):
+    """Worker process entry point; logs go to the parent through log_queue"""
+    forward_logs(log_queue)
+    try:
+        asyncio.run(_poll_shard(*args))
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardedCollector:
+    """Polls a large watchlist of channels from several worker processes
+
+    Tracked logins are partitioned across shards by a stable hash. Each shard
+    runs in its own process with its own TwitchService and an equal share of
+    TWITCH_RATE_LIMIT, so response decoding and model validation spread over
+    CPU cores. Workers send each cycle's live channels to the calling
+    process as plain snapshot_row tuples over a pipe. That process writes
+    them through one connection, storing whatever batches are ready in a
+    single transaction. The MCP server, its collector or retention may write
+    to the same file at the same time, so rows of a failed write are held
+    and retried with the next batch rather than dropped. Workers forward
+    their log records to the calling process, which alone writes LOG_FILE.
+    """
+
+    def __init__(
+        self,
+        user_logins: list[str],
+        db_path: str,
+        shards: int = 1,
+        interval: float = 300.0,
+    ):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.shards = shards
+        self.partitions = partition_logins(user_logins, shards)
+        self.db_path = db_path
+        self.interval = interval
+
+        self.cycles_completed = 0
+        self.cycles_failed = 0
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.write_seconds = 0.0
+        self._pending: list[tuple] = []
+        self._failed_writes = 0
+
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+
+    @classmethod
+    def from_env(cls, db_path: str):
+        """Build a collector configured from COLLECTOR_* environment variables"""
+        return cls(
+            read_logins(
+                os.getenv("COLLECTOR_CHANNELS", ""),
+                os.getenv("COLLECTOR_CHANNELS_FILE") or None,
+            ),
+            db_path,
+            shards=int(os.getenv("COLLECTOR_SHARDS") or os.cpu_count() or 1),
+            interval=float(os.getenv("COLLECTOR_INTERVAL_SECONDS", "300")),
+        )
+
+    def stop(self):
+        """Ask the workers to finish their current cycle and exit"""
+        self._stop_event.set()
+
+    def run(self, cycles: int | None = None) -> dict:
+        """Start the workers and write their batches until they exit
+
+        Args:
+            cycles: Poll cycles per shard before stopping (default: until stop())
+
+        Returns:
+            Summary of cycles and rows written
+        """
+        self._stop_event.clear()
+        log_queue = self._context.Queue()
+        log_listener = receive_logs(log_queue)
+        readers: list[Connection] = []
+        workers = []
+        for shard, logins in enumerate(self.partitions):
+            if not logins:
+                continue
+            reader, writer = self._context.Pipe(duplex=False)
+            worker = self._context.Process(
+                target=_run_shard,
+                args=(
+                    log_queue,
+                    shard,
+                    logins,
+                    self.interval,
+                    1 / self.shards,
+                    writer,
+                    self._stop_event,
+                    cycles,
+                ),
+                name=f"collector-shard-{shard}",
+                daemon=True,
+            )
+            worker.start()
+            # The worker holds the only write end, so its exit closes the pipe
+            writer.close()
+            readers.append(reader)
+            workers.append(worker)
+        logger.info(
+            "Sharded collector started (%s channels over %s shards, interval=%ss)",
+            sum(len(p) for p in self.partitions),
+            len(workers),
+            self.interval,
+        )
+
+        db_service = DatabaseService(self.db_path)
+        try:
+            while readers:
+                batch: list[tuple] = []
+                for reader in wait(readers, timeout=WRITER_POLL_SECONDS):
+                    try:
+                        shard, rows, fetch_seconds, error = reader.recv()
+                    except EOFError:
+                        readers.remove(reader)
+                        continue
+                    if error:
+                        self.cycles_failed += 1
+                        logger.error(
+                            "Collector shard %s cycle failed: %s", shard, error
+                        )
+                        continue
+                    self.cycles_completed += 1
+                    batch.extend(rows)
+                    logger.debug(
+                        "Shard %s fetched %s live channels in %.2fs",
+                        shard,
+                        len(rows),
+                        fetch_seconds,
+                    )
+                if batch or self._pending:
+                    self._write(db_service, batch)
+        finally:
+            self._stop_event.set()
+            for worker in workers:
+                worker.join(timeout=30)
+                if worker.is_alive():
+                    worker.terminate()
+            log_listener.stop()
+            for reader in readers:
+                reader.close()
+            if self._pending:
+                self._write(db_service, [])
+            if self._pending:
+                logger.error(
+                    "Sharded collector lost %s unwritten rows", len(self._pending)
+                )
+                self.rows_dropped += len(self._pending)
+                self._pending = []
+            db_service.close()
+            logger.info("Sharded collector stopped")
+        return self.status()
+
+    def _write(self, db_service: DatabaseService, rows: list[tuple]):
+        """Store held rows and newly arrived ones in one transaction
+
+        Another process may hold the database lock past the busy timeout, so
+        a failed write keeps its rows for the next call. They are given up
+        after MAX_WRITE_ATTEMPTS failures in a row.
+        """
+        self._pending.extend(rows)
+        started = time.perf_counter()
+        try:
+            self.rows_written += db_service.insert_snapshot_rows(self._pending)
+            self._pending = []
+            self._failed_writes = 0
+        except Exception as e:
+            self._failed_writes += 1
+            if self._failed_writes < MAX_WRITE_ATTEMPTS:
+                logger.warning(
+                    "Sharded collector write of %s rows failed, retrying: %s",
+                    len(self._pending),
+                    e,
+                )
+            else:
+                logger.error(
+                    "Dropping %s rows after %s failed writes: %s",
+                    len(self._pending),
+                    self._failed_writes,
+                    e,
+                )
+                self.rows_dropped += len(self._pending)
+                self._pending = []
+                self._failed_writes = 0
+        self.write_seconds += time.perf_counter() - started
+
+    def status(self) -> dict:
+        """Summarize shards, cycles and rows written so far"""
+        return {
+            "shards": self.shards,
+            "channels_per_shard": [len(p) for p in self.partitions],
+            "interval_seconds": self.interval,
+            "cycles_completed": self.cycles_completed,
+            "cycles_failed": self.cycles_failed,
+            "rows_written": self.rows_written,
+            "rows_pending": len(self._pending),
+            "rows_dropped": self.rows_dropped,
+            "write_seconds": round(self.write_seconds, 3),
+        }
+
+
+def main():
+    """Run the sharded collector standalone until interrupted"""
+    from src.services.registry import services
+
+    collector = ShardedCollector.from_env(services.db_path)
+    if not any(collector.partitions):
+        logger.error("Set COLLECTOR_CHANNELS or COLLECTOR_CHANNELS_FILE to run shards")
+        return
+    try:
+        collector.run()
+    except KeyboardInterrupt:
+        # Workers get the same SIGINT; run() waits for them on the way out
+        pass
+
+
+if __name__ == "__main__":
+    main()
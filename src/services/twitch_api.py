@@ -1,21 +1,167 @@
+import asyncio
 import os
-from dotenv import load_dotenv
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+from aiohttp import ClientSession, ClientTimeout
+from twitchAPI.oauth import validate_token
+from twitchAPI.helper import TWITCH_API_BASE_URL, TWITCH_AUTH_BASE_URL
 from twitchAPI.twitch import Twitch
-from src.models import StreamSnapshot, GameRanking
-from src.utils.exceptions import ConfigurationError, ResourceNotFoundError
+from twitchAPI.type import TwitchBackendException
+from src.models import StreamSnapshot, GameMetadata, GameRanking
+from src.utils.exceptions import (
+    ConfigurationError,
+    InvalidParameterError,
+    RateLimitError,
+    ResourceNotFoundError,
+)
+from src.utils.env import load_env
 from src.utils.logging_config import logger
+from src.utils.metrics import metrics
 from src.decorators.twitch_exceptions import handle_twitch_exceptions
-from datetime import datetime
+from src.decorators.response_cache import cached_response
+from src.services.cache import ResponseCache
+from src.services.rate_limiter import RETRYABLE_STATUSES, RateLimiter, RetryPolicy
+from datetime import datetime, timezone
+
+# Helix caps "first" at 100 items per page
+HELIX_MAX_PAGE_SIZE = 100
+
+# Helix accepts at most 100 user_login filters per get_streams request
+HELIX_MAX_LOGINS_PER_REQUEST = 100
+
+# Helix accepts at most 100 ids per get_games request or game_id filters per
+# get_streams request
+HELIX_MAX_IDS_PER_REQUEST = 100
+
+# Default number of concurrent Helix requests for batched lookups
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Refresh the app access token this many seconds before Twitch expires it
+TOKEN_REFRESH_MARGIN = 300
+
+# Seconds before a single Helix or OAuth request times out
+DEFAULT_REQUEST_TIMEOUT = 10.0
+
+
+class _PooledTwitch(Twitch):
+    """Twitch client that routes every Helix request through one shared session
+
+    twitchAPI opens a fresh ClientSession per call; overriding its single request
+    entry point lets concurrent tool calls share one connection pool. The same
+    override paces requests through the shared rate limiter and retries
+    throttled or failed responses with jittered backoff.
+
+    _api_request, _check_request_return and _generate_header are private to
+    twitchAPI, so pyproject.toml pins its exact version and a test checks
+    their signatures. Its result builders (_build_generator and friends)
+    still create a ClientSession per call to pass in here; it is never used,
+    so it opens no connections.
+    """
+
+    def __init__(
+        self,
+        *args,
+        session: ClientSession,
+        rate_limiter: RateLimiter,
+        retry_policy: RetryPolicy,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._shared_session = session
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+
+    async def _api_request(
+        self, method, session, url, auth_type, required_scope, data=None, retries=1
+    ):
+        # Helix endpoint path, e.g. "games/top" for <base>/games/top?first=100
+        endpoint = url.split("?", 1)[0].removeprefix(self.base_url).strip("/")
+        with metrics.span(f"helix.{endpoint}"):
+            started = time.monotonic()
+            attempt = 0
+            while True:
+                await self._rate_limiter.acquire()
+                headers = self._generate_header(auth_type, required_scope)
+                response = await self._shared_session.request(
+                    method, url, headers=headers, json=data
+                )
+                metrics.inc(
+                    "twitch_mcp_helix_requests_total",
+                    endpoint=endpoint,
+                    status=response.status,
+                )
+                self._rate_limiter.update_from_headers(response.headers)
+                if response.status not in RETRYABLE_STATUSES:
+                    break
+
+                throttled = response.status == 429
+                delay = self._retry_policy.next_delay(
+                    attempt, started, response.headers if throttled else None
+                )
+                if delay is None:
+                    break
+                logger.warning(
+                    "Twitch API returned %s, retrying in %.2fs (attempt %s/%s)",
+                    response.status,
+                    delay,
+                    attempt + 1,
+                    self._retry_policy.max_retries,
+                )
+                metrics.inc(
+                    "twitch_mcp_helix_retries_total",
+                    endpoint=endpoint,
+                    status=response.status,
+                )
+                response.release()
+                await asyncio.sleep(delay)
+                attempt += 1
+
+            if response.status in RETRYABLE_STATUSES:
+                response.release()
+            if response.status == 429:
+                raise RateLimitError(
+                    "Twitch API rate limit exceeded, retries exhausted"
+                )
+            if response.status in RETRYABLE_STATUSES:
+                raise TwitchBackendException(
+                    f"Twitch API returned {response.status} after {attempt} retries"
+                )
+            return await self._check_request_return(
+                self._shared_session,
+                response,
+                method,
+                url,
+                auth_type,
+                required_scope,
+                data,
+                retries,
+            )
+
+    async def _check_request_return(self, session, response, *args, **kwargs):
+        # A successful response with Ratelimit-Remaining: 0 already made the
+        # rate limiter hold requests until the reset; twitchAPI would sleep
+        # for it a second time before returning
+        if response.status < 400:
+            return response
+        return await super()._check_request_return(session, response, *args, **kwargs)
 
 
 class TwitchService:
-    def __init__(self):
-        """Initialize TwitchService with API credentials"""
+    def __init__(self, rate_limit_share: float = 1.0):
+        """Initialize TwitchService with API credentials
+
+        Args:
+            rate_limit_share: Fraction of TWITCH_RATE_LIMIT this instance may use
+        """
         try:
-            load_dotenv()
+            load_env()
             app_id = os.getenv("TWITCH_APP_ID")
             app_secret = os.getenv("TWITCH_APP_SECRET")
             self.twitch = None
+            self._session: ClientSession | None = None
+            self._token_expires_at = 0.0
+            self._client_lock = asyncio.Lock()
 
             if not app_id or not app_secret:
                 logger.error("Missing Twitch API credentials in environment variables")
@@ -25,21 +171,74 @@ class TwitchService:
 
             self.app_id = app_id
             self.app_secret = app_secret
+            self.base_url = os.getenv("TWITCH_API_BASE_URL", TWITCH_API_BASE_URL)
+            self.auth_base_url = os.getenv("TWITCH_AUTH_BASE_URL", TWITCH_AUTH_BASE_URL)
+            self.cache = ResponseCache.from_env()
+            self.rate_limiter = RateLimiter.from_env(share=rate_limit_share)
+            self.retry_policy = RetryPolicy.from_env()
+            self.batch_concurrency = int(
+                os.getenv("TWITCH_BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY)
+            )
+            self.timeout = ClientTimeout(
+                total=float(
+                    os.getenv("TWITCH_REQUEST_TIMEOUT", DEFAULT_REQUEST_TIMEOUT)
+                )
+            )
             logger.info("TwitchService initialized successfully")
 
         except Exception as e:
-            logger.error(f"Failed to initialize TwitchService: {e}")
+            logger.error("Failed to initialize TwitchService: %s", e)
             raise
 
     async def _get_client(self):
-        """Get or create Twitch API client"""
-        if self.twitch is None:
-            try:
-                self.twitch = await Twitch(self.app_id, self.app_secret)
-            except Exception as e:
-                raise ConfigurationError(f"Failed to initialize Twitch API client: {e}")
+        """Get or create Twitch API client, refreshing the app token before it expires"""
+        if self.twitch is not None and time.monotonic() < self._token_expires_at:
+            return self.twitch
+
+        async with self._client_lock:
+            # Another caller may have finished the handshake while we waited
+            if self.twitch is None:
+                try:
+                    self._session = ClientSession(timeout=self.timeout)
+                    with metrics.span("twitch.oauth"):
+                        self.twitch = await _PooledTwitch(
+                            self.app_id,
+                            self.app_secret,
+                            base_url=self.base_url,
+                            auth_base_url=self.auth_base_url,
+                            session=self._session,
+                            session_timeout=self.timeout,
+                            rate_limiter=self.rate_limiter,
+                            retry_policy=self.retry_policy,
+                        )
+                        await self._update_token_expiry()
+                except Exception as e:
+                    await self.close()
+                    raise ConfigurationError(
+                        f"Failed to initialize Twitch API client: {e}"
+                    )
+            elif time.monotonic() >= self._token_expires_at:
+                logger.info("Refreshing Twitch app access token")
+                with metrics.span("twitch.oauth"):
+                    await self.twitch.refresh_used_token()
+                    await self._update_token_expiry()
         return self.twitch
 
+    async def start(self):
+        """Perform the app token handshake ahead of the first API call"""
+        await self._get_client()
+
+    async def _update_token_expiry(self):
+        """Record when the current app access token should be refreshed"""
+        token = self.twitch.get_app_token()
+        info = await validate_token(
+            token, session=self._session, auth_base_url=self.twitch.auth_base_url
+        )
+        expires_in = int(info.get("expires_in", 0))
+        self._token_expires_at = time.monotonic() + max(
+            expires_in - TOKEN_REFRESH_MARGIN, 0
+        )
+
     async def close(self):
         """Clean up connection"""
         if self.twitch:
@@ -47,16 +246,50 @@ class TwitchService:
                 await self.twitch.close()
             except Exception as e:
                 # Log warning but don't raise - cleanup should be non-critical
-                logger.warning(f"Error while closing Twitch client: {e}")
+                logger.warning("Error while closing Twitch client: %s", e)
             finally:
                 self.twitch = None
+        if self._session:
+            try:
+                await self._session.close()
+            except Exception as e:
+                logger.warning("Error while closing HTTP session: %s", e)
+            finally:
+                self._session = None
+                self._token_expires_at = 0.0
+
+    @staticmethod
+    def _to_snapshot(stream, observed_at: datetime) -> StreamSnapshot:
+        """Convert a twitchAPI Stream seen at observed_at into a StreamSnapshot"""
+        return StreamSnapshot(
+            user_login=stream.user_login,
+            user_name=stream.user_name,
+            viewer_count=stream.viewer_count,
+            game_name=stream.game_name,
+            game_id=stream.game_id,
+            title=stream.title,
+            timestamp=observed_at,
+            is_live=True,
+            language=stream.language or "en",
+            stream_id=stream.id,
+            started_at=stream.started_at,
+        )
 
+    @cached_response("streams", ignore=("on_page",))
     @handle_twitch_exceptions
-    async def get_trending_streams(self, limit: int = 10) -> list[StreamSnapshot]:
-        """Fetch trending streams from Twitch API
+    async def get_trending_streams(
+        self,
+        limit: int = 10,
+        min_viewers: int | None = None,
+        on_page: Callable[[list[StreamSnapshot]], Awaitable[Any]] | None = None,
+    ) -> list[StreamSnapshot]:
+        """Fetch trending streams from Twitch API, following pagination to any depth
 
         Args:
             limit: Maximum number of streams to fetch
+            min_viewers: Stop the scan at the first stream below this viewer count
+            on_page: Coroutine run on each page while the next one is fetched;
+                only called for pages fetched from Twitch, not cache hits
 
         Returns:
             List of stream snapshots
@@ -66,25 +299,22 @@ class TwitchService:
             ServiceUnavailableError: Twitch API temporarily unavailable
             ResourceNotFoundError: No streams found
         """
-        twitch = await self._get_client()
         streams: list[StreamSnapshot] = []
+        pending: asyncio.Task | None = None
 
-        async for stream in twitch.get_streams(first=limit):
-            snapshot = StreamSnapshot(
-                user_login=stream.user_login,
-                user_name=stream.user_name,
-                viewer_count=stream.viewer_count,
-                game_name=stream.game_name,
-                game_id=stream.game_id,
-                title=stream.title,
-                timestamp=stream.started_at,
-                is_live=True,
-                language=stream.language or "en",
-            )
-            streams.append(snapshot)
-
-            if len(streams) >= limit:
-                break
+        try:
+            async for page in self.iter_stream_pages(limit, min_viewers=min_viewers):
+                streams.extend(page)
+                if on_page is not None:
+                    # Keep one page in flight so processing overlaps the next fetch
+                    if pending is not None:
+                        await pending
+                    pending = asyncio.ensure_future(on_page(page))
+            if pending is not None:
+                await pending
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
 
         if not streams:
             logger.warning("No trending streams found")
@@ -92,9 +322,10 @@ class TwitchService:
 
         return streams
 
+    @cached_response("top_games")
     @handle_twitch_exceptions
     async def get_top_games(self, limit: int = 10) -> list[GameRanking]:
-        """Fetch top games from Twitch API
+        """Fetch top games from Twitch API, following pagination to any depth
 
         Args:
             limit: Maximum number of games to fetch
@@ -107,22 +338,10 @@ class TwitchService:
             ServiceUnavailableError: Twitch API temporarily unavailable
             ResourceNotFoundError: No games found
         """
-        twitch = await self._get_client()
         games: list[GameRanking] = []
 
-        async for game in twitch.get_top_games(first=limit):
-            ranking = GameRanking(
-                game_id=game.id,
-                game_name=game.name,
-                box_art_url=game.box_art_url,
-                igdb_id=game.igdb_id,
-                rank=len(games) + 1,
-                timestamp=datetime.now(),
-            )
-            games.append(ranking)
-
-            if len(games) >= limit:
-                break
+        async for page in self.iter_top_game_pages(limit):
+            games.extend(page)
 
         if not games:
             logger.warning("No top games found")
@@ -130,6 +349,151 @@ class TwitchService:
 
         return games
 
+    @handle_twitch_exceptions
+    async def iter_stream_pages(
+        self,
+        max_streams: int = 1000,
+        page_size: int = HELIX_MAX_PAGE_SIZE,
+        min_viewers: int | None = None,
+        game_ids: list[str] | None = None,
+    ) -> AsyncIterator[list[StreamSnapshot]]:
+        """Yield live streams page by page, most viewed first
+
+        Args:
+            max_streams: Stop after this many streams
+            page_size: Streams per Helix page (at most 100)
+            min_viewers: Stop at the first stream below this viewer count
+            game_ids: Only streams in these games (at most 100)
+
+        Yields:
+            Lists of stream snapshots, one per page
+
+        Raises:
+            AuthenticationError: Invalid or expired API credentials
+            ServiceUnavailableError: Twitch API temporarily unavailable
+        """
+        twitch = await self._get_client()
+        page_size = min(page_size, max_streams, HELIX_MAX_PAGE_SIZE)
+        page: list[StreamSnapshot] = []
+        seen = 0
+        observed_at = datetime.now(timezone.utc)
+
+        if game_ids is not None and len(game_ids) > HELIX_MAX_IDS_PER_REQUEST:
+            raise InvalidParameterError(
+                f"At most {HELIX_MAX_IDS_PER_REQUEST} game ids can be filtered on"
+            )
+
+        async for stream in twitch.get_streams(first=page_size, game_id=game_ids):
+            # Helix orders streams by viewers, so nothing later can qualify
+            if min_viewers is not None and stream.viewer_count < min_viewers:
+                break
+
+            if not page:
+                # A page's streams all arrive with one Helix response
+                observed_at = datetime.now(timezone.utc)
+            page.append(self._to_snapshot(stream, observed_at))
+            seen += 1
+
+            if seen >= max_streams:
+                break
+            if len(page) >= page_size:
+                yield page
+                page = []
+
+        if page:
+            yield page
+
+    @handle_twitch_exceptions
+    async def iter_top_game_pages(
+        self, max_games: int = 100, page_size: int = HELIX_MAX_PAGE_SIZE
+    ) -> AsyncIterator[list[GameRanking]]:
+        """Yield top games page by page, ranked across pages
+
+        Args:
+            max_games: Stop after this many games
+            page_size: Games per Helix page (at most 100)
+
+        Yields:
+            Lists of game rankings, one per page
+
+        Raises:
+            AuthenticationError: Invalid or expired API credentials
+            ServiceUnavailableError: Twitch API temporarily unavailable
+        """
+        twitch = await self._get_client()
+        page_size = min(page_size, max_games, HELIX_MAX_PAGE_SIZE)
+        page: list[GameRanking] = []
+        rank = 0
+        observed_at = datetime.now(timezone.utc)
+
+        async for game in twitch.get_top_games(first=page_size):
+            rank += 1
+            page.append(
+                GameRanking(
+                    game_id=game.id,
+                    game_name=game.name,
+                    box_art_url=game.box_art_url,
+                    igdb_id=game.igdb_id,
+                    rank=rank,
+                    timestamp=observed_at,
+                )
+            )
+
+            if rank >= max_games:
+                break
+            if len(page) >= page_size:
+                yield page
+                page = []
+
+        if page:
+            yield page
+
+    @handle_twitch_exceptions
+    async def get_games(
+        self, game_ids: list[str], max_concurrency: int | None = None
+    ) -> list[GameMetadata]:
+        """Fetch game metadata by id, 100 ids per Helix request
+
+        Batches are requested concurrently, at most max_concurrency at a time.
+
+        Args:
+            game_ids: Twitch game ids to look up
+            max_concurrency: Concurrent request limit (default: TWITCH_BATCH_CONCURRENCY)
+
+        Returns:
+            Metadata of every game Twitch knows; unknown ids are left out
+
+        Raises:
+            AuthenticationError: Invalid or expired API credentials
+            ServiceUnavailableError: Twitch API temporarily unavailable
+        """
+        twitch = await self._get_client()
+        ids = list(dict.fromkeys(str(game_id) for game_id in game_ids if game_id))
+        semaphore = asyncio.Semaphore(max_concurrency or self.batch_concurrency)
+
+        async def fetch_batch(batch: list[str]) -> list[GameMetadata]:
+            async with semaphore:
+                fetched_at = datetime.now(timezone.utc)
+                return [
+                    GameMetadata(
+                        game_id=game.id,
+                        game_name=game.name,
+                        box_art_url=game.box_art_url,
+                        igdb_id=game.igdb_id or None,
+                        updated_at=fetched_at,
+                    )
+                    async for game in twitch.get_games(game_ids=batch)
+                ]
+
+        results = await asyncio.gather(
+            *(
+                fetch_batch(ids[i : i + HELIX_MAX_IDS_PER_REQUEST])
+                for i in range(0, len(ids), HELIX_MAX_IDS_PER_REQUEST)
+            )
+        )
+        return [game for batch in results for game in batch]
+
+    @cached_response("user_stream")
     @handle_twitch_exceptions
     async def get_user_performance(self, user_login: str) -> StreamSnapshot:
         """Fetch current stream metrics for a specific user"""
@@ -137,18 +501,79 @@ class TwitchService:
 
         async for stream in twitch.get_streams(user_login=[user_login]):
             if stream.user_login.lower() == user_login.lower():
-                snapshot = StreamSnapshot(
-                    user_login=stream.user_login,
-                    user_name=stream.user_name,
-                    viewer_count=stream.viewer_count,
-                    game_name=stream.game_name,
-                    game_id=stream.game_id,
-                    title=stream.title,
-                    timestamp=stream.started_at,
-                    is_live=True,
-                    language=stream.language or "en",
-                )
+                snapshot = self._to_snapshot(stream, datetime.now(timezone.utc))
                 return snapshot
 
-        logger.warning(f"User '{user_login}' is not currently live")
+        logger.warning("User '%s' is not currently live", user_login)
         raise ResourceNotFoundError(f"User '{user_login}' is not currently live")
+
+    @handle_twitch_exceptions
+    async def get_users_performance(
+        self, user_logins: list[str], max_concurrency: int | None = None
+    ) -> dict[str, StreamSnapshot | None]:
+        """Fetch current stream metrics for many users at once
+
+        Logins are split into batches of 100 (the Helix limit) which are
+        requested concurrently, at most max_concurrency at a time.
+
+        Args:
+            user_logins: Twitch usernames to look up
+            max_concurrency: Concurrent request limit (default: TWITCH_BATCH_CONCURRENCY)
+
+        Returns:
+            Mapping of lowercased login to its snapshot, or None when offline
+
+        Raises:
+            AuthenticationError: Invalid or expired API credentials
+            ServiceUnavailableError: Twitch API temporarily unavailable
+        """
+        twitch = await self._get_client()
+        logins = list(dict.fromkeys(login.lower() for login in user_logins))
+        semaphore = asyncio.Semaphore(max_concurrency or self.batch_concurrency)
+
+        async def fetch_batch(batch: list[str]) -> list[StreamSnapshot]:
+            async with semaphore:
+                observed_at = datetime.now(timezone.utc)
+                return [
+                    self._to_snapshot(stream, observed_at)
+                    async for stream in twitch.get_streams(
+                        user_login=batch, first=HELIX_MAX_PAGE_SIZE
+                    )
+                ]
+
+        batches = [
+            logins[i : i + HELIX_MAX_LOGINS_PER_REQUEST]
+            for i in range(0, len(logins), HELIX_MAX_LOGINS_PER_REQUEST)
+        ]
+        results = await asyncio.gather(*(fetch_batch(batch) for batch in batches))
+
+        live = {
+            snapshot.user_login.lower(): snapshot
+            for batch in results
+            for snapshot in batch
+        }
+        return {login: live.get(login) for login in logins}
+
+    @handle_twitch_exceptions
+    async def get_user_ids(self, user_logins: list[str]) -> dict[str, str]:
+        """Resolve logins to Twitch user ids, 100 logins per Helix request
+
+        Args:
+            user_logins: Twitch usernames to look up
+
+        Returns:
+            Mapping of lowercased login to user id; unknown logins are left out
+
+        Raises:
+            AuthenticationError: Invalid or expired API credentials
+            ServiceUnavailableError: Twitch API temporarily unavailable
+        """
+        twitch = await self._get_client()
+        logins = list(dict.fromkeys(login.lower() for login in user_logins))
+        user_ids = {}
+        for i in range(0, len(logins), HELIX_MAX_LOGINS_PER_REQUEST):
+            async for user in twitch.get_users(
+                logins=logins[i : i + HELIX_MAX_LOGINS_PER_REQUEST]
+            ):
+                user_ids[user.login.lower()] = user.id
+        return user_ids
@@ -0,0 +1,14 @@
+import functools
+from dotenv import load_dotenv
+
+
+@functools.cache
+def load_env() -> bool:
+    """Load .env into the process environment, once per process
+
+    Variables already set in the environment win over the file.
+
+    Returns:
+        True if a .env file was found
+    """
+    return load_dotenv()
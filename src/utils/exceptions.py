@@ -38,3 +38,9 @@ class DatabaseError(TwitchAnalyticsException):
     """Raised when database operations fail"""
 
     pass
+
+
+class InvalidParameterError(TwitchAnalyticsException):
+    """Raised when a tool receives an invalid argument"""
+
+    pass
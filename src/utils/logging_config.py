@@ -1,6 +1,81 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
+from src.utils.env import load_env
+
+DEFAULT_LOG_FILE = "logs/twitch_analytics.log"
+DEFAULT_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 5
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread without formatting them twice
+
+    The stock handler pre-formats the message with a default formatter; here
+    only %-args are merged (so they are safe to pass between threads) and
+    the real formatter runs once, on the listener thread. The queued record
+    is a copy, so other handlers of the caller's record still see its args
+    and exc_info.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class _LoggerRelay(logging.Handler):
+    """Hands records forwarded from another process to the logger they came from"""
+
+    def emit(self, record: logging.LogRecord):
+        logging.getLogger(record.name).handle(record)
+
+
+class _RotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Creates the log directory and file with the first record, not at import"""
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+def _level_from_env(default: int) -> int:
+    value = os.getenv("LOG_LEVEL", "").strip().upper()
+    if not value:
+        return default
+    level = logging.getLevelName(value)
+    return level if isinstance(level, int) else default
 
 
 def setup_logger(
@@ -8,9 +83,15 @@ def setup_logger(
 ) -> logging.Logger:
     """Setup and configure logger for the application
 
+    Records are put on an in-memory queue and written to stderr and a
+    size-rotated file by a background listener thread, so tool calls never
+    wait for disk or terminal writes. Configured from LOG_LEVEL, LOG_FORMAT
+    (text or json), LOG_FILE (empty disables the file), LOG_MAX_BYTES and
+    LOG_BACKUP_COUNT.
+
     Args:
         name: Logger name
-        level: Logging level
+        level: Logging level used when LOG_LEVEL is not set
 
     Returns:
         Configured logger instance
@@ -21,31 +102,74 @@ def setup_logger(
     if logger.handlers:
         return logger
 
+    load_env()
+    level = _level_from_env(level)
     logger.setLevel(level)
 
+    if os.getenv("LOG_FORMAT", "text").strip().lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
     # Create console handler
     console_handler = logging.StreamHandler(sys.stderr)  # Use stderr instead of stdout
-    console_handler.setLevel(level)
-
-    # Create file handler (optional)
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    file_handler = logging.FileHandler(log_dir / "twitch_analytics.log")
-    file_handler.setLevel(logging.DEBUG)
-
-    # Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
     console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
+    # Create rotating file handler (optional), opened on the first record
+    log_file = os.getenv("LOG_FILE", DEFAULT_LOG_FILE).strip()
+    if log_file:
+        file_handler = _RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv("LOG_MAX_BYTES", DEFAULT_LOG_MAX_BYTES)),
+            backupCount=int(os.getenv("LOG_BACKUP_COUNT", DEFAULT_LOG_BACKUP_COUNT)),
+            encoding="utf-8",
+            delay=True,
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
 
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(listener.stop)
+
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.listener = listener
+    logger.addHandler(queue_handler)
 
     return logger
 
 
+def forward_logs(log_queue) -> None:
+    """Send this process's records to log_queue instead of writing them here
+
+    Worker processes call this so only the parent, draining the queue with
+    receive_logs, writes the console and the (shared) log file.
+
+    Args:
+        log_queue: multiprocessing queue shared with the parent process
+    """
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        listener = getattr(handler, "listener", None)
+        if listener is not None:
+            atexit.unregister(listener.stop)
+            listener.stop()
+    logger.addHandler(_QueueHandler(log_queue))
+
+
+def receive_logs(log_queue) -> logging.handlers.QueueListener:
+    """Start a thread passing records sent by forward_logs to this process's logger
+
+    Returns:
+        Started listener; stop() it after the workers exit to drain the queue
+    """
+    listener = logging.handlers.QueueListener(log_queue, _LoggerRelay())
+    listener.start()
+    return listener
+
+
 # Create default logger instance
 logger = setup_logger()
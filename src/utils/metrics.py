@@ -0,0 +1,253 @@
+"""In-process counters, latency histograms and per-call stage traces
+
+Recording is off unless METRICS_ENABLED=1. While off, inc/observe return
+after one attribute check and span/trace hand back a shared no-op context
+manager, so the instrumentation left in hot paths costs next to nothing.
+
+Every tool call runs inside a trace. Spans opened while it is active (in
+the tool itself or in tasks it spawns) are attributed to the tool in the
+stage histogram and summarized in one log line when the call finishes.
+"""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from src.utils.logging_config import logger
+
+# Upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_HELP = {
+    "twitch_mcp_tool_calls_total": ("counter", "MCP tool calls by outcome"),
+    "twitch_mcp_tool_duration_seconds": ("histogram", "MCP tool call latency"),
+    "twitch_mcp_stage_duration_seconds": (
+        "histogram",
+        "Latency of one stage (Twitch call, Helix request, database access)",
+    ),
+    "twitch_mcp_twitch_errors_total": (
+        "counter",
+        "TwitchService calls that raised, by method",
+    ),
+    "twitch_mcp_helix_requests_total": (
+        "counter",
+        "HTTP responses received from Helix, by endpoint and status",
+    ),
+    "twitch_mcp_helix_retries_total": (
+        "counter",
+        "Helix requests retried after a throttled or failed response",
+    ),
+    "twitch_mcp_rate_limit_waits_total": (
+        "counter",
+        "Times a Helix request waited for the rate limiter",
+    ),
+    "twitch_mcp_cache_requests_total": (
+        "counter",
+        "Response cache lookups by endpoint and result",
+    ),
+    "twitch_mcp_db_commits_total": ("counter", "Write transactions committed"),
+    "twitch_mcp_db_rows_written_total": (
+        "counter",
+        "Stream snapshots inserted or updated",
+    ),
+    "twitch_mcp_eventsub_events_total": (
+        "counter",
+        "EventSub notifications applied to the live status index, by type",
+    ),
+}
+
+_current_trace: ContextVar["_Trace | None"] = ContextVar("metrics_trace", default=None)
+
+_NOOP = nullcontext()
+
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Span:
+    __slots__ = ("metrics", "stage", "started")
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        trace = _current_trace.get()
+        tool = trace.tool if trace is not None else "background"
+        self.metrics.observe(
+            "twitch_mcp_stage_duration_seconds", elapsed, stage=self.stage, tool=tool
+        )
+        if trace is not None:
+            trace.add(self.stage, elapsed)
+        return False
+
+
+class _Trace:
+    """Stages recorded during one tool call"""
+
+    __slots__ = ("metrics", "tool", "outcome", "stages", "started", "token")
+
+    def __init__(self, metrics: "Metrics", tool: str):
+        self.metrics = metrics
+        self.tool = tool
+        self.outcome = "ok"
+        self.stages: dict[str, list] = {}
+
+    def add(self, stage: str, seconds: float):
+        totals = self.stages.setdefault(stage, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+
+    def __enter__(self):
+        self.token = _current_trace.set(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        _current_trace.reset(self.token)
+        if exc_type is not None:
+            self.outcome = "error"
+        self.metrics.observe(
+            "twitch_mcp_tool_duration_seconds", elapsed, tool=self.tool
+        )
+        self.metrics.inc(
+            "twitch_mcp_tool_calls_total", tool=self.tool, outcome=self.outcome
+        )
+        if logger.isEnabledFor(logging.INFO):
+            stages = ", ".join(
+                f"{stage} {count}x {seconds * 1000:.1f}ms"
+                for stage, (count, seconds) in self.stages.items()
+            )
+            logger.info(
+                "Trace %s %s %.1fms%s",
+                self.tool,
+                self.outcome,
+                elapsed * 1000,
+                f" | {stages}" if stages else "",
+            )
+        return False
+
+
+class Metrics:
+    """Thread-safe registry of labelled counters and histograms"""
+
+    def __init__(self, enabled: bool = False, buckets: tuple = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def configure_from_env(self):
+        """Turn recording on or off from METRICS_ENABLED"""
+        self.enabled = os.getenv("METRICS_ENABLED", "0") == "1"
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add value to a counter"""
+        if not self.enabled:
+            return
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record one latency sample in a histogram"""
+        if not self.enabled:
+            return
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets) + 1)
+            histogram.counts[bisect_left(self.buckets, seconds)] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+
+    def span(self, stage: str):
+        """Context manager timing one stage of the current tool call"""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, stage)
+
+    def trace(self, tool: str):
+        """Context manager around a whole tool call; set .outcome on failure"""
+        if not self.enabled:
+            return _NOOP
+        return _Trace(self, tool)
+
+    def reset(self):
+        """Drop every recorded value"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format"""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {
+                    key: (list(h.counts), h.sum, h.count) for key, h in series.items()
+                }
+                for name, series in self._histograms.items()
+            }
+
+        lines = []
+        for name in sorted(counters):
+            lines.extend(self._header(name, "counter"))
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+        for name in sorted(histograms):
+            lines.extend(self._header(name, "histogram"))
+            for key, (counts, total, count) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(key, f'le="{bound:g}"')
+                    lines.append(f"{name}_bucket{labels} {cumulative}")
+                labels = _format_labels(key, 'le="+Inf"')
+                lines.append(f"{name}_bucket{labels} {count}")
+                lines.append(f"{name}_sum{_format_labels(key)} {total:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _header(name: str, kind: str) -> list[str]:
+        kind, description = METRIC_HELP.get(name, (kind, name))
+        return [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+
+
+# Process-wide registry, configured by the server at startup
+metrics = Metrics()
@@ -0,0 +1,97 @@
+import os
+
+# Keep test runs from writing the rotating log file next to the checkout
+os.environ.setdefault("LOG_FILE", "")
+
+import asyncio
+import socket
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from benchmarks.fake_eventsub import FakeEventSubServer
+from benchmarks.fake_helix import FakeHelixServer
+from src.db.database import DatabaseService
+from src.models import StreamSnapshot
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    return str(tmp_path / "test.db")
+
+
+@pytest.fixture
+def db_service(db_path):
+    db_service = DatabaseService(db_path)
+    yield db_service
+    db_service.close()
+
+
+def make_snapshot(index: int, timestamp: datetime, **fields) -> StreamSnapshot:
+    """Snapshot of streamer_<index> seen at timestamp"""
+    values = {
+        "user_login": f"streamer_{index}",
+        "user_name": f"Streamer_{index}",
+        "viewer_count": 1000 - index,
+        "game_name": "Game",
+        "game_id": "1",
+        "title": f"Stream {index}",
+        "timestamp": timestamp,
+        "stream_id": str(index + 1),
+        "started_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+    }
+    return StreamSnapshot(**{**values, **fields})
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_thread(server, monkeypatch):
+    """Start server on its own event loop thread and point the environment at it
+
+    Yields the loop the server runs on; stops the server afterwards.
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(timeout=10)
+    for name, value in server.env().items():
+        monkeypatch.setenv(name, value)
+    # No waiting between retries, so failure paths finish quickly
+    monkeypatch.setenv("TWITCH_REQUEST_DEADLINE", "5")
+    yield loop
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(timeout=10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=10)
+    loop.close()
+
+
+@pytest.fixture
+def fake_helix(monkeypatch):
+    """FakeHelixServer on its own event loop thread, with TwitchService pointed at it
+
+    Tests adjust its settings (rate_limit, error_rate, ...) before the first
+    request; the environment is inherited by spawned worker processes too.
+    """
+    server = FakeHelixServer(port=free_port(), stream_count=500)
+    for _ in serve_in_thread(server, monkeypatch):
+        yield server
+
+
+@pytest.fixture
+def fake_eventsub(monkeypatch):
+    """FakeEventSubServer on its own event loop thread
+
+    Its send_* coroutines must run on that loop; tests await them through
+    server.call(coro) from their own loop.
+    """
+    server = FakeEventSubServer(port=free_port(), stream_count=500)
+    for loop in serve_in_thread(server, monkeypatch):
+        server.call = lambda coro: asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coro, loop)
+        )
+        yield server
@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+from src.services.cache import ResponseCache, served_from_cache
+
+
+class Fetcher:
+    """Counts calls and returns the list of items it was asked for"""
+
+    def __init__(self, size: int = 10, delay: float = 0.0):
+        self.size = size
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, limit: int | None = None):
+        async def fetch():
+            self.calls += 1
+            await asyncio.sleep(self.delay)
+            return list(range(min(self.size, limit or self.size)))
+
+        return fetch
+
+
+def test_hits_within_ttl_and_refetches_after():
+    cache = ResponseCache(ttls={"streams": 0.2})
+    fetch = Fetcher()
+
+    async def main():
+        first = await cache.get_or_fetch("streams", ("en",), fetch())
+        second = await cache.get_or_fetch("streams", ("en",), fetch())
+        reused = served_from_cache()
+        await asyncio.sleep(0.25)
+        await cache.get_or_fetch("streams", ("en",), fetch())
+        return first, second, reused, served_from_cache()
+
+    first, second, reused, reused_after_expiry = asyncio.run(main())
+
+    assert first == second
+    assert reused and not reused_after_expiry
+    assert fetch.calls == 2
+    assert cache.stats()["endpoints"]["streams"]["hits"] == 1
+
+
+def test_larger_limit_answers_smaller_requests():
+    cache = ResponseCache()
+    fetch = Fetcher(size=100)
+
+    async def main():
+        await cache.get_or_fetch("streams", (), fetch(50), limit=50)
+        smaller = await cache.get_or_fetch("streams", (), fetch(10), limit=10)
+        larger = await cache.get_or_fetch("streams", (), fetch(80), limit=80)
+        return smaller, larger
+
+    smaller, larger = asyncio.run(main())
+
+    assert smaller == list(range(10))
+    assert len(larger) == 80
+    assert fetch.calls == 2
+
+
+def test_short_result_answers_any_limit():
+    cache = ResponseCache()
+    fetch = Fetcher(size=5)
+
+    async def main():
+        await cache.get_or_fetch("streams", (), fetch(20), limit=20)
+        return await cache.get_or_fetch("streams", (), fetch(100), limit=100)
+
+    # Twitch had only 5 streams, so asking for more cannot return more
+    assert asyncio.run(main()) == list(range(5))
+    assert fetch.calls == 1
+
+
+def test_concurrent_requests_share_one_fetch():
+    cache = ResponseCache()
+    fetch = Fetcher(delay=0.05)
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.get_or_fetch("top_games", (), fetch()) for _ in range(5))
+        )
+
+    results = asyncio.run(main())
+
+    assert fetch.calls == 1
+    assert all(result == results[0] for result in results)
+    assert cache.stats()["endpoints"]["top_games"]["coalesced"] == 4
+
+
+def test_cancelled_caller_does_not_cancel_waiters():
+    cache = ResponseCache()
+    fetch = Fetcher(delay=0.1)
+
+    async def main():
+        first = asyncio.create_task(cache.get_or_fetch("streams", (), fetch()))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(cache.get_or_fetch("streams", (), fetch()))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        value = await second
+        return first.cancelled(), value
+
+    first_cancelled, value = asyncio.run(main())
+
+    assert first_cancelled
+    assert value == list(range(10))
+    assert fetch.calls == 1
+    # The fetch finished for the waiter, so its response is cached
+    assert cache.stats()["entries"] == 1
+
+
+def test_errors_reach_waiters_and_are_not_cached():
+    cache = ResponseCache()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        raise RuntimeError("Helix is down")
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.get_or_fetch("streams", (), failing) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    fetch = Fetcher()
+
+    async def main():
+        for key in ("a", "b", "a", "c", "a", "b"):
+            await cache.get_or_fetch("streams", (key,), fetch())
+
+    asyncio.run(main())
+
+    # c evicted b, then b evicted c; a stayed in use throughout
+    assert fetch.calls == 4
+    assert cache.evictions == 2
+    assert cache.stats()["entries"] == 2
+
+
+@pytest.mark.parametrize("ttl", [0, -1])
+def test_zero_ttl_disables_caching(ttl):
+    cache = ResponseCache(ttls={"streams": ttl})
+    fetch = Fetcher()
+
+    async def main():
+        for _ in range(3):
+            await cache.get_or_fetch("streams", (), fetch())
+
+    asyncio.run(main())
+
+    assert fetch.calls == 3
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,64 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+from src.db.database import DatabaseService
+from tests.conftest import make_snapshot
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_concurrent_writers_wait_for_each_other(db_path):
+    """Two connections inserting at once both succeed instead of hitting BUSY"""
+    DatabaseService(db_path).close()
+    writers = 2
+    batches = 30
+    barrier = threading.Barrier(writers)
+    errors: list[Exception] = []
+
+    def write(writer: int):
+        db_service = DatabaseService(db_path)
+        try:
+            barrier.wait()
+            for batch in range(batches):
+                timestamp = START + timedelta(minutes=batch)
+                snapshots = [
+                    make_snapshot(writer * 1000 + i, timestamp) for i in range(50)
+                ]
+                try:
+                    db_service.insert_stream_snapshots(snapshots)
+                except Exception as e:
+                    errors.append(e)
+        finally:
+            db_service.close()
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    db_service = DatabaseService(db_path)
+    try:
+        count = (
+            db_service.connection.cursor()
+            .execute("SELECT COUNT(*) FROM stream_snapshots")
+            .fetchall()[0][0]
+        )
+    finally:
+        db_service.close()
+    assert count == writers * batches * 50
+
+
+def test_failed_write_rolls_back(db_service):
+    """An error inside a write leaves no open transaction behind"""
+    snapshot = make_snapshot(0, START)
+    db_service.insert_stream_snapshots([snapshot])
+    try:
+        with db_service._write_transaction():
+            db_service.connection.execute("DELETE FROM stream_snapshots")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert db_service.connection.getautocommit()
+    assert len(db_service.get_all_streams()) == 1
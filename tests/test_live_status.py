@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import pytest
+
+from src.services.live_status import LiveStatusMonitor
+from src.services.twitch_api import TwitchService
+from src.utils.exceptions import ServiceUnavailableError
+from tests.conftest import free_port
+
+
+def run(coro_factory):
+    """Run coro_factory(monitor) against a started monitor and stop it"""
+
+    async def main():
+        service = TwitchService()
+        monitor = LiveStatusMonitor.from_env(service)
+        try:
+            await monitor.start()
+            return await coro_factory(monitor)
+        finally:
+            await monitor.stop()
+            await service.close()
+
+    return asyncio.run(main())
+
+
+async def wait_for(condition, timeout: float = 5.0):
+    """Poll condition() until it holds; events arrive on the socket thread"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_track_subscribes_and_seeds(fake_eventsub):
+    async def track(monitor):
+        result = await monitor.track(["streamer_1", "Streamer_2"])
+        subscriptions = fake_eventsub.stats()["subscriptions"]
+        return result, subscriptions, monitor.lookup(["streamer_1", "streamer_2"])
+
+    result, subscriptions, (known, missing) = run(track)
+
+    assert result == {"tracked": ["streamer_1", "streamer_2"], "failed": {}}
+    assert subscriptions == 6
+    # Subscriptions end with the session when the monitor stops
+    assert fake_eventsub.stats()["subscriptions"] == 0
+    assert missing == []
+    # Even-numbered fake channels are live
+    assert known["streamer_2"].is_live and not known["streamer_1"].is_live
+
+
+def test_events_update_the_index(fake_eventsub):
+    async def flip(monitor):
+        await monitor.track(["streamer_1"])
+        await fake_eventsub.call(
+            fake_eventsub.send_channel_update("streamer_1", "Now live", "7", "Game 7")
+        )
+        await fake_eventsub.call(fake_eventsub.send_stream_online("streamer_1"))
+        await wait_for(lambda: monitor.index.get("streamer_1").is_live)
+        return monitor.index.get("streamer_1"), monitor.events_received
+
+    status, events = run(flip)
+
+    assert events == 2
+    assert status.source == "eventsub"
+    assert (status.title, status.game_name) == ("Now live", "Game 7")
+
+
+def test_revocation_falls_back_to_polling(fake_eventsub):
+    async def revoke(monitor):
+        await monitor.track(["streamer_1", "streamer_2"])
+        sent = await fake_eventsub.call(fake_eventsub.send_revocation("streamer_2"))
+        await wait_for(lambda: "streamer_2" in monitor.failed)
+        assert monitor.tracked == ["streamer_1"]
+        subscribed = fake_eventsub.subscribed_logins()
+        return sent, subscribed, monitor.lookup(["streamer_1", "streamer_2"])
+
+    sent, subscribed, (known, missing) = run(revoke)
+
+    assert sent == 3
+    assert subscribed == ["streamer_1"]
+    # get_live_status looks the missing logins up on Helix
+    assert list(known) == ["streamer_1"]
+    assert missing == ["streamer_2"]
+
+
+def test_untracked_and_unknown_channels_are_missing(fake_eventsub):
+    async def track(monitor):
+        result = await monitor.track(["streamer_1", "nobody"])
+        return result, monitor.lookup(["streamer_1", "streamer_3", "nobody"])
+
+    result, (known, missing) = run(track)
+
+    assert result["failed"] == {"nobody": "unknown user"}
+    assert list(known) == ["streamer_1"]
+    assert missing == ["streamer_3", "nobody"]
+
+
+def test_unreachable_websocket_fails_within_timeout(fake_eventsub, monkeypatch):
+    monkeypatch.setenv("EVENTSUB_WEBSOCKET_URL", f"ws://127.0.0.1:{free_port()}/ws")
+    monkeypatch.setenv("EVENTSUB_CONNECT_TIMEOUT", "1")
+
+    async def start():
+        service = TwitchService()
+        monitor = LiveStatusMonitor.from_env(service)
+        try:
+            started = time.monotonic()
+            with pytest.raises(ServiceUnavailableError):
+                await monitor.start()
+            return time.monotonic() - started, monitor.is_running
+        finally:
+            await service.close()
+
+    elapsed, running = asyncio.run(start())
+
+    assert elapsed < 5
+    assert not running
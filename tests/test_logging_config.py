@@ -0,0 +1,30 @@
+import logging
+import queue
+import sys
+
+from src.utils.logging_config import _QueueHandler
+
+
+def test_queued_record_is_a_copy():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        exc_info = sys.exc_info()
+    record = logging.LogRecord(
+        "test", logging.ERROR, __file__, 1, "failed %s", ("call",), exc_info
+    )
+
+    prepared = _QueueHandler(queue.SimpleQueue()).prepare(record)
+
+    assert (prepared.msg, prepared.args, prepared.exc_info) == (
+        "failed call",
+        None,
+        None,
+    )
+    assert "ValueError: boom" in prepared.exc_text
+    # The caller's record still formats normally for other handlers
+    assert (record.msg, record.args, record.exc_info) == (
+        "failed %s",
+        ("call",),
+        exc_info,
+    )
@@ -0,0 +1,144 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import apsw
+import pytest
+
+from src.db.database import DatabaseService
+from src.db.migrations import SCHEMA_VERSION, create_stream_snapshots
+from src.utils.exceptions import DatabaseError
+from tests.conftest import make_snapshot
+
+# Rows as the version 1 schema stored them, with ISO timestamps
+V1_ROWS = [
+    ("alpha", "Alpha", 120, "Game A", "1", "Speedrun any%", "2024-05-01 12:00:00"),
+    ("beta", "Beta", 80, None, None, "Just chatting", "2024-05-01T12:05:00"),
+    ("alpha", "AlphaTV", 150, "Game A", "1", "Speedrun any%", "2024-05-01 12:10:00"),
+]
+
+
+def user_version(db_path: str) -> int:
+    connection = apsw.Connection(db_path)
+    try:
+        return connection.execute("PRAGMA user_version").fetchall()[0][0]
+    finally:
+        connection.close()
+
+
+def create_v1_database(db_path: str, rows=V1_ROWS):
+    """Write a database at schema version 1 holding rows"""
+    connection = apsw.Connection(db_path)
+    try:
+        create_stream_snapshots(connection.cursor())
+        connection.executemany(
+            "INSERT INTO stream_snapshots(user_login, user_name, viewer_count, "
+            "game_name, game_id, title, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        connection.execute("PRAGMA user_version = 1")
+    finally:
+        connection.close()
+
+
+def test_migrates_v1_database(db_path):
+    create_v1_database(db_path)
+
+    db_service = DatabaseService(db_path)
+    try:
+        snapshots = db_service.get_all_streams()
+        matches = db_service.search_titles("speedrun")
+    finally:
+        db_service.close()
+
+    assert user_version(db_path) == SCHEMA_VERSION
+    assert sorted((s.user_login, s.viewer_count, s.timestamp) for s in snapshots) == [
+        ("alpha", 120, datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)),
+        ("alpha", 150, datetime(2024, 5, 1, 12, 10, tzinfo=timezone.utc)),
+        ("beta", 80, datetime(2024, 5, 1, 12, 5, tzinfo=timezone.utc)),
+    ]
+    # The latest name of a renamed channel wins
+    assert {s.user_name for s in snapshots if s.user_login == "alpha"} == {"AlphaTV"}
+    # Version 1 rows held the stream start in timestamp
+    assert all(s.started_at == s.timestamp for s in snapshots)
+    assert all(s.stream_id is None for s in snapshots)
+    assert [m.user_login for m in matches] == ["alpha"]
+
+
+def test_unparseable_timestamps_stop_the_migration(db_path, caplog):
+    rows = [*V1_ROWS, ("gamma", "Gamma", 10, None, None, "Hi", "yesterday")]
+    create_v1_database(db_path, rows)
+
+    with pytest.raises(DatabaseError):
+        DatabaseService(db_path)
+
+    assert "1 stream snapshots have timestamps" in caplog.text
+    assert "'yesterday'" in caplog.text
+    # Nothing was rewritten, so the rows can be fixed and the migration rerun
+    assert user_version(db_path) == 1
+    connection = apsw.Connection(db_path)
+    try:
+        connection.execute(
+            "UPDATE stream_snapshots SET timestamp = ? WHERE id = 4",
+            ("2024-05-01 12:15:00",),
+        )
+    finally:
+        connection.close()
+    DatabaseService(db_path).close()
+    assert user_version(db_path) == SCHEMA_VERSION
+
+
+def test_concurrent_opens_migrate_once(tmp_path):
+    """Connections opening a fresh file together do not re-run migrations"""
+    for attempt in range(5):
+        db_path = str(tmp_path / f"race_{attempt}.db")
+        barrier = threading.Barrier(4)
+        errors: list[Exception] = []
+
+        def open_database():
+            barrier.wait()
+            try:
+                DatabaseService(db_path).close()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=open_database) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert user_version(db_path) == SCHEMA_VERSION
+
+
+def test_presence_slots_are_recounted_from_raw_snapshots(db_path):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    query = """
+        SELECT resolution, bucket_start, slots FROM game_rollups
+        UNION ALL SELECT resolution, bucket_start, slots FROM channel_rollups
+        ORDER BY 1, 2, 3
+    """
+    db_service = DatabaseService(db_path)
+    try:
+        for poll in range(30):
+            timestamp = start + timedelta(minutes=5 * poll)
+            db_service.insert_stream_snapshots(
+                [make_snapshot(i, timestamp) for i in range(3)]
+            )
+        expected = db_service.connection.execute(query).fetchall()
+    finally:
+        db_service.close()
+    # Roll the database back to version 7
+    connection = apsw.Connection(db_path)
+    connection.execute("""
+        ALTER TABLE channel_rollups DROP COLUMN slots;
+        ALTER TABLE game_rollups DROP COLUMN slots;
+        PRAGMA user_version = 7;
+    """)
+    connection.close()
+
+    db_service = DatabaseService(db_path)
+    try:
+        assert db_service.connection.execute(query).fetchall() == expected
+    finally:
+        db_service.close()
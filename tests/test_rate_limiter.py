@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from src.services.rate_limiter import RateLimiter, RetryPolicy
+
+
+def timed(coro) -> float:
+    """Seconds coro takes to run on a fresh event loop"""
+
+    async def main():
+        started = time.monotonic()
+        await coro
+        return time.monotonic() - started
+
+    return asyncio.run(main())
+
+
+async def acquire(limiter: RateLimiter, count: int):
+    for _ in range(count):
+        await limiter.acquire()
+
+
+def test_full_bucket_does_not_wait():
+    limiter = RateLimiter(limit=50, window=60)
+
+    assert timed(acquire(limiter, 50)) < 0.5
+    assert limiter.waits == 0
+    assert limiter.stats()["tokens_available"] < 1
+
+
+def test_empty_bucket_waits_for_refill():
+    # 10 tokens per second
+    limiter = RateLimiter(limit=5, window=0.5)
+
+    elapsed = timed(acquire(limiter, 8))
+
+    assert 0.2 <= elapsed < 1.0
+    assert limiter.waits >= 3
+
+
+def test_share_scales_capacity_and_refill():
+    limiter = RateLimiter(limit=800, window=60, share=0.25)
+
+    assert limiter.capacity == 200
+    assert limiter.refill_rate == 200 / 60
+    assert RateLimiter(limit=2, share=0.1).capacity == 1
+
+
+def test_headers_reconcile_the_bucket():
+    limiter = RateLimiter(limit=800, window=60, share=0.5)
+
+    limiter.update_from_headers({"Ratelimit-Limit": "120", "Ratelimit-Remaining": "3"})
+
+    assert (limiter.limit, limiter.capacity) == (120, 60)
+    assert limiter.stats()["tokens_available"] <= 3
+
+
+def test_malformed_headers_are_ignored():
+    limiter = RateLimiter(limit=800)
+
+    limiter.update_from_headers({"Ratelimit-Limit": "lots", "Ratelimit-Remaining": "3"})
+
+    assert limiter.limit == 800
+    assert limiter.stats()["tokens_available"] == 800
+
+
+def test_exhausted_headers_block_until_reset():
+    limiter = RateLimiter(limit=800)
+    reset = int(time.time()) + 2
+
+    limiter.update_from_headers(
+        {"Ratelimit-Remaining": "0", "Ratelimit-Reset": str(reset)}
+    )
+    expected = reset - time.time()
+    elapsed = timed(limiter.acquire())
+
+    # Held until the reset second even though the bucket refills sooner
+    assert elapsed >= expected - 0.1
+    assert limiter.waits >= 1
+
+
+def test_past_reset_does_not_block():
+    limiter = RateLimiter(limit=800)
+
+    limiter.block_until_reset(int(time.time()) - 10)
+
+    assert timed(limiter.acquire()) < 0.1
+    assert limiter.waits == 0
+
+
+def test_retry_policy_stops_at_attempts_and_deadline():
+    policy = RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.01, deadline=5)
+    started = time.monotonic()
+
+    assert policy.next_delay(0, started) <= 0.01
+    assert policy.next_delay(1, started) <= 0.01
+    assert policy.next_delay(2, started) is None
+    # A reset past the deadline is not worth waiting for
+    headers = {"Ratelimit-Reset": str(int(time.time()) + 60)}
+    assert policy.next_delay(0, started, headers) is None
+    assert policy.retries == 2
@@ -0,0 +1,26 @@
+import asyncio
+
+from src.services.registry import ServiceRegistry
+from src.utils.metrics import metrics
+
+
+def test_start_without_twitch_credentials_keeps_local_services(db_path, monkeypatch):
+    monkeypatch.delenv("TWITCH_APP_ID", raising=False)
+    monkeypatch.delenv("TWITCH_APP_SECRET", raising=False)
+    monkeypatch.setenv("TWITCH_ANALYTICS_DB", db_path)
+    monkeypatch.setenv("METRICS_ENABLED", "1")
+    monkeypatch.setenv("RETENTION_ENABLED", "1")
+    monkeypatch.setattr(metrics, "enabled", False)
+
+    async def start():
+        registry = ServiceRegistry()
+        try:
+            await registry.start()
+            return metrics.enabled, registry.get_retention().is_running
+        finally:
+            await registry.close()
+
+    metrics_enabled, retention_running = asyncio.run(start())
+
+    assert metrics_enabled
+    assert retention_running
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from src.db.async_database import AsyncDatabaseService
+from src.db.database import DatabaseService
+from src.services.retention import RetentionPolicy, RetentionTask
+from tests.conftest import make_snapshot
+
+NOW = time.time()
+
+
+def test_retention_writes_through_the_writer_thread(db_path):
+    async def run():
+        database = AsyncDatabaseService(db_path)
+        try:
+            old = datetime.fromtimestamp(NOW - 10 * 86400, tz=timezone.utc)
+            recent = datetime.fromtimestamp(NOW - 3600, tz=timezone.utc)
+            await database.insert_stream_snapshots(
+                [make_snapshot(i, old) for i in range(30)]
+                + [make_snapshot(i, recent) for i in range(5)]
+            )
+            commits = database.stats()["commits"]
+
+            task = RetentionTask(
+                database,
+                RetentionPolicy({"raw": 7, "5m": None, "hour": None, "ranks": None}),
+                batch_size=10,
+                pause=0,
+            )
+            metrics = await task.run_once()
+            await task.stop()
+            remaining, _ = await database.query_streams(limit=100)
+            return metrics, database.stats()["commits"] - commits, remaining
+        finally:
+            await asyncio.to_thread(database.close)
+
+    metrics, commits, remaining = asyncio.run(run())
+
+    assert metrics.error is None
+    assert metrics.deleted["raw"] == 30
+    # Four delete batches and at least one vacuum slice, all on the writer
+    assert commits >= 5
+    assert len(remaining) == 5
+
+
+def test_raw_snapshots_older_than_the_rollups_are_kept(db_path):
+    async def run():
+        database = AsyncDatabaseService(db_path)
+        try:
+            for poll in range(6):
+                old = datetime.fromtimestamp(
+                    NOW - 10 * 86400 + 300 * poll, tz=timezone.utc
+                )
+                await database.insert_stream_snapshots(
+                    [make_snapshot(i, old) for i in range(3)]
+                )
+            # As if the snapshots were stored before the rollup tables existed
+            await database.write(clear_rollups)
+            task = RetentionTask(database, RetentionPolicy({"raw": 7}), pause=0)
+
+            kept = await task.run_once()
+            await database.write(DatabaseService.rebuild_rollups)
+            expired = await task.run_once()
+            return kept, expired
+        finally:
+            await asyncio.to_thread(database.close)
+
+    kept, expired = asyncio.run(run())
+
+    assert kept.error is None and kept.deleted["raw"] == 0
+    assert expired.deleted["raw"] == 18
+
+
+def clear_rollups(db_service: DatabaseService):
+    db_service.connection.execute("DELETE FROM channel_rollups")
+    db_service.connection.execute("DELETE FROM game_rollups")
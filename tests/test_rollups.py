@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+
+from src.db.database import to_epoch
+from tests.conftest import make_snapshot
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+DAY = 86400
+
+
+def rollup_rows(db_service) -> list[tuple]:
+    return (
+        db_service.connection.cursor()
+        .execute(
+            """
+        SELECT resolution, channel_id, bucket_start, samples, viewer_sum, viewer_peak
+        FROM channel_rollups ORDER BY resolution, channel_id, bucket_start
+        """
+        )
+        .fetchall()
+    )
+
+
+def fill_days(db_service, days: int):
+    """Snapshot two channels every 5 minutes for the given number of days"""
+    for poll in range(days * 288):
+        timestamp = START + timedelta(minutes=5 * poll)
+        db_service.insert_stream_snapshots(
+            [make_snapshot(i, timestamp, viewer_count=100 + poll % 7) for i in range(2)]
+        )
+
+
+def test_rebuild_matches_incremental_rollups(db_service):
+    fill_days(db_service, 2)
+    before = rollup_rows(db_service)
+
+    assert db_service.rebuild_rollups(chunk_size=100) == 2 * 2 * 288
+    assert rollup_rows(db_service) == before
+
+
+def test_rebuild_keeps_rollups_older_than_raw_snapshots(db_service):
+    """Rollups of pruned raw snapshots survive a rebuild"""
+    fill_days(db_service, 3)
+    before = rollup_rows(db_service)
+    # Retention expires raw rows earlier than their rollups
+    cutoff = to_epoch(START) + DAY + 3600
+    db_service.delete_snapshots_before(cutoff, batch_size=100_000)
+
+    db_service.rebuild_rollups()
+
+    assert rollup_rows(db_service) == before
+
+
+def test_rebuild_without_raw_snapshots_keeps_rollups(db_service):
+    fill_days(db_service, 1)
+    before = rollup_rows(db_service)
+    db_service.delete_snapshots_before(to_epoch(START) + 2 * DAY, batch_size=100_000)
+
+    assert db_service.rebuild_rollups() == 0
+    assert rollup_rows(db_service) == before
+
+
+def test_extra_snapshots_do_not_add_hours_streamed(db_service):
+    fill_days(db_service, 1)
+    # Tool calls snapshot the same streams again between collector polls
+    for minute in range(1, 60, 5):
+        timestamp = START + timedelta(minutes=minute)
+        db_service.insert_stream_snapshots(
+            [make_snapshot(i, timestamp) for i in range(2)]
+        )
+
+    channel = db_service.get_channel_viewer_history(
+        "streamer_0", since=START, until=START + timedelta(hours=2), poll_interval=300
+    )
+    game = db_service.get_game_viewer_history(
+        "1", since=START, until=START + timedelta(hours=2), poll_interval=300
+    )
+
+    assert channel[0].samples == 24
+    assert [bucket.hours_streamed for bucket in channel] == [1.0, 1.0]
+    # Both channels play the same game
+    assert [bucket.hours_streamed for bucket in game] == [2.0, 2.0]
+
+
+def test_hours_streamed_follow_the_poll_interval(db_service):
+    # One poll every 15 minutes
+    for poll in range(4):
+        timestamp = START + timedelta(minutes=15 * poll)
+        db_service.insert_stream_snapshots([make_snapshot(0, timestamp)])
+
+    (bucket,) = db_service.get_channel_viewer_history(
+        "streamer_0", since=START, until=START + timedelta(hours=1), poll_interval=900
+    )
+
+    assert bucket.hours_streamed == 1.0
@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+
+from src.db.database import DatabaseService, snapshot_row
+from src.services.sharded_collector import (
+    MAX_WRITE_ATTEMPTS,
+    ShardedCollector,
+    partition_logins,
+    read_logins,
+)
+from src.utils.exceptions import DatabaseError
+from tests.conftest import make_snapshot
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FlakyDatabase(DatabaseService):
+    """Fails the first inserts, as when another writer holds the lock"""
+
+    def __init__(self, db_path: str, failures: int):
+        super().__init__(db_path)
+        self.failures = failures
+
+    def insert_snapshot_rows(self, snapshot_rows):
+        if self.failures:
+            self.failures -= 1
+            raise DatabaseError("database is locked")
+        return super().insert_snapshot_rows(snapshot_rows)
+
+
+def rows(start: int, count: int) -> list[tuple]:
+    return [snapshot_row(make_snapshot(i, START)) for i in range(start, start + count)]
+
+
+def test_partition_is_stable_and_complete():
+    logins = [f"channel_{i}" for i in range(1000)] + ["Channel_1"]
+    partitions = partition_logins(logins, 4)
+    shuffled = partition_logins(list(reversed(logins)), 4)
+
+    assert sorted(login for p in partitions for login in p) == sorted(
+        f"channel_{i}" for i in range(1000)
+    )
+    assert [set(p) for p in partitions] == [set(p) for p in shuffled]
+    assert all(p for p in partitions)
+
+
+def test_read_logins(tmp_path):
+    path = tmp_path / "channels.txt"
+    path.write_text("# tracked\nalpha\n\n beta \n")
+    logins = read_logins("gamma, ,delta", str(path))
+    assert logins == ["gamma", "delta", "alpha", "beta"]
+
+
+def test_failed_write_is_retried_with_the_next_batch(db_path):
+    collector = ShardedCollector([], db_path)
+    db_service = FlakyDatabase(db_path, failures=2)
+    try:
+        collector._write(db_service, rows(0, 10))
+        collector._write(db_service, rows(10, 10))
+        assert collector.rows_written == 0
+        collector._write(db_service, rows(20, 10))
+    finally:
+        db_service.close()
+
+    status = collector.status()
+    assert status["rows_written"] == 30
+    assert status["rows_pending"] == 0
+    assert status["rows_dropped"] == 0
+
+
+def test_rows_are_dropped_after_repeated_failures(db_path):
+    collector = ShardedCollector([], db_path)
+    db_service = FlakyDatabase(db_path, failures=MAX_WRITE_ATTEMPTS)
+    try:
+        for batch in range(MAX_WRITE_ATTEMPTS):
+            collector._write(db_service, rows(batch * 10, 10))
+        collector._write(db_service, rows(100, 10))
+    finally:
+        db_service.close()
+
+    assert collector.rows_dropped == MAX_WRITE_ATTEMPTS * 10
+    assert collector.rows_written == 10
+
+
+def test_shards_poll_and_write_every_live_channel(fake_helix, db_path, caplog):
+    # Even-numbered fake channels are live
+    collector = ShardedCollector(
+        [f"streamer_{i}" for i in range(400)], db_path, shards=2, interval=0
+    )
+    status = collector.run(cycles=2)
+
+    assert status["cycles_completed"] == 4
+    assert status["cycles_failed"] == 0
+    db_service = DatabaseService(db_path)
+    try:
+        logins = {s.user_login for s in db_service.get_all_streams()}
+    finally:
+        db_service.close()
+    assert logins == {f"streamer_{i}" for i in range(0, 400, 2)}
+    # Workers log through the parent process rather than to LOG_FILE themselves
+    assert {
+        record.processName
+        for record in caplog.records
+        if record.processName.startswith("collector-shard")
+    } == {"collector-shard-0", "collector-shard-1"}
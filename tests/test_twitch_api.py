@@ -0,0 +1,130 @@
+import asyncio
+import inspect
+import time
+
+import pytest
+from aiohttp import ClientResponse
+from twitchAPI.twitch import Twitch
+
+from src.services.twitch_api import TwitchService
+from src.utils.exceptions import RateLimitError, ServiceUnavailableError
+
+
+def run(coro_factory):
+    """Run coro_factory(service) against a fresh TwitchService and close it"""
+
+    async def main():
+        service = TwitchService()
+        try:
+            return await coro_factory(service)
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def released(monkeypatch) -> list[int]:
+    """Statuses of the responses released explicitly, in order"""
+    statuses: list[int] = []
+    release = ClientResponse.release
+
+    def spy(response):
+        statuses.append(response.status)
+        return release(response)
+
+    monkeypatch.setattr(ClientResponse, "release", spy)
+    return statuses
+
+
+def test_transient_errors_are_retried(fake_helix, monkeypatch):
+    monkeypatch.setenv("TWITCH_MAX_RETRIES", "8")
+    fake_helix.error_rate = 0.3
+
+    async def fetch(service):
+        games = [await service.get_games([str(i)]) for i in range(1, 21)]
+        return games, service.retry_policy.retries
+
+    games, retries = run(fetch)
+
+    assert all(len(batch) == 1 for batch in games)
+    assert fake_helix.errors > 0
+    assert retries == fake_helix.errors
+
+
+def test_exhausted_retries_release_the_response(fake_helix, monkeypatch, released):
+    monkeypatch.setenv("TWITCH_MAX_RETRIES", "0")
+    fake_helix.error_rate = 1.0
+
+    async def fetch(service):
+        with pytest.raises(ServiceUnavailableError):
+            await service.get_games(["1"])
+
+    run(fetch)
+
+    # After the two OAuth responses of the token handshake
+    assert released[-1] >= 500
+
+
+def test_throttled_request_raises_and_releases(fake_helix, monkeypatch, released):
+    monkeypatch.setenv("TWITCH_MAX_RETRIES", "0")
+    # An empty bucket that refills one point per second
+    fake_helix.rate_limit = 60
+    fake_helix._tokens = 0.0
+
+    async def fetch(service):
+        with pytest.raises(RateLimitError):
+            await service.get_games(["1"])
+        return service.rate_limiter.stats()
+
+    limiter = run(fetch)
+
+    assert fake_helix.throttled == 1
+    assert released[-1] == 429
+    # The limiter adopted the server's limit and holds requests until the reset
+    assert limiter["limit"] == 60
+    assert limiter["tokens_available"] == 0
+
+
+def test_last_point_of_the_window_does_not_sleep(fake_helix):
+    """A 200 with Ratelimit-Remaining: 0 returns at once; the limiter waits instead"""
+    fake_helix.rate_limit = 1
+    fake_helix._tokens = 1.0
+
+    async def fetch(service):
+        await service._get_client()
+        started = time.monotonic()
+        games = await service.get_games(["1"])
+        return games, time.monotonic() - started, service.rate_limiter.stats()
+
+    games, elapsed, limiter = run(fetch)
+
+    assert len(games) == 1
+    assert elapsed < 5
+    assert limiter["tokens_available"] == 0
+
+
+@pytest.mark.parametrize(
+    "name, parameters",
+    [
+        (
+            "_api_request",
+            "method session url auth_type required_scope data retries",
+        ),
+        (
+            "_check_request_return",
+            "session response method url auth_type required_scope data retries",
+        ),
+        ("_generate_header", "auth_type required_scope"),
+        (
+            "_build_generator",
+            "method url url_params auth_type auth_scope return_type body_data "
+            "split_lists error_handler",
+        ),
+    ],
+)
+def test_overridden_twitch_internals_are_unchanged(name, parameters):
+    """_PooledTwitch relies on these private twitchAPI methods (pinned version)"""
+    signature = inspect.signature(getattr(Twitch, name))
+
+    assert list(signature.parameters) == ["self", *parameters.split()]